@@ -0,0 +1,435 @@
+# batch_cli.py
+
+# Headless batch runner: JSONL jobs in, JSONL results out.
+# Reads the job file as a stream, a chunk of jobs at a time, so memory stays bounded
+# no matter how large the input is. Within a chunk, resume PDFs are parsed in a process
+# pool (with the parse cache), JD URLs are fetched concurrently, all embeddings are
+# computed in one batched encode, and LLM analyses run through the rate-limited
+# scheduler. Results are appended to the output file as each chunk finishes; the
+# output doubles as the checkpoint, so a rerun after a crash skips finished jobs.
+# With --dedup, near-duplicate JDs (and, if asked for, resumes; MinHash/LSH, see
+# matching.dedup) are scored as their first copy, so they reuse its embeddings and
+# LLM answers.
+#
+# Job format (one JSON object per line):
+#   {"job_id": "c-17",                      # optional; defaults to "line-<n>"
+#    "resume_path": "resumes/17.pdf",        # or "resume_text": "..."  (.txt paths are read as text)
+#    "jd_url": "https://...",                # and/or "jd_text": "..." (used if the URL fails)
+#    "analyses": ["similarity", "llm_match"]}
+# Analyses: similarity, chunked_similarity, keywords, skills, llm_match, improve.
+#
+# Usage:
+#   python batch_cli.py jobs.jsonl results.jsonl --workers 8
+#   python batch_cli.py jobs.jsonl results.jsonl --analyses similarity keywords --chunk-size 256
+#   python batch_cli.py jobs.jsonl results.jsonl --analyses llm_match --dedup --dedup-threshold 0.95
+#   python batch_cli.py jobs.jsonl results.jsonl --analyses llm_match --dedup jd resume
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+logger = logging.getLogger("batch_cli")
+
+ANALYSES = ("similarity", "chunked_similarity", "keywords", "skills", "llm_match", "improve")
+DEFAULT_ANALYSES = ("similarity",)
+
+
+# --- Checkpoint ---
+def load_completed_ids(output_path, include_failed=True):
+    """
+    Returns the job_ids already present in an output file (the checkpoint).
+    A torn last line from a crash is ignored, so that job simply runs again.
+    With include_failed=False, jobs whose record has an "error" or "failed_analyses"
+    run again too (their new record is appended; the last record for a job_id is the
+    current one).
+    """
+    completed = set()
+    if not os.path.isfile(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if include_failed or not _record_failed(record):
+                    completed.add(record["job_id"])
+                else:
+                    # A later failed attempt supersedes an earlier success
+                    completed.discard(record["job_id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return completed
+
+
+def _record_failed(record):
+    return "error" in record or bool(record.get("failed_analyses"))
+
+
+def _open_output(output_path):
+    # Append mode; if a crash left a partial last line, start on a fresh one
+    needs_newline = False
+    if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    out = open(output_path, "a", encoding="utf-8")
+    if needs_newline:
+        out.write("\n")
+    return out
+
+
+# --- Input ---
+def iter_jobs(input_path, default_analyses):
+    """
+    Streams jobs from a JSONL file.
+
+    Yields:
+        dict: The job with "job_id" and "analyses" filled in, or a job carrying an
+              "error" if its line is not valid JSON, not an object, or has fields of
+              the wrong type.
+    """
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            job_id = f"line-{line_number}"
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("job must be a JSON object")
+                if job.get("job_id") is not None:
+                    job_id = str(job["job_id"])
+                _validate_job(job)
+            except ValueError as e:
+                yield {"job_id": job_id, "error": f"Invalid job: {e}"}
+                continue
+            job["job_id"] = job_id
+            if job.get("analyses") is None:
+                job["analyses"] = list(default_analyses)
+            unknown = [name for name in job["analyses"] if name not in ANALYSES]
+            if unknown:
+                job["error"] = f"Unknown analyses {unknown}. Choose from {ANALYSES}."
+            yield job
+
+
+def _validate_job(job):
+    # Raises ValueError for fields that would otherwise fail deep inside a chunk
+    analyses = job.get("analyses")
+    if analyses is not None and not (isinstance(analyses, list)
+                                     and all(isinstance(name, str) for name in analyses)):
+        raise ValueError("'analyses' must be a list of strings")
+    for field in ("resume_path", "resume_text", "jd_url", "jd_text"):
+        if job.get(field) is not None and not isinstance(job[field], str):
+            raise ValueError(f"'{field}' must be a string")
+
+
+def iter_chunks(jobs, chunk_size):
+    chunk = []
+    for job in jobs:
+        chunk.append(job)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- Chunk processing ---
+def resolve_resumes(jobs, workers):
+    """
+    Fills job["_resume"] with the resume text (or job["error"]) for every job.
+    PDFs are parsed in parallel through bulk ingestion with the shared parse cache.
+    """
+    from parsing.bulk_ingest import ingest_pdfs
+    from parsing.parse_cache import default_parse_cache
+
+    pdf_jobs = {}
+    for job in jobs:
+        if "error" in job:
+            continue
+        if isinstance(job.get("resume_text"), str):
+            job["_resume"] = job["resume_text"]
+            continue
+        path = job.get("resume_path")
+        if not path:
+            job["error"] = "Job needs 'resume_path' or 'resume_text'."
+        elif path.lower().endswith(".pdf"):
+            pdf_jobs.setdefault(path, []).append(job)
+        else:
+            try:
+                with open(path, encoding="utf-8", errors="ignore") as f:
+                    job["_resume"] = f.read()
+            except OSError as e:
+                job["error"] = f"{type(e).__name__}: {e}"
+
+    if pdf_jobs:
+        for result in ingest_pdfs(list(pdf_jobs), workers=workers, cache=default_parse_cache):
+            for job in pdf_jobs[result.doc_id]:
+                if result.error is not None:
+                    job["error"] = f"Resume parsing failed: {result.error}"
+                else:
+                    job["_resume"] = result.text
+
+
+def resolve_jds(jobs, workers):
+    """
+    Fills job["_jd"] with the JD text (or job["error"]) for every job that needs one.
+    URLs are fetched concurrently; jd_text is the fallback if a URL yields nothing.
+    """
+    needs_jd = [job for job in jobs if "error" not in job
+                and any(name != "improve" for name in job["analyses"])]
+    urls = {}
+    for job in needs_jd:
+        if job.get("jd_url"):
+            urls.setdefault(job["jd_url"], []).append(job)
+        elif isinstance(job.get("jd_text"), str) and job["jd_text"].strip():
+            job["_jd"] = job["jd_text"].strip()
+        else:
+            job["error"] = "Job needs 'jd_url' or 'jd_text'."
+
+    if urls:
+        from parsing.jd_bulk_fetch import JDFetcher
+
+        with JDFetcher(max_workers=max(workers, 4)) as fetcher:
+            for result in fetcher.fetch_many(list(urls)):
+                for job in urls[result.url]:
+                    if result.text:
+                        job["_jd"] = result.text
+                    elif isinstance(job.get("jd_text"), str) and job["jd_text"].strip():
+                        job["_jd"] = job["jd_text"].strip()
+                    else:
+                        job["error"] = f"JD fetch failed: {result.error}"
+
+
+def canonicalize_documents(jobs, dedup):
+    """
+    Replaces each job's resume and JD text with the first near-duplicate copy seen in
+    this run (if any), and notes the substitution in the record under "duplicate_of".
+    A duplicate whose first copy's text is no longer held keeps its own text.
+
+    Args:
+        jobs (list[dict]): The chunk, after resolve_resumes / resolve_jds.
+        dedup (dict): kind ("resume", "jd") -> DedupIndex, shared across chunks; kinds
+            left out are never substituted.
+    """
+    for job in jobs:
+        if "error" in job:
+            continue
+        for kind, field, source in (("resume", "_resume", job.get("resume_path")),
+                                    ("jd", "_jd", job.get("jd_url"))):
+            if field not in job or kind not in dedup:
+                continue
+            # The path/URL identifies a document across jobs; inline text is per job
+            doc_id = source or f"{job['job_id']}:{kind}"
+            canonical_id, canonical_text, similarity = dedup[kind].canonicalize(doc_id, job[field])
+            if canonical_id != doc_id and canonical_text is not None:
+                job[field] = canonical_text
+                job["_result"].setdefault("duplicate_of", {})[kind] = {"id": canonical_id,
+                                                                       "similarity": round(similarity, 3)}
+
+
+def run_embedding_analyses(jobs, batch_size):
+    """
+    Adds "similarity" and "chunked_similarity" results, encoding every text the chunk
+    needs in one batched call.
+    """
+    import numpy as np
+
+    from matching.matcher import compute_chunked_similarity_matrix, encode_texts
+
+    plain = [job for job in jobs if "error" not in job and "similarity" in job["analyses"]]
+    if plain:
+        try:
+            texts = [text for job in plain for text in (job["_resume"], job["_jd"])]
+            vectors = encode_texts(texts, batch_size=batch_size)
+            scores = np.sum(vectors[0::2] * vectors[1::2], axis=1)
+            for job, score in zip(plain, scores):
+                job["_result"]["similarity"] = float(score)
+        except Exception as e:
+            for job in plain:
+                job["_result"]["similarity_error"] = f"{type(e).__name__}: {e}"
+
+    chunked = [job for job in jobs if "error" not in job and "chunked_similarity" in job["analyses"]]
+    if chunked:
+        resumes = list(dict.fromkeys(job["_resume"] for job in chunked))
+        jds = list(dict.fromkeys(job["_jd"] for job in chunked))
+        matrix = compute_chunked_similarity_matrix(resumes, jds, batch_size=batch_size)
+        row_of = {text: i for i, text in enumerate(resumes)}
+        column_of = {text: j for j, text in enumerate(jds)}
+        for job in chunked:
+            if matrix is None:
+                job["_result"]["chunked_similarity_error"] = "Chunked similarity failed."
+            else:
+                job["_result"]["chunked_similarity"] = float(matrix[row_of[job["_resume"]], column_of[job["_jd"]]])
+
+
+def run_llm_analyses(jobs, scheduler):
+    """
+    Adds "llm_match" / "improve" results, running every LLM call of the chunk
+    concurrently through the scheduler.
+
+    Returns:
+        int: LLM calls saved because several jobs made the same request.
+    """
+    from llm.prompts import parse_match_score
+    from llm.scheduler import LLMJob
+
+    # Identical requests in a chunk (e.g. duplicates mapped to one copy) are sent once:
+    # run concurrently, every copy would miss the response cache
+    requests = {}
+    for position, job in enumerate(jobs):
+        if "error" in job:
+            continue
+        if "llm_match" in job["analyses"]:
+            requests.setdefault(("match", job["_resume"], job["_jd"]), []).append((position, "llm_match"))
+        if "improve" in job["analyses"]:
+            requests.setdefault(("improve", job["_resume"], None), []).append((position, "improve"))
+    llm_jobs = [LLMJob(key, kind, resume_text, jd_text) for key, (kind, resume_text, jd_text) in
+                enumerate(requests)]
+    targets = list(requests.values())
+    for result in scheduler.run(llm_jobs):
+        for position, name in targets[result.job_id]:
+            entry = {"text": result.text, "error": result.error, "cached": result.cached}
+            if name == "llm_match":
+                entry["score"] = parse_match_score(result.text) if result.text else None
+            jobs[position]["_result"][name] = entry
+    return sum(len(positions) for positions in targets) - len(targets)
+
+
+def run_skill_analyses(jobs, workers):
+    """Skill overlap (no LLM call) for jobs that ask for it, with one nlp.pipe over the chunk."""
+    targets = [job for job in jobs if "error" not in job and "skills" in job["analyses"]]
+    if not targets:
+        return
+    try:
+        from parsing.skill_extraction import get_skill_extractor, skill_overlap
+
+        extractor = get_skill_extractor()
+        extractor.n_process = max(1, min(workers, len(targets) // extractor.batch_size))
+        features = extractor.extract_many([job[key] for job in targets for key in ("_resume", "_jd")])
+        for i, job in enumerate(targets):
+            job["_result"]["skills"] = skill_overlap(features[2 * i], features[2 * i + 1])
+    except Exception as e:
+        for job in targets:
+            job["_result"].pop("skills", None)
+            job["_result"]["skills_error"] = f"{type(e).__name__}: {e}"
+
+
+def process_chunk(jobs, options, scheduler, dedup=None, stats=None):
+    """
+    Runs every requested analysis for one chunk of jobs.
+
+    Args:
+        jobs (list[dict]): The chunk.
+        options (argparse.Namespace): workers and batch_size are used.
+        scheduler (LLMScheduler): Runs the LLM analyses.
+        dedup (dict, optional): kind ("resume", "jd") -> DedupIndex, to score
+            near-duplicates as their first copy. Defaults to None (no dedup).
+        stats (dict, optional): "llm_calls_saved" is added to it.
+
+    Returns:
+        list[dict]: One output record per job, in input order.
+    """
+    from matching.lexical import get_common_keywords
+
+    for job in jobs:
+        job["_result"] = {}
+    resolve_resumes(jobs, options.workers)
+    resolve_jds(jobs, options.workers)
+    if dedup is not None:
+        canonicalize_documents(jobs, dedup)
+    run_embedding_analyses(jobs, options.batch_size)
+    for job in jobs:
+        if "error" not in job and "keywords" in job["analyses"]:
+            job["_result"]["keywords"] = get_common_keywords(job["_resume"], job["_jd"])
+    run_skill_analyses(jobs, options.workers)
+    llm_calls_saved = run_llm_analyses(jobs, scheduler)
+    if stats is not None:
+        stats["llm_calls_saved"] = stats.get("llm_calls_saved", 0) + llm_calls_saved
+
+    records = []
+    for job in jobs:
+        record = {"job_id": job["job_id"]}
+        if "error" in job:
+            record["error"] = job["error"]
+        else:
+            record.update(job["_result"])
+            # Analyses report failure as "<name>_error" or as an "error" inside their entry
+            failed_analyses = [name for name in job["analyses"] if f"{name}_error" in job["_result"]
+                               or (isinstance(job["_result"].get(name), dict) and job["_result"][name].get("error"))]
+            if failed_analyses:
+                record["failed_analyses"] = failed_analyses
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score resume/JD jobs from a JSONL file.")
+    parser.add_argument("input", help="JSONL file of jobs.")
+    parser.add_argument("output", help="JSONL file to append results to (also the checkpoint).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="PDF parsing processes, JD download threads and concurrent LLM calls.")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Jobs held in memory at a time.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per embedding forward pass.")
+    parser.add_argument("--analyses", nargs="+", choices=ANALYSES, default=list(DEFAULT_ANALYSES),
+                        help="Analyses for jobs that don't list their own.")
+    parser.add_argument("--rpm", type=int, default=60, help="LLM requests-per-minute budget.")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Don't skip jobs already in the output file.")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Run jobs again whose checkpointed record is an error or has failed analyses.")
+    parser.add_argument("--dedup", nargs="*", choices=("jd", "resume"), default=None, metavar="KIND",
+                        help="Score near-duplicate documents of these kinds as their first copy "
+                             "(MinHash/LSH); with no kinds, JDs only.")
+    parser.add_argument("--dedup-threshold", type=float, default=None,
+                        help="Estimated Jaccard similarity that counts as a duplicate "
+                             "(default 0.9 for JDs, 0.98 for resumes).")
+    parser.add_argument("--log-level", default="INFO")
+    options = parser.parse_args()
+    logging.basicConfig(level=options.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from llm.scheduler import LLMScheduler
+
+    completed = set() if options.no_resume else load_completed_ids(options.output, not options.retry_failed)
+    if completed:
+        logger.info("Resuming: %d jobs already in %s will be skipped.", len(completed), options.output)
+
+    scheduler = LLMScheduler(max_concurrency=options.workers, requests_per_minute=options.rpm)
+    dedup = None
+    if options.dedup is not None or options.dedup_threshold is not None:
+        from matching.dedup import DedupIndex
+
+        kinds = options.dedup or ["jd"]
+        dedup = {kind: DedupIndex(options.dedup_threshold, label=kind) for kind in dict.fromkeys(kinds)}
+    stats = {}
+    jobs = (job for job in iter_jobs(options.input, options.analyses) if job["job_id"] not in completed)
+    written = failed = 0
+    start = time.perf_counter()
+    with _open_output(options.output) as out:
+        for chunk in iter_chunks(jobs, options.chunk_size):
+            for record in process_chunk(chunk, options, scheduler, dedup, stats):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                written += 1
+                failed += _record_failed(record)
+            # A finished chunk is durable before the next one starts
+            out.flush()
+            os.fsync(out.fileno())
+            logger.info("%d jobs written (%d failed), %.1f jobs/s.", written, failed,
+                        written / (time.perf_counter() - start))
+    logger.info("Done: %d jobs written, %d failed, %d skipped from checkpoint.", written, failed, len(completed))
+    if stats.get("llm_calls_saved"):
+        logger.info("%d LLM calls saved by identical requests.", stats["llm_calls_saved"])
+    if dedup is not None:
+        for kind, index in dedup.items():
+            index_stats = index.stats()
+            logger.info("Dedup (%s): %d of %d documents were near-duplicates (%.0f%% of their work avoided).",
+                        kind, index_stats["duplicates"], index_stats["documents"],
+                        100 * index_stats["avoided_fraction"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_inference_backends.py
+
+# Embedding throughput of each CPU inference backend (matching.inference_backends),
+# reported as docs/sec and docs/sec per core, with cosine agreement to the fp32
+# torch reference. The embedding cache is bypassed: models are called directly.
+# Documents are the sample PDFs' text, repeated and re-mixed up to --docs.
+#
+# Usage:
+#   python benchmarks/bench_inference_backends.py --threads 1 2 4
+#   python benchmarks/bench_inference_backends.py --backends torch onnx --docs 512 --json
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from matching.inference_backends import (INFERENCE_BACKENDS, cosine_agreement,  # noqa: E402
+                                         load_embedding_backend)
+from matching.matcher import EMBEDDING_MODEL_NAME  # noqa: E402
+from parsing.resume_parser import extract_pdf_text  # noqa: E402
+
+
+def sample_documents(n_docs, seed):
+    # Paragraphs of the sample resumes and JDs, shuffled into documents of varied length
+    paragraphs = []
+    for path in sorted(glob.glob(os.path.join(PROJECT_ROOT, "samples", "*.pdf"))):
+        text, _ = extract_pdf_text(path, verbose=False)
+        paragraphs.extend(p.strip() for p in (text or "").split("\n\n") if p.strip())
+    if not paragraphs:
+        sys.exit("No sample text found under samples/.")
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(paragraphs, k=rng.randint(1, 6))) for _ in range(n_docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding inference backends on CPU.")
+    parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS), choices=INFERENCE_BACKENDS)
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+    parser.add_argument("--docs", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    import torch
+
+    documents = sample_documents(args.docs, args.seed)
+    reference = load_embedding_backend(EMBEDDING_MODEL_NAME, "torch")
+    rows = []
+    for backend in args.backends:
+        try:
+            model = reference if backend == "torch" else load_embedding_backend(EMBEDDING_MODEL_NAME, backend)
+        except Exception as e:
+            rows.append({"backend": backend, "error": f"{type(e).__name__}: {e}"})
+            continue
+        agreement = cosine_agreement(model, reference)
+        for threads in args.threads:
+            # torch's pool can be resized at any time; onnxruntime fixes its pool per session
+            torch.set_num_threads(threads)
+            if backend == "onnx":
+                model = load_embedding_backend(EMBEDDING_MODEL_NAME, backend, num_threads=threads)
+            model.encode(documents[:args.batch_size], batch_size=args.batch_size, show_progress_bar=False)
+            start = time.perf_counter()
+            model.encode(documents, batch_size=args.batch_size, show_progress_bar=False)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                "backend": backend,
+                "threads": threads,
+                "docs_per_sec": args.docs / elapsed,
+                "docs_per_sec_per_core": args.docs / elapsed / threads,
+                "min_cosine_agreement": float(agreement.min()),
+                "mean_cosine_agreement": float(agreement.mean()),
+            })
+
+    if args.json:
+        print(json.dumps({"model": EMBEDDING_MODEL_NAME, "docs": args.docs, "results": rows}, indent=2))
+        return
+    print(f"{EMBEDDING_MODEL_NAME}: {args.docs} docs, batch size {args.batch_size}")
+    print(f"{'backend':<11} {'threads':>7} {'docs/s':>9} {'docs/s/core':>12} {'min cos':>8}")
+    for row in rows:
+        if "error" in row:
+            print(f"{row['backend']:<11} unavailable: {row['error']}")
+            continue
+        print(f"{row['backend']:<11} {row['threads']:>7} {row['docs_per_sec']:>9.1f} "
+              f"{row['docs_per_sec_per_core']:>12.1f} {row['min_cosine_agreement']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
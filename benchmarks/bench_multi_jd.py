@@ -0,0 +1,91 @@
+# benchmarks/bench_multi_jd.py
+
+# One resume against many JDs: per-JD match calls vs batched multi-JD requests.
+# Runs on the fake LLM backend (no API key, no paid tokens) and reports round-trips,
+# prompt tokens sent and wall time for each mode, plus the batched mode with injected
+# malformed JSON to show the cost of the per-JD fallback.
+#
+# Usage:
+#   python benchmarks/bench_multi_jd.py --jds 10 --latency 0.5
+#   python benchmarks/bench_multi_jd.py --jds 40 --malformed-rate 0.2 --json
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from llm.fake_backend import FakeLLMBackend  # noqa: E402
+from llm.multi_jd import MultiJDEvaluator  # noqa: E402
+from llm.scheduler import LLMJob, LLMScheduler  # noqa: E402
+from run_benchmarks import load_samples, synthesize_corpus  # noqa: E402
+
+
+def run_per_jd(resume, jds, latency, concurrency):
+    backend = FakeLLMBackend(latency=latency)
+    scheduler = LLMScheduler(backend=backend, max_concurrency=concurrency, requests_per_minute=None, use_cache=False)
+    start = time.perf_counter()
+    results = list(scheduler.run(LLMJob(i, "match", resume, jd) for i, jd in enumerate(jds)))
+    wall = time.perf_counter() - start
+    return {"round_trips": backend.stats()["calls"], "prompt_tokens": backend.stats()["prompt_tokens"],
+            "wall_seconds": wall, "failed": sum(r.error is not None for r in results)}
+
+
+def run_batched(resume, jds, latency, concurrency, malformed_rate, max_group_size, context_tokens):
+    backend = FakeLLMBackend(latency=latency, malformed_json_rate=malformed_rate)
+    scheduler = LLMScheduler(backend=backend, max_concurrency=concurrency, requests_per_minute=None, use_cache=False)
+    evaluator = MultiJDEvaluator(scheduler=scheduler, max_group_size=max_group_size, context_tokens=context_tokens)
+    start = time.perf_counter()
+    results = evaluator.evaluate(resume, jds)
+    wall = time.perf_counter() - start
+    return {"round_trips": backend.stats()["calls"], "prompt_tokens": backend.stats()["prompt_tokens"],
+            "wall_seconds": wall, "failed": sum(r.error is not None for r in results),
+            "groups": evaluator.stats["groups"], "fallback_jds": evaluator.stats["fallback_jds"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched multi-JD LLM evaluation.")
+    parser.add_argument("--jds", type=int, default=10, help="JDs to evaluate the resume against.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM seconds per request.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight (1 = like the app).")
+    parser.add_argument("--max-group-size", type=int, default=10)
+    parser.add_argument("--context-tokens", type=int, default=24000)
+    parser.add_argument("--malformed-rate", type=float, default=0.5,
+                        help="Share of batched answers returned as broken JSON in the fallback run.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        samples = load_samples()
+    resume = samples["resume_texts"][0]
+    jds = synthesize_corpus(samples["jd_texts"], args.jds, seed=1, prefix="Job")
+
+    report = {
+        "jds": args.jds,
+        "per_jd": run_per_jd(resume, jds, args.latency, args.concurrency),
+        "batched": run_batched(resume, jds, args.latency, args.concurrency, 0.0,
+                               args.max_group_size, args.context_tokens),
+        "batched_with_fallback": run_batched(resume, jds, args.latency, args.concurrency, args.malformed_rate,
+                                             args.max_group_size, args.context_tokens),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    baseline = report["per_jd"]
+    print(f"{args.jds} JDs, {args.latency:.2f}s per request, concurrency {args.concurrency}")
+    print(f"{'mode':<24}{'round-trips':>12}{'prompt tokens':>15}{'wall s':>9}{'fallback':>10}")
+    for mode in ("per_jd", "batched", "batched_with_fallback"):
+        row = report[mode]
+        print(f"{mode:<24}{row['round_trips']:>12}{row['prompt_tokens']:>15}{row['wall_seconds']:>9.2f}"
+              f"{row.get('fallback_jds', '-'):>10}")
+    saved = 1 - report["batched"]["prompt_tokens"] / baseline["prompt_tokens"]
+    print(f"batched: {saved:.0%} fewer prompt tokens, "
+          f"{baseline['wall_seconds'] / report['batched']['wall_seconds']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
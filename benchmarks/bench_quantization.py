@@ -0,0 +1,117 @@
+# benchmarks/bench_quantization.py
+
+# Compares float32, float16 and int8 embedding storage: memory, scoring speed and the
+# score / top-k deviation from float32. By default it uses synthetic clustered unit
+# vectors (no model needed); --texts-dir encodes real .txt documents instead.
+# It also times exact search on a memory-mapped VectorIndex saved in each format.
+#
+# Usage:
+#   python benchmarks/bench_quantization.py --docs 200000 --queries 50
+#   python benchmarks/bench_quantization.py --texts-dir data/resumes_txt --json
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from matching.quantization import STORAGE_DTYPES, quantization_report  # noqa: E402
+from matching.vector_index import VectorIndex  # noqa: E402
+
+
+def synthetic_vectors(n_docs, n_queries, dim, n_topics, seed):
+    # Documents cluster around topics, like resumes around job families
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    docs = topics[rng.integers(0, n_topics, n_docs)] + 0.6 * rng.normal(size=(n_docs, dim)).astype(np.float32)
+    queries = topics[rng.integers(0, n_topics, n_queries)] + 0.6 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+    docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return docs, queries
+
+
+def encoded_vectors(texts_dir, n_queries, seed):
+    from matching.matcher import encode_texts
+
+    texts = []
+    for path in sorted(glob.glob(os.path.join(texts_dir, "*.txt"))):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            texts.append(f.read())
+    vectors = encode_texts(texts)
+    if vectors is None:
+        sys.exit("Embedding model not available.")
+    rng = np.random.default_rng(seed)
+    return vectors, vectors[rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)]
+
+
+def mmap_search_timings(docs, queries, k):
+    # Exact search latency per query on an index loaded with mmap=True
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for storage_dtype in STORAGE_DTYPES:
+            index = VectorIndex(docs.shape[1], capacity=len(docs), storage_dtype=storage_dtype)
+            index.add(range(len(docs)), docs)
+            path = os.path.join(tmp, storage_dtype)
+            index.save(path)
+            loaded = VectorIndex.load(path, mmap=True)
+            loaded.search(queries[:1], k=k)  # fault the pages in once
+            start = time.perf_counter()
+            for query in queries:
+                loaded.search(query, k=k)
+            rows.append({
+                "storage_dtype": storage_dtype,
+                "file_bytes": sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)),
+                "mean_search_ms": (time.perf_counter() - start) * 1000 / len(queries),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized embedding storage.")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--texts-dir", default=None, help="Encode the .txt files here instead of synthetic data.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    if args.texts_dir:
+        docs, queries = encoded_vectors(args.texts_dir, args.queries, args.seed)
+    else:
+        docs, queries = synthetic_vectors(args.docs, args.queries, args.dim, args.topics, args.seed)
+
+    report = {
+        "docs": int(docs.shape[0]),
+        "queries": int(queries.shape[0]),
+        "dim": int(docs.shape[1]),
+        "k": args.k,
+        "scoring": quantization_report(docs, queries, k=args.k),
+        "mmap_search": mmap_search_timings(docs, queries, args.k),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['docs']} docs x {report['queries']} queries, dim {report['dim']}, k={args.k}")
+    print(f"{'dtype':<8} {'MiB':>8} {'saved':>7} {'score ms':>9} {'speedup':>8} {'max err':>9} {'recall@k':>9}")
+    for row in report["scoring"]:
+        print(f"{row['storage_dtype']:<8} {row['bytes'] / 2**20:>8.1f} {row['memory_saved_pct']:>6.1f}% "
+              f"{row['score_ms']:>9.1f} {row['speedup']:>8.2f} {row['max_abs_score_error']:>9.5f} "
+              f"{row['recall_at_k']:>9.4f}")
+    print("\nMemory-mapped exact search:")
+    for row in report["mmap_search"]:
+        print(f"{row['storage_dtype']:<8} {row['file_bytes'] / 2**20:>8.1f} MiB on disk  "
+              f"{row['mean_search_ms']:>8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
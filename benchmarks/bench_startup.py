@@ -0,0 +1,111 @@
+# benchmarks/bench_startup.py
+
+# Measures cold-import time of the backend modules and, optionally, model load times.
+# Every measurement runs in a fresh interpreter so nothing is already imported.
+#
+# Usage:
+#   python benchmarks/bench_startup.py                # cold import timings
+#   python benchmarks/bench_startup.py --warm         # also time loading the models
+#   python benchmarks/bench_startup.py --repeat 10 --json
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+MODULES = (
+    "matching.matcher",
+    "llm.client",
+    "parsing.resume_parser",
+    "parsing.jd_parser",
+)
+
+# Child script: import the module and report the elapsed wall-clock time in seconds
+_IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+# Child script: import the matcher, then load both models through the registry
+_WARM_SNIPPET = """
+import json, sys
+sys.path.insert(0, {src!r})
+import model_registry
+import matching.matcher
+results = model_registry.warm()
+print(json.dumps({{name: (value if isinstance(value, float) else repr(value)) for name, value in results.items()}}))
+"""
+
+
+def _run_child(code):
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"child exited with {completed.returncode}")
+    # Module-level prints may come first; the measurement is always the last line
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def measure_imports(repeat):
+    """
+    Returns {module: {"median_ms", "min_ms", "max_ms"}} (or {"error": ...}) per module.
+    """
+    results = {}
+    for module in MODULES:
+        try:
+            samples = [float(_run_child(_IMPORT_SNIPPET.format(src=SRC_PATH, module=module))) * 1000
+                       for _ in range(repeat)]
+        except RuntimeError as e:
+            results[module] = {"error": str(e).splitlines()[-1]}
+            continue
+        results[module] = {
+            "median_ms": statistics.median(samples),
+            "min_ms": min(samples),
+            "max_ms": max(samples),
+        }
+    return results
+
+
+def measure_warm():
+    """
+    Returns {resource_name: load_seconds or error repr} from model_registry.warm().
+    """
+    return json.loads(_run_child(_WARM_SNIPPET.format(src=SRC_PATH)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the matcher backend.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (default 5).")
+    parser.add_argument("--warm", action="store_true", help="Also time loading the embedding and LLM models.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "imports": measure_imports(args.repeat)}
+    if args.warm:
+        report["model_load_seconds"] = measure_warm()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Cold import time ({args.repeat} fresh interpreters each):")
+    for module, stats in report["imports"].items():
+        if "error" in stats:
+            print(f"  {module:<24} failed: {stats['error']}")
+        else:
+            print(f"  {module:<24} median {stats['median_ms']:8.1f} ms   (min {stats['min_ms']:.1f}, max {stats['max_ms']:.1f})")
+    if args.warm:
+        print("Model load time:")
+        for name, value in report["model_load_seconds"].items():
+            print(f"  {name:<24} {value if isinstance(value, str) else f'{value:.2f} s'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# benchmarks/load_test_jd_fetch.py
+
+# Exercises parsing.jd_bulk_fetch.JDFetcher against local stand-in job sites.
+# Each "host" is an http.server on 127.0.0.1 (its own port, so its own per-host pool
+# and limiter) serving a mix of pages:
+#   /ok/<n>       200 with a small job posting (every page takes --page-seconds)
+#   /flaky/<n>    503 for the first --flaky-failures requests, then 200
+#   /limited/<n>  429 with Retry-After: --retry-after on the first request, then 200
+#   /slow/<n>     answers after --slow-seconds (longer than --read-timeout -> timeout)
+#   /gone/<n>     404, which must not be retried
+# The servers log every request, so the report shows retries, how long the fetcher
+# waited after each 429, the highest concurrency and shortest gap between request
+# starts each host saw, and whether they stayed within the configured limits.
+# No network is needed; the extractor is a tag stripper instead of newspaper3k.
+#
+# Usage:
+#   python benchmarks/load_test_jd_fetch.py --urls 60 --per-host-rate 20 --per-host-concurrency 2
+#   python benchmarks/load_test_jd_fetch.py --hosts 1 --retry-after 0.5 --slow-seconds 1.5 --read-timeout 0.5
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from parsing.jd_bulk_fetch import JDFetcher  # noqa: E402
+
+PAGE_KINDS = ("ok", "flaky", "limited", "slow", "gone")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+class StandInSite:
+    """
+    One local job site: a threaded HTTP server plus a log of the requests it received.
+    """
+
+    def __init__(self, flaky_failures=2, retry_after=0.3, slow_seconds=1.0, page_seconds=0.02):
+        self.page_seconds = page_seconds
+        self.flaky_failures = flaky_failures
+        self.retry_after = retry_after
+        self.slow_seconds = slow_seconds
+        self.lock = threading.Lock()
+        self.requests = []  # (path, start time, status)
+        self.hits = {}  # path -> requests so far
+        # Slow pages are left out: a handler keeps sleeping after the client has timed
+        # out, so the server can't tell when the fetcher freed that slot
+        self.active = 0
+        self.max_active = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, path):
+        # Returns (status, headers, body, delay) for a request and records it
+        kind = path.strip("/").split("/")[0]
+        with self.lock:
+            hit = self.hits[path] = self.hits.get(path, 0) + 1
+            if kind != "slow":
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+        page = (f"<html><body><h1>Job {path}</h1><p>Data engineer. Python, SQL and Airflow; "
+                f"3+ years of experience.</p></body></html>").encode("utf-8")
+        if kind == "flaky" and hit <= self.flaky_failures:
+            response = 503, {}, b"busy", self.page_seconds
+        elif kind == "limited" and hit == 1:
+            response = 429, {"Retry-After": str(self.retry_after)}, b"slow down", self.page_seconds
+        elif kind == "slow":
+            response = 200, {}, page, self.slow_seconds
+        elif kind in PAGE_KINDS and kind != "gone":
+            response = 200, {}, page, self.page_seconds
+        else:
+            response = 404, {}, b"not found", self.page_seconds
+        with self.lock:
+            self.requests.append((path, time.monotonic(), response[0]))
+        return response
+
+    def finished(self, path):
+        if not path.startswith("/slow/"):
+            with self.lock:
+                self.active -= 1
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, headers, body, delay = site.respond(self.path)
+                try:
+                    if delay:
+                        time.sleep(delay)
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (read timeout)
+                finally:
+                    site.finished(self.path)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def strip_tags(url, html):
+    return " ".join(_TAG_RE.sub(" ", html).split())
+
+
+def site_report(site, per_host_rate):
+    starts = sorted(start for _, start, _ in site.requests)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    # Gap between each 429 and the next request for the same page: the honoured Retry-After
+    waits = []
+    for i, (path, start, status) in enumerate(site.requests):
+        if status == 429:
+            later = [s for p, s, _ in site.requests[i + 1:] if p == path]
+            if later:
+                waits.append(later[0] - start)
+    return {
+        "requests": len(site.requests),
+        "max_concurrent": site.max_active,  # excluding slow pages
+        "min_start_gap_ms": min(gaps) * 1000 if gaps else None,
+        "expected_min_gap_ms": 1000 / per_host_rate if per_host_rate else 0.0,
+        "retry_after_waits_s": [round(wait, 3) for wait in waits],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test the JD fetcher against local stand-in job sites.")
+    parser.add_argument("--urls", type=int, default=40, help="URLs to fetch, spread over the page kinds.")
+    parser.add_argument("--hosts", type=int, default=2, help="Stand-in sites (each is its own host).")
+    parser.add_argument("--max-workers", type=int, default=16)
+    parser.add_argument("--per-host-concurrency", type=int, default=2)
+    parser.add_argument("--per-host-rate", type=float, default=20.0)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--flaky-failures", type=int, default=2, help="503s before a flaky page answers.")
+    parser.add_argument("--retry-after", type=float, default=0.3, help="Retry-After seconds sent with 429.")
+    parser.add_argument("--page-seconds", type=float, default=0.05, help="Server time per normal page.")
+    parser.add_argument("--slow-seconds", type=float, default=1.0)
+    parser.add_argument("--read-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    sites = [StandInSite(args.flaky_failures, args.retry_after, args.slow_seconds, args.page_seconds).start()
+             for _ in range(args.hosts)]
+    urls = [f"{sites[i % len(sites)].base_url}/{PAGE_KINDS[i % len(PAGE_KINDS)]}/{i}" for i in range(args.urls)]
+    fetcher = JDFetcher(max_workers=args.max_workers, per_host_concurrency=args.per_host_concurrency,
+                        per_host_rate=args.per_host_rate, read_timeout=args.read_timeout,
+                        max_retries=args.max_retries, backoff_base=0.05, backoff_max=2.0, extractor=strip_tags)
+
+    start = time.perf_counter()
+    try:
+        with fetcher:
+            results = list(fetcher.fetch_many(urls))
+    finally:
+        for site in sites:
+            site.stop()
+    elapsed = time.perf_counter() - start
+
+    by_kind = {}
+    for result in results:
+        kind = result.url.split("/")[3]
+        summary = by_kind.setdefault(kind, {"urls": 0, "succeeded": 0, "attempts": 0, "errors": {}})
+        summary["urls"] += 1
+        summary["succeeded"] += result.text is not None
+        summary["attempts"] += result.attempts
+        if result.error:
+            error_type = result.error.split(":")[0]
+            summary["errors"][error_type] = summary["errors"].get(error_type, 0) + 1
+
+    hosts = [site_report(site, args.per_host_rate) for site in sites]
+    # The limiter spaces request starts in the fetcher; arrivals at the server jitter by
+    # a few milliseconds of connection and thread scheduling, hence the 20% slack
+    checks = {
+        "all_urls_have_results": len(results) == len(urls),
+        "flaky_pages_recovered": by_kind.get("flaky", {}).get("succeeded") == by_kind.get("flaky", {}).get("urls"),
+        "rate_limited_pages_recovered": (by_kind.get("limited", {}).get("succeeded")
+                                         == by_kind.get("limited", {}).get("urls")),
+        "retry_after_honoured": all(wait >= args.retry_after - 0.01
+                                    for host in hosts for wait in host["retry_after_waits_s"]),
+        "slow_pages_timed_out": by_kind.get("slow", {}).get("succeeded", 0) == 0
+                                if args.slow_seconds > args.read_timeout else True,
+        "gone_pages_not_retried": by_kind.get("gone", {}).get("attempts") == by_kind.get("gone", {}).get("urls"),
+        "per_host_concurrency_respected": all(host["max_concurrent"] <= args.per_host_concurrency
+                                              for host in hosts),
+        "per_host_rate_respected": all(host["min_start_gap_ms"] is None
+                                       or host["min_start_gap_ms"] >= 0.8 * host["expected_min_gap_ms"]
+                                       for host in hosts),
+    }
+    report = {"urls": len(urls), "wall_seconds": elapsed, "by_kind": by_kind, "hosts": hosts, "checks": checks}
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
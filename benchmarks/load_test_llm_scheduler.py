@@ -0,0 +1,65 @@
+# benchmarks/load_test_llm_scheduler.py
+
+# Load test for llm.scheduler.LLMScheduler against the deterministic fake backend.
+# No API key or network is needed; the response cache is bypassed so every job
+# really goes through the scheduler.
+#
+# Usage:
+#   python benchmarks/load_test_llm_scheduler.py --jobs 500 --concurrency 16 --rpm 1200 --failure-rate 0.1
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from llm.fake_backend import FakeLLMBackend  # noqa: E402
+from llm.scheduler import LLMJob, LLMScheduler  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the LLM scheduler with a fake model.")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=None, help="Requests-per-minute budget (default unlimited).")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens-per-minute budget (default unlimited).")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model seconds per call.")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = FakeLLMBackend(latency=args.latency, jitter=args.jitter,
+                             failure_rate=args.failure_rate, seed=args.seed)
+    scheduler = LLMScheduler(backend=backend, max_concurrency=args.concurrency,
+                             requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                             backoff_base=0.05, backoff_max=2.0, use_cache=False)
+    jobs = [LLMJob(i, "match", f"Resume {i}: Python, SQL, {i % 13} years experience.",
+                   f"JD {i % 10}: Data engineer with Python and SQL.")
+            for i in range(args.jobs)]
+
+    start = time.perf_counter()
+    results = list(scheduler.run(jobs))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r.latency * 1000 for r in results)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    report = {
+        "jobs": len(results),
+        "succeeded": sum(r.error is None for r in results),
+        "failed": sum(r.error is not None for r in results),
+        "retries": sum(max(0, r.attempts - 1) for r in results),
+        "wall_seconds": elapsed,
+        "jobs_per_second": len(results) / elapsed if elapsed else None,
+        "latency_ms": {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]},
+        "tokens": sum(r.tokens for r in results),
+        "backend": backend.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/load_test_service.py
+
+# Load test for matching_service.py.
+# By default it starts the service in-process on a free port with a fake encoder (a
+# fixed per-call overhead plus a per-text cost, like a real forward pass) and the fake
+# LLM backend, so micro-batching can be measured without a model or API key. Pass
+# --real-encoder to use the actual embedding model, or --url to load-test a service
+# that is already running.
+#
+# Usage:
+#   python benchmarks/load_test_service.py --requests 2000 --concurrency 32
+#   python benchmarks/load_test_service.py --max-wait-ms 0 --max-batch-size 1   # no batching, for comparison
+#   python benchmarks/load_test_service.py --url http://127.0.0.1:8080 --endpoint /llm/match
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+
+def make_fake_encoder(overhead_ms, per_text_ms, dim=384):
+    # Deterministic unit vectors; the sleep models a forward pass whose fixed cost batching amortizes
+    def encode(texts):
+        time.sleep((overhead_ms + per_text_ms * len(texts)) / 1000.0)
+        vectors = np.empty((len(texts), dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+            vectors[i] = np.random.default_rng(seed).normal(size=dim)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return encode
+
+
+def start_local_service(args):
+    from llm.fake_backend import FakeLLMBackend
+    from matching_service import MatchingService, create_server
+
+    encode_fn = None if args.real_encoder else make_fake_encoder(args.encode_overhead_ms, args.encode_per_text_ms)
+    service = MatchingService(encode_fn=encode_fn, llm_backend=FakeLLMBackend(latency=args.llm_latency),
+                              max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                              llm_concurrency=args.concurrency, requests_per_minute=None).start()
+    service.scheduler.cache = None  # measure the backend, not the response cache
+    server = create_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, service, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def request_body(endpoint, i):
+    resume = f"Candidate {i}: Python, SQL and Spark engineer with {i % 12} years of experience."
+    jd = f"Job {i % 50}: Data engineer, Python and SQL required."
+    if endpoint == "/llm/improve":
+        return {"resume_text": resume}
+    return {"resume_text": resume, "jd_text": jd}
+
+
+def worker(base_url, endpoint, indices, latencies, errors):
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+    for i in indices:
+        body = json.dumps(request_body(endpoint, i))
+        start = time.perf_counter()
+        try:
+            connection.request("POST", endpoint, body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except Exception as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+
+
+def histogram_means(snapshot, name):
+    # Mean of each recorded histogram with this name (e.g. texts per micro-batch)
+    return {json.dumps(h["labels"]) if h["labels"] else "all": h["sum"] / h["count"]
+            for h in snapshot["histograms"] if h["name"] == name and h["count"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the matching service.")
+    parser.add_argument("--url", default=None, help="Service to test (default: start one in-process).")
+    parser.add_argument("--endpoint", default="/similarity", choices=["/similarity", "/llm/match", "/llm/improve"])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--real-encoder", action="store_true", help="Use the real embedding model in-process.")
+    parser.add_argument("--encode-overhead-ms", type=float, default=8.0, help="Fake encoder cost per call.")
+    parser.add_argument("--encode-per-text-ms", type=float, default=0.5, help="Fake encoder cost per text.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds per call.")
+    args = parser.parse_args()
+
+    server = service = None
+    base_url = args.url
+    if base_url is None:
+        server, service, base_url = start_local_service(args)
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=worker, args=(base_url, args.endpoint,
+                                                     range(t, args.requests, args.concurrency), latencies, errors))
+               for t in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    connection.request("GET", "/metrics.json")
+    snapshot = json.loads(connection.getresponse().read())
+    connection.close()
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(json.dumps({
+        "endpoint": args.endpoint,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": args.concurrency,
+        "wall_seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else None,
+        "latency_ms": {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]},
+        "mean_texts_per_batch": histogram_means(snapshot, "microbatch_size"),
+        "mean_requests_per_batch": histogram_means(snapshot, "microbatch_requests"),
+    }, indent=2))
+
+    if server is not None:
+        server.shutdown()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
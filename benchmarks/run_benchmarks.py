@@ -0,0 +1,371 @@
+# benchmarks/run_benchmarks.py
+
+# End-to-end benchmark suite built on the bundled samples.
+# Times PDF parsing, JD text handling, embedding similarity (pairwise and batched)
+# and the LLM path against the local fake model, over corpora synthesized from
+# samples/*.pdf at several scales. Results (throughput and p50/p95/p99 latency) are
+# written as JSON; two result files can be compared, failing on regressions.
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py --scales 1 10 50 --output results.json
+#   python benchmarks/run_benchmarks.py --only parse llm --output current.json
+#   python benchmarks/run_benchmarks.py --compare baseline.json current.json --threshold 0.15
+#   python benchmarks/run_benchmarks.py --compare baseline.json      # run now, then compare
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_DIR = os.path.join(PROJECT_ROOT, "samples")
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+BENCHMARKS = ("parse", "jd", "embedding_pairwise", "embedding_batched", "embedding_edit", "llm_matcher",
+              "llm_scheduler")
+
+
+# --- Corpus synthesis ---
+def load_samples():
+    """
+    Reads the bundled sample PDFs.
+
+    Returns:
+        dict: {"resume_paths", "jd_paths", "resume_texts", "jd_texts"}.
+    """
+    from parsing.resume_parser import extract_pdf_text
+
+    resume_paths = sorted(glob.glob(os.path.join(SAMPLES_DIR, "Resume_*.pdf")))
+    jd_paths = sorted(glob.glob(os.path.join(SAMPLES_DIR, "JD*.pdf")))
+    return {
+        "resume_paths": resume_paths,
+        "jd_paths": jd_paths,
+        "resume_texts": [extract_pdf_text(path, verbose=False)[0] for path in resume_paths],
+        "jd_texts": [extract_pdf_text(path, verbose=False)[0] for path in jd_paths],
+    }
+
+
+def synthesize_corpus(texts, n_docs, seed=0, prefix="Document"):
+    """
+    Builds `n_docs` distinct documents by re-mixing the lines of `texts`.
+
+    Each document takes one source text as its skeleton, swaps a fraction of its lines
+    for lines from the other sources and gets a unique header, so lengths and vocabulary
+    stay realistic while no two documents (or cache keys) are identical.
+    """
+    rng = random.Random(seed)
+    sources = [[line for line in text.splitlines() if line.strip()] for text in texts if text]
+    pool = [line for lines in sources for line in lines]
+    corpus = []
+    for i in range(n_docs):
+        lines = list(sources[i % len(sources)])
+        for j in range(len(lines)):
+            if rng.random() < 0.3:
+                lines[j] = rng.choice(pool)
+        corpus.append(f"{prefix} {i}\n" + "\n".join(lines))
+    return corpus
+
+
+# --- Measurement ---
+def summarize(latencies, wall_seconds, items):
+    """
+    Turns per-call latencies (seconds) into the JSON summary of one benchmark.
+    """
+    latencies_ms = np.asarray(latencies, dtype=np.float64) * 1000
+    return {
+        "items": items,
+        "calls": int(latencies_ms.size),
+        "wall_seconds": wall_seconds,
+        "throughput_per_sec": items / wall_seconds if wall_seconds else None,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()),
+            "p50": float(np.percentile(latencies_ms, 50)),
+            "p95": float(np.percentile(latencies_ms, 95)),
+            "p99": float(np.percentile(latencies_ms, 99)),
+        },
+    }
+
+
+def time_calls(fn, args_list, items=None):
+    """
+    Calls fn(*args) for every entry of `args_list`, timing each call.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for args in args_list:
+        call_start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - call_start)
+    wall = time.perf_counter() - start
+    return summarize(latencies, wall, items if items is not None else len(args_list))
+
+
+# --- Benchmarks ---
+def bench_parse(samples, scale, repeat):
+    from parsing.resume_parser import parse_resume
+
+    paths = (samples["resume_paths"] + samples["jd_paths"]) * scale * repeat
+    return time_calls(parse_resume, [(path,) for path in paths])
+
+
+def bench_jd(samples, scale, repeat):
+    from parsing.jd_parser import extract_jd_text_from_html, jd_parser
+
+    jd_texts = synthesize_corpus(samples["jd_texts"], len(samples["jd_texts"]) * scale, prefix="Job")
+    pages = [(f"https://jobs.example.com/{i}",
+              "<html><head><title>Job</title></head><body><article>"
+              + "".join(f"<p>{line}</p>" for line in text.splitlines()) + "</article></body></html>")
+             for i, text in enumerate(jd_texts)]
+    return {
+        "manual_text": time_calls(lambda text: jd_parser(manual_text=text), [(t,) for t in jd_texts] * repeat),
+        "html_extraction": time_calls(extract_jd_text_from_html, pages * repeat),
+    }
+
+
+def _fresh_embedding_cache():
+    # Cold, memory-only cache so every run measures the model rather than the disk cache
+    from matching import matcher
+    from matching.embedding_cache import EmbeddingCache
+
+    if matcher.get_embedding_model() is None:
+        # The similarity functions return None instead of raising; don't time that
+        raise RuntimeError("Embedding model not available.")
+    matcher.embedding_cache = EmbeddingCache(cache_dir=None)
+
+
+def bench_embedding_pairwise(samples, scale, repeat):
+    from matching.matcher import compute_embedding_similarity
+
+    resumes = synthesize_corpus(samples["resume_texts"], len(samples["resume_texts"]) * scale, prefix="Candidate")
+    jds = synthesize_corpus(samples["jd_texts"], len(resumes), seed=1, prefix="Job")
+    results = []
+    for _ in range(repeat):
+        _fresh_embedding_cache()
+        results.append(time_calls(compute_embedding_similarity, list(zip(resumes, jds))))
+    return _best(results)
+
+
+def bench_embedding_batched(samples, scale, repeat):
+    from matching.matcher import compute_embedding_similarity_matrix
+
+    resumes = synthesize_corpus(samples["resume_texts"], len(samples["resume_texts"]) * scale, prefix="Candidate")
+    jds = synthesize_corpus(samples["jd_texts"], len(samples["jd_texts"]) * scale, seed=1, prefix="Job")
+    results = []
+    for _ in range(repeat):
+        _fresh_embedding_cache()
+        # One call scores every pair; throughput is counted in resume-JD pairs
+        results.append(time_calls(compute_embedding_similarity_matrix, [(resumes, jds)],
+                                  items=len(resumes) * len(jds)))
+    return _best(results)
+
+
+def bench_llm_matcher(samples, scale, repeat, latency):
+    from llm import client
+    from llm.fake_backend import FakeLLMBackend
+    from matching.matcher import match_resume_with_jd_llm
+
+    resumes = synthesize_corpus(samples["resume_texts"], len(samples["resume_texts"]) * scale, prefix="Candidate")
+    jd = samples["jd_texts"][0]
+    client.set_model(FakeLLMBackend(latency=latency))
+    try:
+        return time_calls(lambda text: match_resume_with_jd_llm(text, jd, use_cache=False),
+                          [(text,) for text in resumes] * repeat)
+    finally:
+        client.set_model(None)
+
+
+def bench_llm_scheduler(samples, scale, repeat, latency):
+    from llm.fake_backend import FakeLLMBackend
+    from llm.scheduler import LLMJob, LLMScheduler
+
+    resumes = synthesize_corpus(samples["resume_texts"], len(samples["resume_texts"]) * scale, prefix="Candidate")
+    jd = samples["jd_texts"][0]
+    scheduler = LLMScheduler(backend=FakeLLMBackend(latency=latency), max_concurrency=8,
+                             requests_per_minute=None, use_cache=False)
+    jobs = [LLMJob(i, "match", text, jd) for i, text in enumerate(resumes * repeat)]
+    start = time.perf_counter()
+    results = list(scheduler.run(jobs))
+    wall = time.perf_counter() - start
+    return summarize([r.latency for r in results], wall, len(results))
+
+
+def bench_embedding_edit(samples, scale, repeat):
+    from matching.matcher import compute_embedding_similarity, compute_incremental_similarity
+
+    # Re-scoring after a one-line edit: full re-encode vs recomposing from cached chunks
+    resumes = synthesize_corpus(samples["resume_texts"], len(samples["resume_texts"]) * scale, prefix="Candidate")
+    jds = synthesize_corpus(samples["jd_texts"], len(resumes), seed=1, prefix="Job")
+    edited = []
+    for text in resumes:
+        lines = text.splitlines()
+        lines.insert(len(lines) // 2, "* Mentored two junior engineers and led weekly design reviews.")
+        edited.append("\n".join(lines))
+    results = {"full": [], "incremental": []}
+    for _ in range(repeat):
+        for part, fn in (("full", compute_embedding_similarity), ("incremental", compute_incremental_similarity)):
+            _fresh_embedding_cache()
+            time_calls(fn, list(zip(resumes, jds)))  # the versions before the edit
+            results[part].append(time_calls(fn, list(zip(edited, jds))))
+    return {part: _best(runs) for part, runs in results.items()}
+
+
+def _best(results):
+    # Best of the repeats: the least disturbed by other activity on the machine
+    return max(results, key=lambda r: r["throughput_per_sec"] or 0)
+
+
+def run_suite(only, scales, repeat, llm_latency):
+    """
+    Runs the selected benchmarks at every scale.
+
+    Returns:
+        dict: {"meta": {...}, "results": {"<benchmark>@<scale>x": summary, ...}}.
+            A benchmark that cannot run (missing model or library) records {"error": ...}.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        samples = load_samples()
+    runners = {
+        "parse": lambda scale: bench_parse(samples, scale, repeat),
+        "jd": lambda scale: bench_jd(samples, scale, repeat),
+        "embedding_pairwise": lambda scale: bench_embedding_pairwise(samples, scale, repeat),
+        "embedding_batched": lambda scale: bench_embedding_batched(samples, scale, repeat),
+        "embedding_edit": lambda scale: bench_embedding_edit(samples, scale, repeat),
+        "llm_matcher": lambda scale: bench_llm_matcher(samples, scale, repeat, llm_latency),
+        "llm_scheduler": lambda scale: bench_llm_scheduler(samples, scale, repeat, llm_latency),
+    }
+    results = {}
+    for name in only:
+        for scale in scales:
+            label = f"{name}@{scale}x"
+            print(f"Running {label}...", file=sys.stderr)
+            try:
+                # Keep stdout clean for the JSON report; module output goes to stderr
+                with contextlib.redirect_stdout(sys.stderr):
+                    summary = runners[name](scale)
+            except Exception as e:
+                summary = {"error": f"{type(e).__name__}: {e}"}
+            if isinstance(summary, dict) and "items" not in summary and "error" not in summary:
+                # Benchmarks with several parts report each under its own label
+                for part, part_summary in summary.items():
+                    results[f"{name}.{part}@{scale}x"] = part_summary
+            else:
+                results[label] = summary
+    return {"meta": _run_metadata(repeat, llm_latency), "results": results}
+
+
+def _run_metadata(repeat, llm_latency):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "llm_fake_latency": llm_latency,
+    }
+
+
+# --- Comparison ---
+def compare_runs(baseline, current, threshold=0.10):
+    """
+    Compares two suite results benchmark by benchmark.
+
+    A benchmark regresses if its throughput drops, or its p95 latency rises, by more
+    than `threshold` (a fraction; 0.10 = 10%). A benchmark that worked in the baseline
+    but errored or is missing in the current run has failed, which also counts as a
+    regression. Benchmarks new in the current run, or that errored in the baseline,
+    are listed as skipped.
+
+    Returns:
+        tuple[list[dict], bool]: One row per benchmark, and whether any regressed or failed.
+    """
+    rows = []
+    for label in sorted(set(baseline["results"]) | set(current["results"])):
+        old = baseline["results"].get(label)
+        new = current["results"].get(label)
+        if not old or "error" in old:
+            rows.append({"benchmark": label, "status": "skipped"})
+            continue
+        if not new or "error" in new:
+            rows.append({"benchmark": label, "status": "failed",
+                         "error": new["error"] if new else "missing from the current run"})
+            continue
+        throughput_change = _relative_change(old["throughput_per_sec"], new["throughput_per_sec"])
+        p95_change = _relative_change(old["latency_ms"]["p95"], new["latency_ms"]["p95"])
+        regressed = ((throughput_change is not None and throughput_change < -threshold)
+                     or (p95_change is not None and p95_change > threshold))
+        rows.append({
+            "benchmark": label,
+            "status": "regressed" if regressed else "ok",
+            "throughput_change": throughput_change,
+            "p95_latency_change": p95_change,
+        })
+    return rows, any(row["status"] in ("regressed", "failed") for row in rows)
+
+
+def _relative_change(old, new):
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+
+def _load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite.")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10],
+                        help="Corpus sizes as multiples of the bundled samples.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Fake LLM seconds per call.")
+    parser.add_argument("--output", default=None, help="Write the results JSON here (default stdout).")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="BASELINE [CURRENT]: compare two result files; with one file, run "
+                             "the suite now and compare against it.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed relative regression before failing. Defaults to 0.10.")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one current result file.")
+    if args.compare and len(args.compare) == 2:
+        current = _load_json(args.compare[1])
+    else:
+        current = run_suite(args.only, args.scales, args.repeat, args.llm_latency)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+        elif not args.compare:
+            print(json.dumps(current, indent=2))
+
+    if args.compare:
+        baseline = _load_json(args.compare[0])
+        if len(args.compare) == 1:
+            # Benchmarks left out with --only/--scales weren't run, so they can't have failed
+            run = {f"{name}@{scale}x" for name in args.only for scale in args.scales}
+            baseline["results"] = {label: result for label, result in baseline["results"].items()
+                                   if re.sub(r"\.[^@]*@", "@", label) in run}
+        rows, regressed = compare_runs(baseline, current, args.threshold)
+        print(json.dumps({"threshold": args.threshold, "regressed": regressed, "benchmarks": rows}, indent=2))
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# matching_service.py
+
+# Long-lived HTTP matching service.
+# Every Streamlit process and batch job used to load its own torch + MiniLM and encode
+# each request alone. This service keeps one warm embedding model, funnels all
+# encode work through a micro-batcher (concurrent requests share model calls), and
+# runs LLM analyses through the shared rate-limited scheduler and response cache.
+#
+# Endpoints (JSON in, JSON out):
+#   POST /similarity   {"resume_text", "jd_text"}               -> {"score"}
+#                      {"pairs": [[resume_text, jd_text], ...]} -> {"scores": [...]}
+#   POST /encode       {"texts": [...]}                          -> {"vectors": [[...], ...]}
+#   POST /llm/match    {"resume_text", "jd_text"}                -> {"text", "score", "error", "cached"}
+#   POST /llm/improve  {"resume_text"}                           -> {"text", "error", "cached"}
+#   GET  /healthz                                                -> {"status", "embedding_model", ...}
+#   GET  /metrics      Prometheus text (latency and batch-size histograms); /metrics.json as JSON
+#
+# Usage:
+#   python matching_service.py --port 8080 --max-batch-size 64 --max-wait-ms 5
+#   curl -s localhost:8080/similarity -d '{"resume_text": "...", "jd_text": "..."}'
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+import instrumentation  # noqa: E402
+from llm.prompts import parse_match_score  # noqa: E402
+from llm.scheduler import LLMJob, LLMScheduler  # noqa: E402
+from matching.microbatch import MicroBatcher  # noqa: E402
+
+logger = logging.getLogger("matching_service")
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class MatchingService:
+    """
+    The scoring logic behind the HTTP handlers; usable in-process as well.
+    """
+
+    def __init__(self, encode_fn=None, llm_backend=None, max_batch_size=64, max_wait_ms=5.0,
+                 llm_concurrency=8, requests_per_minute=60):
+        """
+        Args:
+            encode_fn (callable, optional): texts -> unit vectors. Defaults to the matcher's
+                cached encode_texts on the shared embedding model.
+            llm_backend (optional): Object with generate_content(prompt). Defaults to Gemini.
+            max_batch_size (int, optional): Texts per micro-batch. Defaults to 64.
+            max_wait_ms (float, optional): Micro-batch collection window. Defaults to 5.
+            llm_concurrency (int, optional): LLM calls in flight at once. Defaults to 8.
+            requests_per_minute (int, optional): LLM request budget. Defaults to 60.
+        """
+        self.uses_default_encoder = encode_fn is None
+        self.batcher = MicroBatcher(encode_fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.scheduler = LLMScheduler(backend=llm_backend, max_concurrency=llm_concurrency,
+                                      requests_per_minute=requests_per_minute)
+        # run_one executes on the request thread; this bounds how many do so at once
+        self._llm_slots = threading.BoundedSemaphore(llm_concurrency)
+        self.started_at = None
+        self.embedding_load_seconds = None
+
+    def start(self):
+        """Loads the embedding model (unless a custom encoder is used) and starts batching."""
+        if self.uses_default_encoder:
+            from matching.matcher import warm_embedding_model
+
+            self.embedding_load_seconds = warm_embedding_model()
+            if self.embedding_load_seconds is None:
+                logger.error("Embedding model failed to load; /similarity and /encode will return errors.")
+        self.batcher.start()
+        self.started_at = time.time()
+        return self
+
+    def stop(self):
+        self.batcher.stop()
+
+    def health(self):
+        return {
+            "status": "ok",
+            "embedding_model": "custom" if not self.uses_default_encoder else
+                               ("loaded" if self.embedding_load_seconds is not None else "unavailable"),
+            "embedding_load_seconds": self.embedding_load_seconds,
+            "uptime_seconds": time.time() - self.started_at if self.started_at else None,
+        }
+
+    # --- Scoring ---
+    def similarity(self, pairs):
+        """Cosine similarity for each (resume_text, jd_text) pair, via one batched encode."""
+        texts = [text for pair in pairs for text in pair]
+        vectors = self.batcher.encode(texts)
+        return np.sum(vectors[0::2] * vectors[1::2], axis=1).astype(float).tolist()
+
+    def encode(self, texts):
+        return self.batcher.encode(texts)
+
+    def llm(self, kind, resume_text, jd_text=None):
+        with self._llm_slots:
+            result = self.scheduler.run_one(LLMJob(None, kind, resume_text, jd_text))
+        response = {"text": result.text, "error": result.error, "cached": result.cached}
+        if kind == "match":
+            response["score"] = parse_match_score(result.text) if result.text else None
+        return response
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by create_server
+    protocol_version = "HTTP/1.1"  # keep-alive for load tests and clients that pool
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/healthz":
+            self._timed(path, lambda: (200, self.service.health()))
+        elif path == "/metrics":
+            self._send(200, instrumentation.export_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        elif path == "/metrics.json":
+            self._send_json(200, instrumentation.snapshot())
+        else:
+            self._send_json(404, {"error": f"Unknown path {path}"})
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        routes = {
+            "/similarity": self._similarity,
+            "/encode": self._encode,
+            "/llm/match": lambda body: self._llm("match", body),
+            "/llm/improve": lambda body: self._llm("improve", body),
+        }
+        route = routes.get(path)
+        if route is None:
+            self.close_connection = True  # the unread body would be parsed as the next request
+            self._send_json(404, {"error": f"Unknown path {path}"})
+            return
+        self._timed(path, lambda: route(self._read_json()))
+
+    # --- Routes ---
+    def _similarity(self, body):
+        if "pairs" in body:
+            pairs = body["pairs"]
+            if not isinstance(pairs, list) or not all(isinstance(pair, list) and len(pair) == 2 and all(isinstance(t, str) for t in pair)
+                       for pair in pairs):
+                return 400, {"error": "'pairs' must be a list of [resume_text, jd_text] string pairs."}
+            return 200, {"scores": self.service.similarity(pairs)}
+        resume_text, jd_text = body.get("resume_text"), body.get("jd_text")
+        if not isinstance(resume_text, str) or not isinstance(jd_text, str):
+            return 400, {"error": "'resume_text' and 'jd_text' must be strings."}
+        return 200, {"score": self.service.similarity([(resume_text, jd_text)])[0]}
+
+    def _encode(self, body):
+        texts = body.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return 400, {"error": "'texts' must be a list of strings."}
+        return 200, {"vectors": self.service.encode(texts).tolist()}
+
+    def _llm(self, kind, body):
+        resume_text, jd_text = body.get("resume_text"), body.get("jd_text")
+        if not isinstance(resume_text, str) or (kind == "match" and not isinstance(jd_text, str)):
+            return 400, {"error": "'resume_text' (and 'jd_text' for match) must be strings."}
+        response = self.service.llm(kind, resume_text, jd_text)
+        return (200 if response["error"] is None else 502), response
+
+    # --- Plumbing ---
+    def _timed(self, path, handler):
+        start = time.perf_counter()
+        try:
+            status, payload = handler()
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            logger.exception("Request to %s failed", path)
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send_json(status, payload)
+        instrumentation.observe("request_duration_seconds", time.perf_counter() - start,
+                                endpoint=path, status=status)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body is left unread, so this connection can't carry another request
+            self.close_connection = True
+            if length < 0:
+                raise ValueError("Invalid Content-Length.")
+            raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes.")
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object.")
+        return body
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - " + format, self.address_string(), *args)
+
+
+def create_server(service, host="127.0.0.1", port=8080):
+    """
+    Builds the HTTP server around a started MatchingService (port 0 picks a free port).
+    Enables instrumentation so /metrics has data.
+
+    Returns:
+        ThreadingHTTPServer: Call serve_forever() (or run it in a thread) and shutdown().
+    """
+    instrumentation.enable()
+    handler = type("MatchingHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the resume/JD matching service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=60, help="LLM requests-per-minute budget.")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    service = MatchingService(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                              llm_concurrency=args.llm_concurrency, requests_per_minute=args.rpm).start()
+    server = create_server(service, args.host, args.port)
+    logger.info("Matching service listening on http://%s:%s", args.host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# src/instrumentation.py
+
+# Timing spans and counters for the parse / fetch / encode / similarity / LLM paths.
+# Instrumentation is off unless INSTRUMENTATION=1 is set (or enable() is called).
+# While it is off, span() hands back one shared no-op context manager and the
+# counter functions return immediately, so instrumented code pays a function call
+# and nothing more.
+#
+# Usage:
+#   with instrumentation.span("encode", texts=len(texts)):
+#       ...
+#   instrumentation.incr("cache_hits_total", len(hits), cache="embedding")
+#   print(instrumentation.export_prometheus())   # or log_snapshot() for a JSON log line
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "resume_matcher_"
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                           2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = os.getenv("INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> _Histogram
+_help = {}  # name -> (type, bucket bounds)
+
+
+def enable(flag=True):
+    """Turns instrumentation on (or off with flag=False). Recorded data is kept."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    """True while spans and counters are being recorded."""
+    return _enabled
+
+
+def reset():
+    """Drops everything recorded so far."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _help.clear()
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def incr(name, value=1, **labels):
+    """
+    Adds `value` to a counter, e.g. incr("llm_tokens_total", 812, kind="prompt").
+    """
+    if not _enabled:
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _help.setdefault(name, ("counter", None))
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=DEFAULT_LATENCY_BUCKETS, **labels):
+    """
+    Records one value in a histogram. The bucket bounds are fixed by the first
+    observation of a metric name.
+    """
+    if not _enabled:
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        bounds = _help.setdefault(name, ("histogram", tuple(buckets)))[1]
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram(bounds)
+        histogram.observe(value)
+
+
+class _Span:
+    __slots__ = ("labels", "start")
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe("span_duration_seconds", time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            incr("span_errors_total", **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **labels):
+    """
+    Times a block as a named span. Durations go to the span_duration_seconds histogram
+    (labelled span=<name> plus `labels`); an exception leaving the block also counts
+    in span_errors_total. Returns a shared no-op object while disabled.
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    labels["span"] = name
+    return _Span(labels)
+
+
+# --- Export ---
+def snapshot():
+    """
+    Returns everything recorded so far as plain data (JSON-serializable).
+
+    Returns:
+        dict: {"counters": [{"name", "labels", "value"}, ...],
+               "histograms": [{"name", "labels", "count", "sum", "buckets": {le: cumulative}}, ...]}
+    """
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), histogram in sorted(_histograms.items(), key=lambda item: item[0]):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            histograms.append({"name": name, "labels": dict(labels), "count": histogram.count,
+                               "sum": histogram.sum, "buckets": buckets})
+    return {"counters": counters, "histograms": histograms}
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def export_prometheus():
+    """
+    Renders the recorded metrics in the Prometheus text exposition format (0.0.4).
+    """
+    data = snapshot()
+    lines = []
+    typed = set()
+    for counter in data["counters"]:
+        name = METRIC_PREFIX + counter["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(counter['labels'])} {counter['value']}")
+    for histogram in data["histograms"]:
+        name = METRIC_PREFIX + histogram["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        for bound, count in histogram["buckets"].items():
+            lines.append(f"{name}_bucket{_format_labels(histogram['labels'], {'le': bound})} {count}")
+        lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def log_snapshot(log=None, level=logging.INFO):
+    """
+    Writes the current snapshot as one JSON log line (to this module's logger by default).
+    """
+    (log or logger).log(level, json.dumps({"metrics": snapshot()}, separators=(",", ":")))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/metrics.json"):
+            self.send_error(404)
+            return
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(snapshot()).encode("utf-8"), "application/json"
+        else:
+            body, content_type = export_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics endpoint: " + format, *args)
+
+
+def start_metrics_server(port=9100, host="127.0.0.1"):
+    """
+    Serves /metrics (Prometheus text) and /metrics.json from a daemon thread, for
+    long-running workers such as batch jobs. Also enables instrumentation.
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() to stop it).
+    """
+    enable()
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Metrics endpoint listening on http://%s:%s/metrics", host, server.server_address[1])
+    return server
@@ -1,41 +1,93 @@
 # src/LLM/client.py
 
-import google.generativeai as genai
+import logging
 import os
-from dotenv import load_dotenv
 
-print("DEBUG: Starting src.LLM.client execution...") # Add print at very top
+import model_registry
 
-load_dotenv()
-api_key = os.getenv("GEMAI_API_KEY")
-model = None
+logger = logging.getLogger(__name__)
+
+# Ensure the model name is correct and available to your key
+MODEL_NAME = "gemini-1.5-pro-latest"
+
+
+def _load_gemini_model():
+    """
+    Configures Google GenAI and instantiates the Gemini model.
+    Runs on first use (through the model registry), not at import time.
+
+    Raises:
+        ValueError: If the GEMAI_API_KEY environment variable is not set.
+        RuntimeError: If configuring or instantiating the model fails.
+    """
+    # Imported here so importing this module stays cheap and works offline
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("GEMAI_API_KEY")
+    if not api_key:
+        raise ValueError("CRITICAL: GEMAI_API_KEY environment variable not found. Please check your .env file.")
 
-if not api_key:
-    print("ERROR in client.py: GEMAI_API_KEY environment variable not found.")
-    # --- RAISE AN ERROR ---
-    # This will stop execution and show up clearly
-    raise ValueError("CRITICAL: GEMAI_API_KEY environment variable not found. Please check your .env file.")
-else:
     try:
-        print("DEBUG in client.py: API Key found. Configuring Google GenAI...")
+        logger.debug("API key found. Configuring Google GenAI...")
         genai.configure(api_key=api_key)
 
-        print("DEBUG in client.py: Instantiating Gemini model...")
-        # Ensure the model name is correct and available to your key
-        model = genai.GenerativeModel("gemini-1.5-pro-latest")
-        print("✅ SUCCESS in client.py: Gemini client configured and model instantiated.")
-
+        logger.debug("Instantiating Gemini model %s...", MODEL_NAME)
+        model = genai.GenerativeModel(MODEL_NAME)
+        logger.info("Gemini client configured and model instantiated.")
+        return model
     except Exception as e:
-        print(f"ERROR in client.py: Failed to configure/instantiate Gemini model. Exception: {e}")
-        # --- RAISE AN ERROR ---
         # Wrap the original exception for more context
         raise RuntimeError(f"CRITICAL: Failed to configure/instantiate Gemini model: {e}") from e
 
+
+_llm_resource = model_registry.register("llm", _load_gemini_model)
+_override_model_name = None  # set when set_model() installs a non-Gemini model
+
+
 def get_model():
-    """Returns the instantiated GenerativeModel object, or None if setup failed."""
-    # This function now primarily relies on whether 'model' was successfully assigned above.
-    # The explicit checks for None happen where get_model() is called (e.g., in matcher.py)
-    print(f"DEBUG: get_model() called. Returning model object (type: {type(model)}).") # See what type it is
-    return model
+    """
+    Returns the GenerativeModel object, loading it on first call, or None if setup failed.
+    The explicit checks for None happen where get_model() is called (e.g., in matcher.py).
+    """
+    try:
+        return _llm_resource.get()
+    except Exception as e:
+        logger.error("LLM model unavailable: %s", e)
+        return None
+
+
+def set_model(model):
+    """
+    Replaces the Gemini model with another object exposing generate_content(prompt)
+    (e.g., llm.fake_backend.FakeLLMBackend for offline load tests and benchmarks).
+    Pass None to go back to loading Gemini on next use.
+    """
+    global _override_model_name
+    if model is None:
+        _override_model_name = None
+        _llm_resource.reset()
+    else:
+        _override_model_name = getattr(model, "model_name", type(model).__name__)
+        _llm_resource.set(model)
+
+
+def get_model_name():
+    """
+    Returns the name of the model get_model() serves, without loading it.
+    Response caches key on this, so a fake model's answers never mix with Gemini's.
+    """
+    return _override_model_name or MODEL_NAME
+
+
+def warm_model():
+    """
+    Loads the Gemini model ahead of first use.
 
-print("DEBUG: Finished src.LLM.client execution.") # Add print at very end
+    Returns:
+        float | None: Load time in seconds, or None if loading failed.
+    """
+    if get_model() is None:
+        return None
+    return _llm_resource.load_seconds
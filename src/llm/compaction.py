@@ -0,0 +1,303 @@
+# src/llm/compaction.py
+
+# Prompt compaction: shrinks resume and JD text before it goes into an LLM prompt.
+# parse_resume output repeats page headers/footers on every page (pages are separated
+# by PAGE_BREAK), and jd_parser page text carries site boilerplate (EEO statements,
+# cookie notices, "similar jobs" lists). Gemini latency and cost scale with prompt
+# tokens, so before prompting the text is whitespace-normalized, running headers/footers
+# and known boilerplate are dropped, and, if a token budget is set, whole sections are
+# kept in priority order until it is used up.
+
+import logging
+import os
+import re
+from collections import namedtuple
+
+import instrumentation
+from llm.prompts import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Token budgets per document for the match prompt; 0 means no trimming (only cleanup).
+# Set PROMPT_COMPACTION=0 to send the text exactly as parsed.
+COMPACTION_ENABLED = os.getenv("PROMPT_COMPACTION", "1") != "0"
+RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKEN_BUDGET", "3000"))
+JD_TOKEN_BUDGET = int(os.getenv("PROMPT_JD_TOKEN_BUDGET", "2000"))
+
+DOCUMENT_KINDS = ("resume", "jd")
+PAGE_BREAK = "\f"  # as in parsing.resume_parser
+# Non-blank lines at the top and bottom of each page where running headers/footers live
+PAGE_EDGE_LINES = 3
+
+# One result per compacted document.
+#   text:             the compacted text
+#   tokens_before:    estimated tokens of the input
+#   tokens_after:     estimated tokens of `text`
+#   removed_lines:    lines dropped as repeats or boilerplate
+#   dropped_sections: headings of sections left out (or cut short) to meet the budget
+CompactionResult = namedtuple("CompactionResult",
+                              ["text", "tokens_before", "tokens_after", "removed_lines", "dropped_sections"])
+
+# Lines that are site or document furniture rather than content
+BOILERPLATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"^page \d+( of \d+)?$",
+    r"^\d+\s*/\s*\d+$",
+    r"\b(we|this site|this website) uses? cookies\b",
+    r"\b(accept|manage) (all )?cookies\b",
+    r"\bequal (employment )?opportunity employer\b",
+    r"\bwithout regard to (race|age|color|religion)\b",
+    r"\bprotected (veteran|characteristic)s?\b",
+    r"\breasonable accommodations?\b.*\b(disabilit|application process)",
+    r"^(apply( now)?|save( job)?|share( this job)?|report (this )?job|sign in|log in|back to (search|jobs))$",
+    r"^(share on|follow us on) (linkedin|twitter|facebook)",
+    r"\ball rights reserved\b",
+    r"^(privacy policy|terms of (use|service))",
+)]
+
+# Headings after which the rest of a page is listing/navigation, not the posting
+TRAILER_PATTERN = re.compile(
+    r"^\W*(similar jobs|related jobs|more jobs (like this|from)|people also (viewed|applied)|"
+    r"recommended jobs|jobs you may like|explore more jobs)\W*$", re.IGNORECASE)
+
+# Section priorities for budget trimming: lower numbers are kept first. Sections whose
+# heading is not listed (and the text before the first heading) get DEFAULT_PRIORITY.
+DEFAULT_PRIORITY = 2
+SECTION_PRIORITIES = {
+    "resume": {
+        "summary": 0, "profile": 0, "objective": 1, "skills": 0, "technical skills": 0,
+        "experience": 0, "work experience": 0, "professional experience": 0, "employment": 0,
+        "projects": 1, "certifications": 1, "education": 1,
+        "publications": 3, "awards": 3, "volunteer": 3, "volunteering": 3, "languages": 3,
+        "interests": 4, "hobbies": 4, "references": 4,
+    },
+    "jd": {
+        "job title": 0, "responsibilities": 0, "requirements": 0, "qualifications": 0,
+        "what you'll do": 0, "what you will do": 0, "what we're looking for": 0, "must have": 0,
+        "preferred qualifications": 1, "nice to have": 1, "bonus": 1, "location": 1,
+        "about the role": 1, "about us": 3, "about the company": 3, "who we are": 3,
+        "benefits": 4, "perks": 4, "what we offer": 4, "compensation": 3,
+    },
+}
+
+# "**Responsibilities:**"-style labels, which PDFs and pages often run inline
+_INLINE_HEADING_RE = re.compile(r"\*\*([^*\n]{2,40}?):?\*\*:?")
+_HORIZONTAL_SPACE_RE = re.compile(r"[ \t\f\v\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_INVISIBLE_RE = re.compile(r"[\u200b-\u200d\u2060\ufeff]")
+
+
+def normalize_whitespace(text):
+    """
+    Collapses runs of spaces/tabs (including non-breaking and zero-width characters),
+    strips every line and squeezes blank lines to at most one.
+    """
+    text = _INVISIBLE_RE.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [_HORIZONTAL_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    squeezed = []
+    for line in lines:
+        if line or (squeezed and squeezed[-1]):
+            squeezed.append(line)
+    return "\n".join(squeezed).strip()
+
+
+def drop_repeated_lines(pages, min_chars=4, edge_lines=PAGE_EDGE_LINES):
+    """
+    Drops running page headers and footers: lines (compared case-insensitively) found
+    among the first `edge_lines` non-blank lines of at least half the pages (or the
+    last ones, for footers), and of two pages at least. The first copy is kept, and so
+    is every copy elsewhere on a page, so content that merely repeats (two roles
+    sharing a bullet) stays intact. Lines shorter than `min_chars` are never dropped.
+
+    Args:
+        pages (list[list[str]]): The lines of each page.
+
+    Returns:
+        tuple: (kept lines of all pages, number of lines dropped).
+    """
+    def edges(lines):
+        # line position -> "top" / "bottom"
+        filled = [i for i, line in enumerate(lines) if line]
+        positions = {i: "bottom" for i in filled[-edge_lines:]}
+        positions.update({i: "top" for i in filled[:edge_lines]})
+        return positions
+
+    page_edges = [edges(lines) for lines in pages]
+    pages_with = {}
+    for lines, positions in zip(pages, page_edges):
+        for key in {(edge, lines[i].casefold()) for i, edge in positions.items() if len(lines[i]) >= min_chars}:
+            pages_with[key] = pages_with.get(key, 0) + 1
+    furniture = {key for key, count in pages_with.items() if count >= max(2, (len(pages) + 1) // 2)}
+
+    seen = set()
+    kept, dropped = [], 0
+    for lines, positions in zip(pages, page_edges):
+        for i, line in enumerate(lines):
+            key = (positions.get(i), line.casefold())
+            if key in furniture:
+                if key in seen:
+                    dropped += 1
+                    continue
+                seen.add(key)
+            kept.append(line)
+    return kept, dropped
+
+
+def drop_boilerplate(lines):
+    """
+    Drops lines matching BOILERPLATE_PATTERNS and everything after a "similar jobs"
+    style trailer heading.
+
+    Returns:
+        tuple: (kept lines, number of lines dropped).
+    """
+    kept = []
+    for line in lines:
+        if TRAILER_PATTERN.match(line):
+            return kept, len(lines) - len(kept)
+        if line and any(pattern.search(line) for pattern in BOILERPLATE_PATTERNS):
+            continue
+        kept.append(line)
+    return kept, len(lines) - len(kept)
+
+
+def _heading_of(line, priorities):
+    # The normalized heading if this line is one of the known section headings, else None
+    label = line.strip("*#:-_ ").rstrip(":").strip().casefold()
+    return label if label in priorities else None
+
+
+def split_sections(text, kind):
+    """
+    Splits text into (heading, body) sections at known headings, either on their own
+    line or as inline "**Heading:**" labels. Text before the first heading comes first,
+    with heading None.
+    """
+    priorities = SECTION_PRIORITIES[kind]
+
+    def to_line(match):
+        return "\n" + match.group(0) + "\n" if match.group(1).strip().casefold() in priorities else match.group(0)
+
+    text = _INLINE_HEADING_RE.sub(to_line, text)
+    sections = [[None, []]]
+    for line in text.split("\n"):
+        heading = _heading_of(line, priorities) if line else None
+        if heading is not None:
+            sections.append([heading, [line.strip()]])
+        else:
+            sections[-1][1].append(line.strip())
+    return [(heading, "\n".join(lines).strip()) for heading, lines in sections
+            if heading is not None or "".join(lines).strip()]
+
+
+def trim_to_budget(sections, max_tokens, kind):
+    """
+    Fills `max_tokens` with sections in priority order (ties in document order); a
+    section that does not fit whole is cut at a line boundary to use what is left.
+    Kept sections stay in document order.
+
+    Returns:
+        tuple: (text, headings of the sections dropped or cut short).
+    """
+    priorities = SECTION_PRIORITIES[kind]
+    order = sorted(range(len(sections)),
+                   key=lambda i: (priorities.get(sections[i][0], DEFAULT_PRIORITY), i))
+    kept = {}
+    dropped = []
+    remaining = max_tokens
+    for i in order:
+        heading, body = sections[i]
+        cost = estimate_tokens(body) + 1  # +1 for the joining newline
+        if cost <= remaining:
+            kept[i] = body
+            remaining -= cost
+            continue
+        partial = []
+        for line in body.split("\n"):
+            line_cost = estimate_tokens(line) + 1
+            if line_cost > remaining:
+                break
+            partial.append(line)
+            remaining -= line_cost
+        if partial and (heading is None or len(partial) > 1):  # a heading alone is not worth keeping
+            kept[i] = "\n".join(partial)
+        dropped.append(heading or "(untitled)")
+    return "\n".join(kept[i] for i in sorted(kept)), dropped
+
+
+def compact_text(text, kind="resume", max_tokens=None):
+    """
+    Compacts one document for a prompt.
+
+    Args:
+        text (str): The parsed resume or JD text.
+        kind (str, optional): "resume" or "jd"; selects the section priorities.
+            Defaults to "resume".
+        max_tokens (int, optional): Token budget for the result; None or 0 only cleans up.
+
+    Returns:
+        CompactionResult: The compacted text and what was removed.
+
+    Raises:
+        ValueError: If `kind` is not one of DOCUMENT_KINDS.
+    """
+    if kind not in DOCUMENT_KINDS:
+        raise ValueError(f"Unsupported document kind '{kind}'. Choose one of {DOCUMENT_KINDS}.")
+    tokens_before = estimate_tokens(text)
+    pages = [normalize_whitespace(page).split("\n") for page in text.split(PAGE_BREAK)]
+    lines, repeated = drop_repeated_lines(pages)
+    lines, boilerplate = drop_boilerplate(lines)
+    compacted = normalize_whitespace("\n".join(lines))
+
+    dropped_sections = []
+    if max_tokens and estimate_tokens(compacted) > max_tokens:
+        compacted, dropped_sections = trim_to_budget(split_sections(compacted, kind), max_tokens, kind)
+    return CompactionResult(compacted, tokens_before, estimate_tokens(compacted),
+                            repeated + boilerplate, dropped_sections)
+
+
+def compact_match_inputs(resume_text, jd_text):
+    """
+    Compacts a resume and a JD for the match prompt with the configured budgets, and
+    reports the savings (log line and prompt_compaction_tokens_total counters).
+
+    Returns:
+        tuple: (resume CompactionResult, JD CompactionResult). With PROMPT_COMPACTION=0
+               the texts come back unchanged.
+    """
+    resume, (jd,) = compact_multi_match_inputs(resume_text, [jd_text])
+    return resume, jd
+
+
+def compact_multi_match_inputs(resume_text, jd_texts, report=True):
+    """
+    Like compact_match_inputs, for one resume and several JDs.
+
+    Args:
+        resume_text (str): The parsed resume.
+        jd_texts (list[str]): The JD texts.
+        report (bool, optional): Log and count the savings. Defaults to True.
+
+    Returns:
+        tuple: (resume CompactionResult, list of JD CompactionResults in input order).
+    """
+    if not COMPACTION_ENABLED:
+        return _unchanged(resume_text), [_unchanged(jd_text) for jd_text in jd_texts]
+    resume = compact_text(resume_text, "resume", RESUME_TOKEN_BUDGET)
+    jds = [compact_text(jd_text, "jd", JD_TOKEN_BUDGET) for jd_text in jd_texts]
+    if report:
+        jd_before = sum(jd.tokens_before for jd in jds)
+        jd_after = sum(jd.tokens_after for jd in jds)
+        dropped = resume.dropped_sections + [heading for jd in jds for heading in jd.dropped_sections]
+        for kind, before, after in (("resume", resume.tokens_before, resume.tokens_after),
+                                    ("jd", jd_before, jd_after)):
+            instrumentation.incr("prompt_compaction_tokens_total", before, doc=kind, stage="before")
+            instrumentation.incr("prompt_compaction_tokens_total", after, doc=kind, stage="after")
+        logger.info("Prompt compaction: resume %d -> %d tokens, %s %d -> %d tokens%s.",
+                    resume.tokens_before, resume.tokens_after,
+                    "JD" if len(jds) == 1 else f"{len(jds)} JDs", jd_before, jd_after,
+                    f" (dropped sections: {dropped})" if dropped else "")
+    return resume, jds
+
+
+def _unchanged(text):
+    tokens = estimate_tokens(text)
+    return CompactionResult(text, tokens, tokens, 0, [])
@@ -0,0 +1,173 @@
+# src/llm/fake_backend.py
+
+# Deterministic stand-in for the Gemini model.
+# Exposes the same generate_content(prompt) -> response.text surface as
+# google.generativeai.GenerativeModel (including stream=True), so the scheduler, the
+# matcher functions and the benchmarks can be exercised offline, repeatably, and under
+# load without paid tokens.
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from llm.prompts import estimate_tokens
+
+
+class FakeLLMBackend:
+    """
+    Fake generative model with configurable latency and failure injection.
+
+    The answer depends only on the prompt, so the same request always produces the
+    same text. Failures are drawn from a seeded RNG and raised as ConnectionError,
+    which the scheduler treats as transient (like a 503 from the real API).
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0, seed=0,
+                 output_tokens=120, model_name="fake-llm", chunk_words=8, chunk_delay=0.01,
+                 malformed_json_rate=0.0):
+        """
+        Args:
+            latency (float, optional): Base seconds per call. Defaults to 0.05.
+            jitter (float, optional): Extra uniformly random seconds per call. Defaults to 0.
+            failure_rate (float, optional): Probability that a call raises. Defaults to 0.
+            seed (int, optional): Seed for jitter and failure draws. Defaults to 0.
+            output_tokens (int, optional): Approximate size of each answer. Defaults to 120.
+            model_name (str, optional): Reported model name (keeps its cached responses
+                apart from real Gemini ones). Defaults to "fake-llm".
+            chunk_words (int, optional): Words per chunk when streaming. Defaults to 8.
+            chunk_delay (float, optional): Seconds between streamed chunks; `latency` is
+                then the time to the first chunk. Defaults to 0.01.
+            malformed_json_rate (float, optional): Probability that a JSON (multi-JD)
+                answer comes back truncated, to exercise parse fallbacks. Defaults to 0.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.output_tokens = output_tokens
+        self.model_name = model_name
+        self.chunk_words = chunk_words
+        self.chunk_delay = chunk_delay
+        self.malformed_json_rate = malformed_json_rate
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+
+    def generate_content(self, prompt, stream=False):
+        """
+        Returns a response object with `.text` and `.usage_metadata`, like Gemini.
+        With stream=True the response is iterable: it yields chunks with `.text` as they
+        are "generated", and `.text` / `.usage_metadata` are complete once it is consumed.
+
+        Raises:
+            ConnectionError: For injected (transient) failures.
+        """
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += estimate_tokens(prompt)
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate and self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+            malformed = self.malformed_json_rate and self._rng.random() < self.malformed_json_rate
+        if stream:
+            # Like Gemini, the request is only sent once iteration starts
+            return _FakeStream(self, prompt, delay, fail)
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("503 Service Unavailable (injected by FakeLLMBackend)")
+
+        text = self._answer(prompt)
+        if malformed and _MULTI_JD_RE.search(prompt):
+            text = text[:len(text) // 2]
+        return SimpleNamespace(text=text, usage_metadata=_usage(prompt, text), prompt_feedback=None)
+
+    def stats(self):
+        """Returns call, failure and prompt-token counters."""
+        with self._lock:
+            return {"calls": self.calls, "failures": self.failures, "prompt_tokens": self.prompt_tokens}
+
+    # --- Internal helpers ---
+    def _answer(self, prompt):
+        jd_blocks = _MULTI_JD_RE.findall(prompt)
+        if jd_blocks:
+            return self._json_answer(jd_blocks)
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        filler = " ".join(["detail"] * max(0, self.output_tokens - 40))
+        if "Match Score" in prompt:
+            score = seed % 101
+            return (
+                f"Match Score: {score}/100\n"
+                f"Explanation: The candidate matches about {score}% of the listed requirements. {filler}\n"
+                "Missing Factors:\n"
+                f"* Skill {seed % 7}\n"
+                f"* Skill {seed % 11}\n"
+            )
+        return (
+            f"Improvements and mistakes:\n* Tighten bullet {seed % 5}. {filler}\n"
+            f"Keywords and ATS:\n* Keyword {seed % 9}\n"
+            "Summary of changes:\nClearer wording and more keywords.\n"
+        )
+
+
+    def _json_answer(self, jd_blocks):
+        # One entry per "### JD-n" block of a multi-JD prompt, seeded by that JD's text
+        filler = " ".join(["detail"] * max(0, self.output_tokens // 2 - 20))
+        results = []
+        for label, jd_text in jd_blocks:
+            seed = int(hashlib.sha256(jd_text.encode("utf-8")).hexdigest()[:8], 16)
+            score = seed % 101
+            results.append({
+                "jd": label,
+                "match_score": score,
+                "explanation": f"The candidate matches about {score}% of the listed requirements. {filler}",
+                "missing_factors": [f"Skill {seed % 7}", f"Skill {seed % 11}"],
+            })
+        return json.dumps({"results": results})
+
+
+# "### JD-n" blocks of llm.prompts.build_multi_match_prompt
+_MULTI_JD_RE = re.compile(r"^### (JD-\d+)\n---\n(.*?)\n---$", re.MULTILINE | re.DOTALL)
+
+
+def _usage(prompt, text):
+    return SimpleNamespace(
+        prompt_token_count=estimate_tokens(prompt),
+        candidates_token_count=estimate_tokens(text),
+        total_token_count=estimate_tokens(prompt) + estimate_tokens(text),
+    )
+
+
+class _FakeStream:
+    """Streaming response of FakeLLMBackend; mirrors Gemini's iterable response."""
+
+    def __init__(self, backend, prompt, delay, fail):
+        self._backend = backend
+        self._prompt = prompt
+        self._delay = delay
+        self._fail = fail
+        self.text = ""
+        self.usage_metadata = None
+        self.prompt_feedback = None
+
+    def __iter__(self):
+        time.sleep(self._delay)
+        if self._fail:
+            raise ConnectionError("503 Service Unavailable (injected by FakeLLMBackend)")
+        text = self._backend._answer(self._prompt)
+        # Split on spaces but keep them, so the chunks concatenate back to the full text
+        words = text.split(" ")
+        step = max(1, self._backend.chunk_words)
+        for i in range(0, len(words), step):
+            if i:
+                time.sleep(self._backend.chunk_delay)
+            chunk = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+            self.text += chunk
+            yield SimpleNamespace(text=chunk)
+        self.usage_metadata = _usage(self._prompt, text)
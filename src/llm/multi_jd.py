@@ -0,0 +1,173 @@
+# src/llm/multi_jd.py
+
+# Batched evaluation of one resume against many job descriptions.
+# match_resume_with_jd_llm sends the full resume once per JD, so assessing a candidate
+# against 10 open roles costs 10 round-trips and 10 copies of the resume's tokens.
+# Here the JDs are packed into as few prompts as fit the context budget, each asking
+# for a JSON answer with one entry per JD. Entries that don't parse (or whole groups
+# that fail) fall back to ordinary per-JD match calls, so every JD gets a result.
+
+import logging
+from collections import namedtuple
+
+from llm.compaction import compact_multi_match_inputs
+from llm.prompts import build_multi_match_prompt, estimate_tokens, parse_match_analysis, parse_multi_match_response
+from llm.scheduler import LLMJob, LLMScheduler
+
+logger = logging.getLogger(__name__)
+
+# Input tokens allowed per batched request. Far below Gemini's window on purpose:
+# answer quality and latency both degrade on very long prompts.
+DEFAULT_CONTEXT_TOKENS = 24000
+# Output tokens allowed per batched request, and the share one JD's entry needs
+DEFAULT_MAX_OUTPUT_TOKENS = 8192
+OUTPUT_TOKENS_PER_JD = 200
+DEFAULT_MAX_GROUP_SIZE = 10
+
+# One result per JD.
+#   jd_id:           the id the JD was passed in with
+#   score:           match score 0-100, or None
+#   explanation:     short justification, or None
+#   missing_factors: list of skills/qualifications the resume lacks
+#   source:          "batch" (from a multi-JD answer) or "single" (per-JD fallback call)
+#   cached:          True if the answer came from the response cache
+#   error:           why no result could be produced, else None
+JDMatchResult = namedtuple("JDMatchResult", ["jd_id", "score", "explanation", "missing_factors",
+                                             "source", "cached", "error"])
+
+
+def plan_groups(resume_tokens, jd_tokens, context_tokens=DEFAULT_CONTEXT_TOKENS,
+                max_output_tokens=DEFAULT_MAX_OUTPUT_TOKENS, max_group_size=DEFAULT_MAX_GROUP_SIZE):
+    """
+    Packs JDs into groups (in input order) so each group's prompt fits the budgets.
+
+    Args:
+        resume_tokens (int): Tokens of the resume, paid once per group.
+        jd_tokens (list[int]): Tokens of each JD.
+        context_tokens (int, optional): Input budget per request, including the
+            instructions. Defaults to DEFAULT_CONTEXT_TOKENS.
+        max_output_tokens (int, optional): Output budget per request; each JD is assumed
+            to need OUTPUT_TOKENS_PER_JD. Defaults to DEFAULT_MAX_OUTPUT_TOKENS.
+        max_group_size (int, optional): JDs per request at most. Defaults to 10.
+
+    Returns:
+        list[list[int]]: Groups of JD positions. A JD too large to share a request gets
+                         a group of its own.
+    """
+    overhead = estimate_tokens(build_multi_match_prompt("", [""]))
+    max_size = max(1, min(max_group_size, max_output_tokens // OUTPUT_TOKENS_PER_JD))
+    groups, current, used = [], [], overhead + resume_tokens
+    for position, tokens in enumerate(jd_tokens):
+        cost = tokens + 10  # label and delimiters
+        if current and (len(current) >= max_size or used + cost > context_tokens):
+            groups.append(current)
+            current, used = [], overhead + resume_tokens
+        current.append(position)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+class MultiJDEvaluator:
+    """
+    Scores one resume against many JDs with as few LLM requests as possible.
+
+    Usage:
+        evaluator = MultiJDEvaluator()
+        for result in evaluator.evaluate(resume_text, {"backend-1": jd1, "data-2": jd2}):
+            print(result.jd_id, result.score, result.missing_factors)
+        evaluator.stats  # {"groups": ..., "fallback_jds": ..., "calls": ..., ...}
+    """
+
+    def __init__(self, backend=None, scheduler=None, context_tokens=DEFAULT_CONTEXT_TOKENS,
+                 max_output_tokens=DEFAULT_MAX_OUTPUT_TOKENS, max_group_size=DEFAULT_MAX_GROUP_SIZE):
+        """
+        Args:
+            backend (optional): Object with generate_content(prompt). Defaults to Gemini.
+            scheduler (LLMScheduler, optional): Runs the requests (rate limits, retries,
+                response cache). Defaults to a new one around `backend`.
+            context_tokens (int, optional): Input budget per batched request.
+            max_output_tokens (int, optional): Output budget per batched request.
+            max_group_size (int, optional): JDs per batched request at most. Defaults to 10.
+        """
+        self.scheduler = scheduler or LLMScheduler(backend=backend)
+        self.context_tokens = context_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_group_size = max_group_size
+        self.stats = {"jds": 0, "groups": 0, "batched_jds": 0, "fallback_jds": 0, "calls": 0,
+                      "tokens": 0, "cached": 0}
+
+    def evaluate(self, resume_text, jds):
+        """
+        Args:
+            resume_text (str): The text content of the resume.
+            jds (dict | list): jd_id -> JD text, or a list of JD texts (ids are positions).
+
+        Returns:
+            list[JDMatchResult]: One per JD, in input order.
+        """
+        items = list(jds.items()) if isinstance(jds, dict) else list(enumerate(jds))
+        if not items:
+            return []
+        jd_texts = [text for _, text in items]
+        # Size the groups on the text the scheduler will actually send
+        resume, compacted = compact_multi_match_inputs(resume_text, jd_texts, report=False)
+        groups = plan_groups(resume.tokens_after, [jd.tokens_after for jd in compacted],
+                             self.context_tokens, self.max_output_tokens, self.max_group_size)
+        self.stats["jds"] += len(items)
+        self.stats["groups"] += len(groups)
+
+        results = [None] * len(items)
+        group_jobs = [LLMJob(group_index, "multi_match", resume_text, tuple(jd_texts[p] for p in group))
+                      for group_index, group in enumerate(groups)]
+        for job_result in self.scheduler.run(group_jobs):
+            self._count(job_result)
+            group = groups[job_result.job_id]
+            parsed = {}
+            if job_result.text is not None:
+                try:
+                    parsed = parse_multi_match_response(job_result.text, len(group))
+                except ValueError as e:
+                    logger.warning("Multi-JD answer for %d JDs did not parse (%s); falling back to per-JD calls.",
+                                   len(group), e)
+            else:
+                logger.warning("Multi-JD request for %d JDs failed (%s); falling back to per-JD calls.",
+                               len(group), job_result.error)
+            for index_in_group, entry in parsed.items():
+                position = group[index_in_group]
+                results[position] = JDMatchResult(items[position][0], entry["score"], entry["explanation"],
+                                                  entry["missing_factors"], "batch", job_result.cached, None)
+            self.stats["batched_jds"] += len(parsed)
+
+        fallback = [position for position, result in enumerate(results) if result is None]
+        self.stats["fallback_jds"] += len(fallback)
+        single_jobs = [LLMJob(position, "match", resume_text, jd_texts[position]) for position in fallback]
+        for job_result in self.scheduler.run(single_jobs):
+            self._count(job_result)
+            position = job_result.job_id
+            analysis = parse_match_analysis(job_result.text)
+            results[position] = JDMatchResult(items[position][0], analysis["score"], analysis["explanation"],
+                                              analysis["missing_factors"], "single", job_result.cached,
+                                              job_result.error)
+        return results
+
+    def _count(self, job_result):
+        self.stats["calls"] += job_result.attempts
+        self.stats["tokens"] += job_result.tokens
+        self.stats["cached"] += job_result.cached
+
+
+def evaluate_resume_against_jds(resume_text, jds, **evaluator_options):
+    """
+    Convenience wrapper around MultiJDEvaluator.evaluate.
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jds (dict | list): jd_id -> JD text, or a list of JD texts.
+        **evaluator_options: Passed to MultiJDEvaluator (backend, context_tokens, ...).
+
+    Returns:
+        list[JDMatchResult]: One per JD, in input order.
+    """
+    return MultiJDEvaluator(**evaluator_options).evaluate(resume_text, jds)
@@ -0,0 +1,253 @@
+# src/llm/prompts.py
+
+# Prompt templates for the LLM analyses.
+# Kept in one place so every caller (matcher, response cache, scheduler) builds exactly
+# the same prompt. Bump the matching *_PROMPT_VERSION whenever a template changes:
+# cached responses are keyed on it, so old answers are not served for a new prompt.
+
+import json
+import re
+
+MATCH_PROMPT_VERSION = "match-v2"  # v2: resume/JD go through llm.compaction first
+IMPROVE_PROMPT_VERSION = "improve-v1"
+MULTI_MATCH_PROMPT_VERSION = "multi-match-v1"
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for budgeting and reporting: about 4 characters per token
+    for English text. Good enough for rate limits and context-window sizing.
+    """
+    return max(1, len(text) // 4)
+
+
+def build_match_prompt(resume_text, jd_text):
+    """
+    Builds the resume-vs-JD analysis prompt (Match Score / Explanation / Missing Factors).
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_text (str): The text content of the job description.
+
+    Returns:
+        str: The prompt.
+    """
+    # This prompt guides the LLM to act as a recruiter and provide specific outputs.
+    # Using clear formatting and instructions improves the reliability of the output.
+    return f"""
+    Analyze the following resume and job description. Act as an expert talent acquisition specialist providing a concise evaluation for a hiring manager.
+
+    **Resume Text:**
+    ---
+    {resume_text}
+    ---
+
+    **Job Description Text:**
+    ---
+    {jd_text}
+    ---
+
+    **Your Task:**
+    1.  Provide an overall **Match Score** (out of 100) representing the candidate's suitability based *only* on the provided texts. Base the score on how well the resume demonstrates the qualifications and experience listed in the job description.
+    2.  Write a brief **Explanation** (2-4 sentences) justifying the score, highlighting key alignments or significant gaps.
+    3.  List the most critical **Missing Factors** (specific keywords, skills, qualifications, or years of experience mentioned in the JD but seemingly absent or insufficient in the candidate's resume). If there are no significant missing factors, state "None apparent." Use bullet points for the list.
+    4.  Refer to the person who submitted the resume only as "the candidate" or "the applicant". Do not invent or use a name found in the resume text.
+
+    **Output Format:**
+    Strictly follow this format, including the labels:
+
+    Match Score: [Score]/100
+    Explanation: [Your explanation here]
+    Missing Factors:
+    * [Missing factor 1]
+    * [Missing factor 2]
+    * [Or "None apparent."]
+    """
+
+
+# Matches the "Match Score: [Score]/100" line requested by build_match_prompt,
+# tolerating markdown emphasis (e.g. "**Match Score:** 85/100") and decimals
+_MATCH_SCORE_RE = re.compile(r"match\s*score\W*?(\d{1,3}(?:\.\d+)?)\s*(?:/\s*100|%)?", re.IGNORECASE)
+
+
+def parse_match_score(analysis_text):
+    """
+    Extracts the numeric score from a match analysis.
+
+    Args:
+        analysis_text (str | None): Text returned by the match prompt.
+
+    Returns:
+        float | None: The score (0-100), or None if no valid score line is found.
+    """
+    if not analysis_text:
+        return None
+    match = _MATCH_SCORE_RE.search(analysis_text)
+    if not match:
+        return None
+    score = float(match.group(1))
+    return score if 0 <= score <= 100 else None
+
+
+_EXPLANATION_RE = re.compile(r"explanation\W*?:\**\s*(.*?)\s*(?=\n\W*missing\s*factors|\Z)",
+                             re.IGNORECASE | re.DOTALL)
+_MISSING_FACTORS_RE = re.compile(r"missing\s*factors\W*?:\**\s*(.*)", re.IGNORECASE | re.DOTALL)
+
+
+def parse_match_analysis(analysis_text):
+    """
+    Splits a match analysis into its parts.
+
+    Args:
+        analysis_text (str | None): Text returned by the match prompt.
+
+    Returns:
+        dict: {"score": float | None, "explanation": str | None, "missing_factors": list[str]}.
+              "None apparent." yields an empty list.
+    """
+    if not analysis_text:
+        return {"score": None, "explanation": None, "missing_factors": []}
+    explanation = _EXPLANATION_RE.search(analysis_text)
+    missing = _MISSING_FACTORS_RE.search(analysis_text)
+    factors = []
+    if missing:
+        for line in missing.group(1).splitlines():
+            factor = line.strip().lstrip("*-•").strip()
+            if factor and not factor.lower().startswith("none apparent"):
+                factors.append(factor)
+    return {
+        "score": parse_match_score(analysis_text),
+        "explanation": explanation.group(1).strip() if explanation else None,
+        "missing_factors": factors,
+    }
+
+
+def multi_match_label(position):
+    """The label JD number `position` (0-based) gets inside a multi-JD prompt."""
+    return f"JD-{position + 1}"
+
+
+def build_multi_match_prompt(resume_text, jd_texts):
+    """
+    Builds one prompt that evaluates a resume against several JDs and asks for JSON.
+    The JDs are labelled JD-1, JD-2, ... in order (see multi_match_label).
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_texts (list[str]): The job descriptions.
+
+    Returns:
+        str: The prompt.
+    """
+    jd_blocks = "\n\n".join(f"### {multi_match_label(i)}\n---\n{jd_text}\n---" for i, jd_text in enumerate(jd_texts))
+    return f"""
+    Analyze the following resume against each of the {len(jd_texts)} job descriptions below. Act as an expert talent acquisition specialist providing a concise evaluation for a hiring manager. Evaluate every job description independently.
+
+    **Resume Text:**
+    ---
+    {resume_text}
+    ---
+
+    **Job Descriptions:**
+{jd_blocks}
+
+    **Your Task:**
+    For each job description:
+    1.  Provide an overall match score (0-100) representing the candidate's suitability based *only* on the provided texts.
+    2.  Write a brief explanation (2-4 sentences) justifying the score, highlighting key alignments or significant gaps.
+    3.  List the most critical missing factors (specific keywords, skills, qualifications, or years of experience mentioned in that JD but seemingly absent or insufficient in the resume). Use an empty list if there are none.
+    4.  Refer to the person who submitted the resume only as "the candidate" or "the applicant". Do not invent or use a name found in the resume text.
+
+    **Output Format:**
+    Respond with JSON only (no markdown, no commentary), exactly one entry per job description, in this shape:
+    {{"results": [{{"jd": "JD-1", "match_score": 85, "explanation": "...", "missing_factors": ["...", "..."]}}]}}
+    """
+
+
+def parse_multi_match_response(response_text, n_jds):
+    """
+    Parses the JSON answer to build_multi_match_prompt.
+
+    Entries that are missing, duplicated or malformed are left out, so the caller can
+    re-run just those JDs. Tolerates a ```json fence and text around the JSON object.
+
+    Args:
+        response_text (str): The LLM response.
+        n_jds (int): Number of JDs in the prompt.
+
+    Returns:
+        dict: position (0-based) -> {"score": float, "explanation": str, "missing_factors": list[str]}.
+
+    Raises:
+        ValueError: If the response contains no parseable JSON object with a "results" list.
+    """
+    start, end = response_text.find("{"), response_text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in the response.")
+    payload = json.loads(response_text[start:end + 1])
+    entries = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("JSON response has no 'results' list.")
+
+    positions = {multi_match_label(i): i for i in range(n_jds)}
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.get("jd") not in positions:
+            continue
+        score, explanation, factors = entry.get("match_score"), entry.get("explanation"), entry.get("missing_factors", [])
+        if isinstance(score, str):
+            try:
+                score = float(score.split("/")[0])
+            except ValueError:
+                continue
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+            continue
+        if not isinstance(explanation, str) or not isinstance(factors, list):
+            continue
+        position = positions[entry["jd"]]
+        if position in parsed:  # a JD answered twice is ambiguous; re-run it on its own
+            parsed[position] = None
+            continue
+        parsed[position] = {
+            "score": float(score),
+            "explanation": explanation.strip(),
+            "missing_factors": [str(factor).strip() for factor in factors if str(factor).strip()],
+        }
+    return {position: result for position, result in parsed.items() if result is not None}
+
+
+def build_improve_prompt(resume_text):
+    """
+    Builds the resume improvement prompt.
+
+    Args:
+        resume_text (str): The text content of the resume.
+
+    Returns:
+        str: The prompt.
+    """
+    return f"""
+    Analyze the following resume and job description. Act as an expert resume maker and ATS expert providing an evaluation of the user's resume and possible improvements to the same..
+    
+
+    **Resume Text:**
+    ---
+    {resume_text}
+    ---
+
+
+
+    **Your Task:**
+    1.  Improve the following resume text to make it more appealing and relevant for job applications
+    2.  Focus on enhancing the language, structure, and overall presentation
+    3.  Also please provide keywords that the user has mentioned and how they could be improved; with the aim to make the application more ATS friendly
+    4.  Refer to the person who submitted the resume only as "the candidate" or "the applicant". Do not invent or use a name found in the resume text.
+    5.  Provide a summary of the changes made and why they are beneficial
+
+    **Output Format:**
+    Strictly follow this format, including the labels:
+
+    Improvements and mistakes: [In a bullet point format]
+    Keywords and ATS: [In bullet point format]
+    Summary of changes:
+    """
@@ -0,0 +1,154 @@
+# src/llm/response_cache.py
+
+# Disk-backed cache of LLM responses.
+# match_resume_with_jd_llm and improve_resume_text used to send a fresh request for
+# every call, so Streamlit reruns and double clicks on "Analyze" each cost seconds and
+# paid tokens. Responses are stored in SQLite keyed by (model name, prompt template
+# version, hash of the inputs), with a TTL and a cap on the number of entries.
+# Only successful responses are stored - callers must never put error strings here.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+def make_response_key(model_name, template_version, *inputs):
+    """
+    Builds the cache key for one LLM call.
+
+    Args:
+        model_name (str): The LLM model name (e.g., "gemini-1.5-pro-latest").
+        template_version (str): Version of the prompt template (see llm.prompts).
+        *inputs (str): The texts substituted into the template, in order.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for part in (model_name, template_version) + inputs:
+        # Length-prefix every part so ("ab", "c") and ("a", "bc") can't collide
+        encoded = part.encode("utf-8")
+        digest.update(f"{len(encoded)}:".encode("ascii"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL expiry and least-recently-used eviction.
+    Safe to share between threads; several processes may also point at the same file.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        """
+        Args:
+            path (str): SQLite database file (created on first use).
+            ttl_seconds (float, optional): Age after which an entry is ignored and deleted.
+                None disables expiry. Defaults to 7 days.
+            max_entries (int, optional): Entries kept before the least recently used are
+                evicted. Defaults to 5000.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = None  # opened lazily so importing/creating the cache costs nothing
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Returns the cached response text for `key`, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key, response):
+        """
+        Stores a successful response and evicts the least recently used entries
+        beyond `max_entries`.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            conn.commit()
+
+    def clear(self):
+        """Deletes every entry."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self):
+        """
+        Returns hit/miss/expiry/eviction counters and the number of stored entries.
+        """
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": entries,
+            }
+
+    def _connection(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            # WAL lets readers in other processes proceed while one process writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._conn.commit()
+        return self._conn
+
+
+# --- Shared default cache ---
+# Set LLM_CACHE_PATH to an empty string to disable response caching entirely.
+_default_cache_path = os.path.join(os.path.expanduser("~"), ".cache", "resume_jd_matcher", "llm_responses.sqlite")
+_cache_path = os.getenv("LLM_CACHE_PATH", _default_cache_path)
+default_response_cache = LLMResponseCache(_cache_path) if _cache_path else None
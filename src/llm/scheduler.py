@@ -0,0 +1,306 @@
+# src/llm/scheduler.py
+
+# Concurrent, rate-limited execution of many LLM match/improve jobs.
+# The matcher functions send one request at a time and turn a quota error into a
+# string, with no retry. The scheduler runs a whole batch of jobs on a thread pool,
+# keeps the requests-per-minute and tokens-per-minute budgets of the API, retries
+# transient failures with jittered exponential backoff, and yields results as soon
+# as each job finishes. The backend is pluggable: anything with
+# generate_content(prompt) -> response.text works (Gemini, or llm.fake_backend for
+# offline load tests).
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import instrumentation
+from llm.client import get_model, get_model_name
+from llm.compaction import compact_match_inputs, compact_multi_match_inputs
+from llm.prompts import (IMPROVE_PROMPT_VERSION, MATCH_PROMPT_VERSION, MULTI_MATCH_PROMPT_VERSION,
+                         build_improve_prompt, build_match_prompt, build_multi_match_prompt, estimate_tokens,
+                         parse_multi_match_response)
+from llm.response_cache import default_response_cache, make_response_key
+
+JOB_KINDS = ("match", "improve", "multi_match")
+
+# A unit of work. jd_text is only used by "match" jobs; "multi_match" jobs (see
+# llm.multi_jd) carry a tuple of JD texts in it and get a JSON answer.
+LLMJob = namedtuple("LLMJob", ["job_id", "kind", "resume_text", "jd_text"], defaults=(None,))
+
+# Outcome of one job. Exactly one of `text` / `error` is set.
+#   attempts: backend calls made (0 for a cache hit)
+#   latency:  seconds from the job starting (after queueing) to its result
+#   tokens:   total tokens reported by the backend (estimated if it reports none)
+#   cached:   True if the answer came from the response cache
+LLMJobResult = namedtuple("LLMJobResult", ["job_id", "kind", "text", "error", "attempts", "latency", "tokens", "cached"])
+
+logger = logging.getLogger(__name__)
+
+_END = object()  # end of the job iterator in LLMScheduler.run (None is a possible entry)
+
+# HTTP statuses and gRPC status names worth retrying
+_TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_TRANSIENT_GRPC_STATUSES = frozenset({"RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED"})
+# Fallbacks for errors that carry neither: a status at the start of the message
+# ("503 Service Unavailable"), or phrases only rate limits and timeouts produce
+_TRANSIENT_STATUS_RE = re.compile(r"^\W*(429|50[0-4])\b")
+_TRANSIENT_MARKERS = ("quota", "rate limit", "resource exhausted", "deadline exceeded", "timed out")
+
+
+def is_transient_error(error):
+    """
+    Decides whether a backend exception is worth retrying (rate limits, overload,
+    timeouts, dropped connections) rather than a permanent failure (bad request,
+    invalid key, blocked content).
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        # google-api-core ships with google-generativeai; only consult it if present
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable,
+                              google_exceptions.DeadlineExceeded, google_exceptions.InternalServerError,
+                              google_exceptions.TooManyRequests)):
+            return True
+    except ImportError:
+        pass
+    # A status the exception carries decides on its own; the message is only a fallback
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in _TRANSIENT_STATUS_CODES
+    grpc_status = getattr(error, "grpc_status_code", None)
+    if grpc_status is not None:
+        return getattr(grpc_status, "name", str(grpc_status)) in _TRANSIENT_GRPC_STATUSES
+    message = str(error).lower()
+    return bool(_TRANSIENT_STATUS_RE.match(message)) or any(marker in message for marker in _TRANSIENT_MARKERS)
+
+
+class RateLimiter:
+    """
+    Sliding one-minute window over request count and token count.
+    `acquire` blocks until both budgets have room for the next request.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, window_seconds=60.0):
+        """
+        Args:
+            requests_per_minute (int, optional): Request budget; None means unlimited.
+            tokens_per_minute (int, optional): Token budget; None means unlimited.
+            window_seconds (float, optional): Window length. Defaults to 60.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self._events = deque()  # (timestamp, tokens) of requests inside the window
+        self._tokens_in_window = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens):
+        """
+        Blocks until a request of `tokens` tokens fits both budgets, then records it.
+        A single request larger than the whole token budget is let through alone.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._events and now - self._events[0][0] >= self.window_seconds:
+                    self._tokens_in_window -= self._events.popleft()[1]
+
+                requests_ok = self.requests_per_minute is None or len(self._events) < self.requests_per_minute
+                tokens_ok = (self.tokens_per_minute is None or not self._events
+                             or self._tokens_in_window + tokens <= self.tokens_per_minute)
+                if requests_ok and tokens_ok:
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+
+                # Sleep until the oldest request leaves the window
+                self._condition.wait(timeout=self.window_seconds - (now - self._events[0][0]))
+
+
+class LLMScheduler:
+    """
+    Runs batches of LLM jobs concurrently under rate limits.
+
+    Usage:
+        scheduler = LLMScheduler(max_concurrency=8, requests_per_minute=60)
+        jobs = [LLMJob(rid, "match", text, jd_text) for rid, text in resumes.items()]
+        for result in scheduler.run(jobs):
+            ...
+    """
+
+    def __init__(self, backend=None, max_concurrency=4, requests_per_minute=60, tokens_per_minute=None,
+                 max_retries=4, backoff_base=1.0, backoff_max=60.0, expected_output_tokens=512,
+                 use_cache=True):
+        """
+        Args:
+            backend (optional): Object with generate_content(prompt). Defaults to the
+                Gemini model from llm.client (resolved on first use).
+            max_concurrency (int, optional): Jobs running at the same time. Defaults to 4.
+            requests_per_minute (int, optional): Request budget; None disables. Defaults to 60.
+            tokens_per_minute (int, optional): Token budget; None disables. Defaults to None.
+            max_retries (int, optional): Retries of a transient failure. Defaults to 4.
+            backoff_base (float, optional): First retry delay in seconds; doubles per retry,
+                with full jitter. Defaults to 1.
+            backoff_max (float, optional): Upper bound for one retry delay. Defaults to 60.
+            expected_output_tokens (int, optional): Output size assumed when reserving
+                token budget. Defaults to 512.
+            use_cache (bool, optional): Use the shared LLM response cache. Defaults to True.
+        """
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.expected_output_tokens = expected_output_tokens
+        self.cache = default_response_cache if use_cache else None
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+    def run(self, jobs):
+        """
+        Runs the jobs and yields their results in completion order.
+
+        At most 2 * max_concurrency jobs are queued at a time, so `jobs` may be a
+        long lazy iterable.
+
+        Args:
+            jobs (iterable[LLMJob]): The jobs to run.
+
+        Yields:
+            LLMJobResult: One per job. Entries that are not LLMJobs (e.g. None) get a
+                          result with an error.
+        """
+        job_iter = iter(jobs)
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while True:
+                while len(pending) < 2 * self.max_concurrency:
+                    job = next(job_iter, _END)
+                    if job is _END:
+                        break
+                    if not isinstance(job, LLMJob):
+                        error = f"Invalid job: expected an LLMJob, got {type(job).__name__}."
+                        yield LLMJobResult(None, None, None, error, 0, 0.0, 0, False)
+                        continue
+                    pending.add(executor.submit(self.run_one, job))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def run_one(self, job):
+        """
+        Runs a single job on the calling thread (cache, rate limit, retries).
+
+        Returns:
+            LLMJobResult: The outcome; never raises for backend errors.
+        """
+        start = time.monotonic()
+        try:
+            prompt, cache_key = self._prepare(job)
+        except ValueError as e:
+            return LLMJobResult(job.job_id, job.kind, None, str(e), 0, 0.0, 0, False)
+
+        if self.cache is not None:
+            try:
+                cached_text = self.cache.get(cache_key)
+            except Exception as e:
+                logger.warning("LLM response cache unavailable: %s", e)
+                cached_text = None
+            if cached_text is not None:
+                instrumentation.incr("cache_hits_total", cache="llm_response")
+                return LLMJobResult(job.job_id, job.kind, cached_text, None, 0,
+                                    time.monotonic() - start, 0, True)
+            instrumentation.incr("cache_misses_total", cache="llm_response")
+
+        backend = self._backend()
+        if backend is None:
+            return LLMJobResult(job.job_id, job.kind, None, "LLM model not available.", 0,
+                                time.monotonic() - start, 0, False)
+
+        reserved_tokens = estimate_tokens(prompt) + self.expected_output_tokens
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire(reserved_tokens)
+            try:
+                with instrumentation.span("llm", task=job.kind):
+                    response = backend.generate_content(prompt)
+            except Exception as e:
+                if attempt <= self.max_retries and is_transient_error(e):
+                    instrumentation.incr("retries_total", stage="llm")
+                    # Exponential backoff with full jitter spreads retries of a burst apart
+                    time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))))
+                    continue
+                instrumentation.incr("errors_total", stage="llm", reason=type(e).__name__)
+                return LLMJobResult(job.job_id, job.kind, None, f"{type(e).__name__}: {e}", attempt,
+                                    time.monotonic() - start, 0, False)
+
+            text = getattr(response, "text", None)
+            tokens = _total_tokens(response, prompt, text)
+            instrumentation.incr("llm_tokens_total", tokens, kind="total")
+            if not text:
+                return LLMJobResult(job.job_id, job.kind, None, "LLM response was empty or blocked.", attempt,
+                                    time.monotonic() - start, tokens, False)
+            if self.cache is not None and _cacheable(job, text):
+                try:
+                    self.cache.put(cache_key, text)
+                except Exception as e:
+                    logger.warning("Could not store LLM response in cache: %s", e)
+            return LLMJobResult(job.job_id, job.kind, text, None, attempt, time.monotonic() - start, tokens, False)
+
+    # --- Internal helpers ---
+    def _backend(self):
+        return self.backend if self.backend is not None else get_model()
+
+    def _model_name(self):
+        if self.backend is not None:
+            return getattr(self.backend, "model_name", type(self.backend).__name__)
+        return get_model_name()
+
+    def _prepare(self, job):
+        # Same prompts and cache keys as matcher.match_resume_with_jd_llm / improve_resume_text
+        if job.kind not in JOB_KINDS:
+            raise ValueError(f"Unsupported job kind '{job.kind}'. Choose one of {JOB_KINDS}.")
+        if not isinstance(job.resume_text, str):
+            raise ValueError("resume_text must be a string.")
+        if job.kind == "match":
+            if not isinstance(job.jd_text, str):
+                raise ValueError("jd_text must be a string for match jobs.")
+            resume, jd = compact_match_inputs(job.resume_text, job.jd_text)
+            return (build_match_prompt(resume.text, jd.text),
+                    make_response_key(self._model_name(), MATCH_PROMPT_VERSION, resume.text, jd.text))
+        if job.kind == "multi_match":
+            if not job.jd_text or not all(isinstance(jd_text, str) for jd_text in job.jd_text):
+                raise ValueError("jd_text must be a non-empty sequence of strings for multi_match jobs.")
+            resume, jds = compact_multi_match_inputs(job.resume_text, list(job.jd_text))
+            jd_texts = [jd.text for jd in jds]
+            return (build_multi_match_prompt(resume.text, jd_texts),
+                    make_response_key(self._model_name(), MULTI_MATCH_PROMPT_VERSION, resume.text, *jd_texts))
+        return (build_improve_prompt(job.resume_text),
+                make_response_key(self._model_name(), IMPROVE_PROMPT_VERSION, job.resume_text))
+
+
+def _cacheable(job, text):
+    # A multi-JD answer that isn't valid JSON would be served again on every rerun
+    if job.kind != "multi_match":
+        return True
+    try:
+        parse_multi_match_response(text, len(job.jd_text))
+    except ValueError:
+        return False
+    return True
+
+
+def _total_tokens(response, prompt, text):
+    # Prefer the backend's own accounting (Gemini's usage_metadata), else estimate
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    if isinstance(total, int) and total > 0:
+        return total
+    return estimate_tokens(prompt) + (estimate_tokens(text) if text else 0)
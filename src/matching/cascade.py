@@ -0,0 +1,119 @@
+# src/matching/cascade.py
+
+# Two-stage ranking of a candidate pool against one job description.
+# Stage 1 scores every resume with cheap embedding similarity (one batched encode and
+# one matrix multiply). Only the survivors - the top-k and/or those above a threshold -
+# go to stage 2, the expensive LLM analysis, which runs in parallel through the
+# LLM scheduler. Both signals are merged into a single ranked list.
+
+from collections import namedtuple
+
+import numpy as np
+
+from llm.prompts import parse_match_score
+from llm.scheduler import LLMJob, LLMScheduler
+from matching.matcher import compute_chunked_similarity_matrix, compute_embedding_similarity_matrix
+
+# One ranked candidate.
+#   embedding_score: cosine similarity from stage 1
+#   llm_score:       "Match Score" parsed from the LLM analysis (0-100), None if not run or unparseable
+#   combined_score:  llm_weight * llm_score / 100 + (1 - llm_weight) * embedding_score,
+#                    or the embedding score alone when there is no LLM score
+#   shortlisted:     True if the candidate survived stage 1 and was sent to the LLM
+CandidateScore = namedtuple("CandidateScore", ["resume_id", "embedding_score", "llm_score", "combined_score",
+                                               "shortlisted", "llm_text", "llm_error"])
+
+# Result of a cascade run.
+#   ranked:          CandidateScore list; shortlisted candidates first, each tier by descending score
+#   llm_calls:       analyses that reached the LLM backend
+#   llm_cache_hits:  shortlisted analyses answered by the response cache
+#   llm_calls_saved: LLM calls avoided compared with analysing the whole pool
+CascadeResult = namedtuple("CascadeResult", ["ranked", "pool_size", "shortlist_size", "llm_calls",
+                                             "llm_cache_hits", "llm_calls_saved"])
+
+
+def select_shortlist(scores, top_k=None, threshold=None):
+    """
+    Picks the stage-1 survivors.
+
+    Args:
+        scores (np.ndarray): Embedding scores, one per candidate.
+        top_k (int, optional): Keep at most this many of the best candidates.
+        threshold (float, optional): Keep only candidates scoring at least this much.
+
+    Returns:
+        np.ndarray: Indices of the survivors, best first.
+    """
+    order = np.argsort(-scores, kind="stable")
+    if threshold is not None:
+        order = order[scores[order] >= threshold]
+    if top_k is not None:
+        order = order[:top_k]
+    return order
+
+
+def rank_candidates(jd_text, resumes, top_k=20, threshold=None, llm_weight=0.7,
+                    scheduler=None, chunked=False):
+    """
+    Ranks a pool of resumes against one job description with an embedding prefilter
+    followed by LLM analysis of the shortlist.
+
+    Args:
+        jd_text (str): The job description text.
+        resumes (dict | list): resume_id -> resume text, or a list of (resume_id, text) pairs.
+        top_k (int, optional): Shortlist size sent to the LLM. None means no cap. Defaults to 20.
+        threshold (float, optional): Minimum embedding score to be shortlisted. Defaults to None.
+        llm_weight (float, optional): Weight of the LLM score in the combined score. Defaults to 0.7.
+        scheduler (LLMScheduler, optional): Runs the LLM jobs. Defaults to a new
+            LLMScheduler() on the Gemini model.
+        chunked (bool, optional): Use chunked long-document similarity for stage 1.
+                                  Defaults to False.
+
+    Returns:
+        CascadeResult | None: The ranking and call accounting, or None if stage 1 failed
+                              (e.g., the embedding model is unavailable).
+    """
+    items = list(resumes.items()) if isinstance(resumes, dict) else list(resumes)
+    resume_ids = [resume_id for resume_id, _ in items]
+    resume_texts = [text for _, text in items]
+    if not items:
+        return CascadeResult([], 0, 0, 0, 0, 0)
+
+    # --- Stage 1: embedding prefilter over the whole pool ---
+    similarity = compute_chunked_similarity_matrix if chunked else compute_embedding_similarity_matrix
+    score_matrix = similarity(resume_texts, [jd_text])
+    if score_matrix is None:
+        return None
+    embedding_scores = score_matrix[:, 0]
+    shortlist = select_shortlist(embedding_scores, top_k=top_k, threshold=threshold)
+
+    # --- Stage 2: LLM analysis of the survivors, in parallel ---
+    scheduler = scheduler or LLMScheduler()
+    jobs = [LLMJob(int(i), "match", resume_texts[i], jd_text) for i in shortlist]
+    llm_results = {result.job_id: result for result in scheduler.run(jobs)}
+
+    ranked = []
+    for i, resume_id in enumerate(resume_ids):
+        embedding_score = float(embedding_scores[i])
+        result = llm_results.get(i)
+        llm_score = parse_match_score(result.text) if result is not None else None
+        if llm_score is not None:
+            combined = llm_weight * llm_score / 100.0 + (1.0 - llm_weight) * embedding_score
+        else:
+            combined = embedding_score
+        ranked.append(CandidateScore(
+            resume_id, embedding_score, llm_score, combined, result is not None,
+            result.text if result is not None else None,
+            result.error if result is not None else None,
+        ))
+    ranked.sort(key=lambda c: (not c.shortlisted, -c.combined_score))
+
+    cache_hits = sum(1 for result in llm_results.values() if result.cached)
+    return CascadeResult(
+        ranked=ranked,
+        pool_size=len(items),
+        shortlist_size=len(shortlist),
+        llm_calls=len(llm_results) - cache_hits,
+        llm_cache_hits=cache_hits,
+        llm_calls_saved=len(items) - (len(llm_results) - cache_hits),
+    )
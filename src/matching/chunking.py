@@ -0,0 +1,148 @@
+# src/matching/chunking.py
+
+# Helpers for scoring documents that are longer than the embedding model's input window.
+# 'all-MiniLM-L6-v2' truncates at 256 word pieces, so a whole resume or JD passed as one
+# string only contributes its first page. Splitting into overlapping windows and pooling
+# the chunk-to-chunk similarities lets the rest of the document count.
+
+import zlib
+
+import numpy as np
+
+# Roughly 1.3 word pieces per English word, so 150 words stays inside 256 word pieces
+DEFAULT_CHUNK_WORDS = 150
+DEFAULT_OVERLAP_WORDS = 30
+
+# Content-defined chunk sizes, in words (see content_defined_chunks)
+CDC_MIN_WORDS = 30
+CDC_AVG_WORDS = 80
+CDC_MAX_WORDS = 150
+CDC_WINDOW_WORDS = 4
+
+POOLING_MODES = ("max", "mean", "topk")
+
+
+def chunk_text(text, chunk_words=DEFAULT_CHUNK_WORDS, overlap_words=DEFAULT_OVERLAP_WORDS):
+    """
+    Splits text into overlapping windows of whitespace-separated words.
+
+    Args:
+        text (str): The document text (e.g., output of parse_resume or jd_parser).
+        chunk_words (int, optional): Words per window. Defaults to DEFAULT_CHUNK_WORDS.
+        overlap_words (int, optional): Words shared by consecutive windows.
+                                       Defaults to DEFAULT_OVERLAP_WORDS.
+
+    Returns:
+        list[str]: The chunks in document order. Always contains at least one entry,
+                   so an empty document still gets a (single, empty) chunk.
+
+    Raises:
+        ValueError: If the window settings are inconsistent.
+    """
+    if chunk_words <= 0 or overlap_words < 0 or overlap_words >= chunk_words:
+        raise ValueError("chunk_words must be positive and larger than overlap_words.")
+
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [" ".join(words)]
+
+    step = chunk_words - overlap_words
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        # Stop once a window reaches the end, otherwise the tail would be repeated
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+def content_defined_chunks(text, min_words=CDC_MIN_WORDS, avg_words=CDC_AVG_WORDS,
+                           max_words=CDC_MAX_WORDS, window_words=CDC_WINDOW_WORDS):
+    """
+    Splits text into chunks whose boundaries depend only on nearby words.
+
+    A chunk ends after a word when a hash of the last `window_words` words hits a
+    1-in-(avg_words - min_words) value, subject to the min/max sizes. Unlike fixed
+    windows, inserting or deleting a few words only changes the chunk(s) around the
+    edit: boundaries further on are found at the same words again, so those chunks
+    (and their cached vectors) stay identical.
+
+    Args:
+        text (str): The document text.
+        min_words (int, optional): Smallest chunk, except the last. Defaults to CDC_MIN_WORDS.
+        avg_words (int, optional): Target average chunk size. Defaults to CDC_AVG_WORDS.
+        max_words (int, optional): Largest chunk; keep it within the model's input window.
+                                   Defaults to CDC_MAX_WORDS.
+        window_words (int, optional): Words hashed to decide a boundary. Defaults to CDC_WINDOW_WORDS.
+
+    Returns:
+        list[str]: The chunks in document order (at least one, possibly empty).
+
+    Raises:
+        ValueError: If the size settings are inconsistent.
+    """
+    if not 0 < min_words < avg_words <= max_words or window_words <= 0:
+        raise ValueError("Chunk sizes must satisfy 0 < min_words < avg_words <= max_words.")
+
+    words = text.split()
+    divisor = avg_words - min_words
+    chunks, start = [], 0
+    for i in range(len(words)):
+        size = i + 1 - start
+        if size < min_words:
+            continue
+        # crc32 rather than hash(): boundaries must not change between processes
+        window = " ".join(words[max(0, i + 1 - window_words):i + 1]).lower().encode("utf-8")
+        if size >= max_words or zlib.crc32(window) % divisor == 0:
+            chunks.append(" ".join(words[start:i + 1]))
+            start = i + 1
+    if start < len(words) or not chunks:
+        chunks.append(" ".join(words[start:]))
+    return chunks
+
+
+def pool_chunk_scores(chunk_scores, resume_offsets, jd_offsets, pooling="mean", top_k=3):
+    """
+    Reduces a chunk-by-chunk similarity matrix to a document-by-document matrix.
+
+    For every (resume, JD) pair, each JD chunk is first matched with its best
+    resume chunk; those per-JD-chunk scores are then pooled:
+
+    - "max":  the single best chunk match.
+    - "mean": the average over all JD chunks (how much of the JD the resume covers).
+    - "topk": the average of the `top_k` best JD chunk matches.
+
+    Args:
+        chunk_scores (np.ndarray): Similarities of shape (total_resume_chunks, total_jd_chunks).
+        resume_offsets (np.ndarray): Index of the first chunk row of each resume.
+        jd_offsets (np.ndarray): Index of the first chunk column of each JD.
+        pooling (str, optional): One of POOLING_MODES. Defaults to "mean".
+        top_k (int, optional): Number of JD chunks averaged in "topk" mode. Defaults to 3.
+
+    Returns:
+        np.ndarray: Pooled scores of shape (len(resume_offsets), len(jd_offsets)).
+
+    Raises:
+        ValueError: If `pooling` is not one of POOLING_MODES.
+    """
+    if pooling not in POOLING_MODES:
+        raise ValueError(f"Unsupported pooling mode '{pooling}'. Choose one of {POOLING_MODES}.")
+
+    # Best resume chunk for every JD chunk, per resume: (n_resumes, total_jd_chunks)
+    best_per_jd_chunk = np.maximum.reduceat(chunk_scores, resume_offsets, axis=0)
+
+    if pooling == "max":
+        return np.maximum.reduceat(best_per_jd_chunk, jd_offsets, axis=1)
+
+    jd_chunk_counts = np.diff(np.append(jd_offsets, chunk_scores.shape[1]))
+    if pooling == "mean":
+        return np.add.reduceat(best_per_jd_chunk, jd_offsets, axis=1) / jd_chunk_counts
+
+    # "topk": average the k highest scores inside each JD's block of columns
+    pooled = np.empty((best_per_jd_chunk.shape[0], len(jd_offsets)), dtype=chunk_scores.dtype)
+    for j, (start, count) in enumerate(zip(jd_offsets, jd_chunk_counts)):
+        block = best_per_jd_chunk[:, start:start + count]
+        k = min(top_k, count)
+        top = np.partition(block, count - k, axis=1)[:, count - k:]
+        pooled[:, j] = top.mean(axis=1)
+    return pooled
@@ -0,0 +1,232 @@
+# src/matching/dedup.py
+
+# Near-duplicate detection for parsed resumes and JDs (MinHash + LSH).
+# The same job is posted on many boards and the same resume arrives through several
+# channels with slightly different formatting; every copy used to be embedded and sent
+# to the LLM again. Each document gets a MinHash signature of its word shingles, and
+# an LSH index over signature bands finds candidate near-duplicates without comparing
+# against every document seen so far. A duplicate is mapped to the first copy's text,
+# so the embedding and LLM response caches (keyed by text) serve it for free.
+
+import re
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+import instrumentation
+
+DEFAULT_THRESHOLD = 0.9
+# Resumes that differ in one job or skill line still score about 0.9, and a substituted
+# resume gets the other candidate's scores, so they need a much closer match
+DEFAULT_THRESHOLDS = {"resume": 0.98, "jd": DEFAULT_THRESHOLD}
+# Canonical texts (and doc_id lookups) kept for substitution; signatures are kept for all
+DEFAULT_MAX_TEXTS = 1024
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_WORDS = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def shingles(text, shingle_words=DEFAULT_SHINGLE_WORDS):
+    """
+    Returns the set of `shingle_words`-word shingles of the text, after lowercasing and
+    dropping punctuation and layout, so formatting differences don't matter.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= shingle_words:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+
+
+def lsh_params(threshold, num_perm):
+    """
+    Picks (bands, rows) with bands * rows <= num_perm so that the LSH candidate curve,
+    whose midpoint is (1 / bands) ** (1 / rows), sits just at or below `threshold`.
+    Erring low favours recall; candidates are verified against the threshold anyway.
+    """
+    options = [(bands, num_perm // bands) for bands in range(1, num_perm + 1)]
+    below = [option for option in options if (1 / option[0]) ** (1 / option[1]) <= threshold]
+    return max(below or options, key=lambda option: ((1 / option[0]) ** (1 / option[1]), option[0]))
+
+
+class MinHasher:
+    """
+    MinHash signatures with `num_perm` universal hash functions, computed with numpy
+    over all shingles at once.
+    """
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, shingle_words=DEFAULT_SHINGLE_WORDS, seed=1):
+        rng = np.random.default_rng(seed)
+        # a, b < 2**31 and shingle hashes < 2**32 keep a * x + b inside uint64
+        self.a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+
+    def signature(self, text):
+        """
+        Returns:
+            np.ndarray: uint32 array of length num_perm. Two signatures agree in about
+                        the Jaccard similarity of the two shingle sets.
+        """
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_words)),
+                             dtype=np.uint64)
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % _MERSENNE_PRIME
+        return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the documents behind two signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+class DedupIndex:
+    """
+    LSH index of document signatures that maps near-duplicates to a canonical copy.
+
+    Usage:
+        index = DedupIndex(label="jd")
+        canonical_id, canonical_text, similarity = index.canonicalize("jd-17", jd_text)
+        # score canonical_text instead of jd_text: its embeddings and analyses are cached
+        index.stats()  # {"documents": ..., "duplicates": ..., "avoided_fraction": ...}
+
+    Every canonical document keeps its signature (num_perm * 4 bytes), but only the
+    `max_texts` most recently used canonical texts are held to hand back for duplicates.
+    A duplicate whose canonical text was evicted comes back with text None, and the
+    caller keeps its own copy.
+    """
+
+    def __init__(self, threshold=None, num_perm=DEFAULT_NUM_PERM, shingle_words=DEFAULT_SHINGLE_WORDS,
+                 seed=1, label="document", max_texts=DEFAULT_MAX_TEXTS):
+        """
+        Args:
+            threshold (float, optional): Estimated Jaccard similarity of word shingles at
+                which two documents count as duplicates. Defaults to DEFAULT_THRESHOLDS
+                for `label` (0.98 for resumes), else 0.9; editing one word that occurs a
+                few times in a JD typically still scores about 0.95.
+            num_perm (int, optional): Signature length; more is more precise and slower.
+                Defaults to 128.
+            shingle_words (int, optional): Words per shingle. Defaults to 5.
+            seed (int, optional): Seed of the hash functions (indexes compared or merged
+                must use the same one). Defaults to 1.
+            label (str, optional): Kind of document ("resume", "jd"), used in metrics.
+            max_texts (int, optional): Canonical texts kept in memory (LRU). Defaults to 1024.
+
+        Raises:
+            ValueError: If `threshold` is not in (0, 1].
+        """
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLDS.get(label, DEFAULT_THRESHOLD)
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1].")
+        self.threshold = threshold
+        self.label = label
+        self.hasher = MinHasher(num_perm, shingle_words, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._buckets = [{} for _ in range(self.bands)]  # band -> {band bytes: [doc_id, ...]}
+        self._signatures = {}  # canonical doc_id -> signature
+        self.max_texts = max_texts
+        self._texts = OrderedDict()  # canonical doc_id -> text, most recently used last
+        self._canonical_of = OrderedDict()  # doc_id -> (canonical doc_id, estimated similarity)
+        self.documents = 0
+        self.duplicates = 0
+        self.evicted_hits = 0  # duplicates whose canonical text was no longer held
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def query(self, text=None, signature=None):
+        """
+        Finds indexed canonical documents similar to `text` (or a precomputed signature).
+
+        Returns:
+            list[tuple]: (doc_id, estimated_similarity) at or above the threshold, best first.
+        """
+        if signature is None:
+            signature = self.hasher.signature(text)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        matches = [(doc_id, estimate_similarity(signature, self._signatures[doc_id])) for doc_id in candidates]
+        matches = [(doc_id, similarity) for doc_id, similarity in matches if similarity >= self.threshold]
+        return sorted(matches, key=lambda match: -match[1])
+
+    def canonicalize(self, doc_id, text):
+        """
+        Registers a document and returns the copy to use in its place.
+
+        A doc_id seen recently returns its earlier answer. Otherwise, if a near-duplicate
+        is indexed, the document maps to it; if not, it becomes canonical itself.
+
+        Returns:
+            tuple: (canonical doc_id, canonical text, estimated similarity; 1.0 for itself).
+                   The text is None if the canonical copy's text has been evicted.
+        """
+        if doc_id in self._canonical_of:
+            self._canonical_of.move_to_end(doc_id)
+            canonical_id, similarity = self._canonical_of[doc_id]
+            return canonical_id, text if canonical_id == doc_id else self._text_of(canonical_id), similarity
+        if doc_id in self._signatures:
+            # Canonical, but its lookup entry was evicted
+            self._remember(doc_id, (doc_id, 1.0))
+            return doc_id, text, 1.0
+        self.documents += 1
+        signature = self.hasher.signature(text)
+        matches = self.query(signature=signature)
+        if matches:
+            canonical_id, similarity = matches[0]
+            self.duplicates += 1
+            self._remember(doc_id, (canonical_id, similarity))
+            canonical_text = self._text_of(canonical_id)
+            if canonical_text is None:
+                self.evicted_hits += 1
+            instrumentation.incr("dedup_documents_total", kind=self.label, result="duplicate")
+            return canonical_id, canonical_text, similarity
+
+        self._signatures[doc_id] = signature
+        self._texts[doc_id] = text
+        if len(self._texts) > self.max_texts:
+            self._texts.popitem(last=False)
+        self._remember(doc_id, (doc_id, 1.0))
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(doc_id)
+        instrumentation.incr("dedup_documents_total", kind=self.label, result="unique")
+        return doc_id, text, 1.0
+
+    def stats(self):
+        """
+        Returns:
+            dict: documents seen, duplicates found, canonical documents, and
+                  avoided_fraction - the share of documents whose embedding and
+                  analyses were served by an earlier copy (duplicates whose canonical
+                  text was evicted don't count).
+        """
+        avoided = self.duplicates - self.evicted_hits
+        return {
+            "documents": self.documents,
+            "duplicates": self.duplicates,
+            "canonical": len(self._signatures),
+            "evicted_hits": self.evicted_hits,
+            "avoided_fraction": avoided / self.documents if self.documents else 0.0,
+            "bands": self.bands,
+            "rows": self.rows,
+        }
+
+    def _text_of(self, canonical_id):
+        text = self._texts.get(canonical_id)
+        if text is not None:
+            self._texts.move_to_end(canonical_id)
+        return text
+
+    def _remember(self, doc_id, answer):
+        self._canonical_of[doc_id] = answer
+        if len(self._canonical_of) > self.max_texts:
+            self._canonical_of.popitem(last=False)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
@@ -0,0 +1,295 @@
+# src/matching/embedding_cache.py
+
+# Content-addressed store for sentence embeddings.
+# Vectors are keyed by a hash of (model name, normalized text), so the same text
+# is never sent through the SentenceTransformer twice - not within a run, and
+# (with the disk tier enabled) not across Streamlit reruns or batch job restarts.
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Collapses runs of whitespace so formatting-only differences share a cache entry
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Normalizes text before hashing: collapses whitespace runs and strips the ends.
+
+    Args:
+        text (str): The raw text.
+
+    Returns:
+        str: The normalized text.
+    """
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_cache_key(model_name, text):
+    """
+    Builds the content-addressed key for one (model, text) pair.
+
+    Args:
+        model_name (str): Identifier of the embedding model that produced the vector.
+        text (str): The text that was embedded.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding store: an in-process LRU dictionary in front of an
+    on-disk directory of memory-mapped `.npy` shards.
+
+    Disk layout: every flush writes one shard, `shard-<id>.npy` (a float32 matrix)
+    plus `shard-<id>.keys.json` (the key of each row). Shards are opened with
+    `mmap_mode='r'`, so only the rows that are actually read get paged in.
+    When the directory grows past `max_disk_bytes`, the least recently used
+    shards are deleted until it fits again.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_items=20000,
+                 max_disk_bytes=512 * 1024 * 1024, flush_every=256):
+        """
+        Args:
+            cache_dir (str, optional): Directory for the disk tier. None keeps the
+                cache in memory only. Defaults to None.
+            max_memory_items (int, optional): Capacity of the in-process LRU tier.
+                Defaults to 20000.
+            max_disk_bytes (int, optional): Size cap for the disk tier. Defaults to 512 MiB.
+            flush_every (int, optional): Number of new vectors buffered before they are
+                written out as a shard. Defaults to 256.
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.flush_every = flush_every
+
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()  # key -> np.ndarray, most recently used last
+        self._pending = OrderedDict()  # key -> np.ndarray, not yet written to disk
+        self._disk_index = {}  # key -> (shard_name, row)
+        self._shards = {}  # shard_name -> memory-mapped np.ndarray (opened lazily)
+        self._shard_keys = {}  # shard_name -> list of keys stored in that shard
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        # The disk index is read on first use, not here, so creating a cache at import is free
+        self._disk_index_loaded = False
+        if self.cache_dir:
+            # Don't lose buffered vectors when the process exits normally
+            atexit.register(self.flush)
+
+    # --- Lookup ---
+    def get(self, key):
+        """
+        Returns the cached vector for `key`, or None on a miss.
+        """
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+
+            self._ensure_disk_index()
+            vector = self._pending.get(key)
+            if vector is None:
+                vector = self._read_from_disk(key)
+            if vector is None:
+                self.misses += 1
+                return None
+
+            self.hits_disk += 1
+            self._remember(key, vector)
+            return vector
+
+    def get_many(self, keys):
+        """
+        Looks up several keys at once.
+
+        Args:
+            keys (list[str]): The keys to look up.
+
+        Returns:
+            dict: key -> np.ndarray for every key that was found.
+        """
+        found = {}
+        for key in keys:
+            vector = self.get(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    # --- Insertion ---
+    def put(self, key, vector):
+        """
+        Stores one vector in the memory tier and queues it for the disk tier.
+        """
+        self.put_many({key: vector})
+
+    def put_many(self, items):
+        """
+        Stores several vectors at once.
+
+        Args:
+            items (dict): key -> 1-D array-like vector.
+        """
+        with self._lock:
+            self._ensure_disk_index()
+            for key, vector in items.items():
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                if self.cache_dir and key not in self._disk_index:
+                    self._pending[key] = vector
+            if self.cache_dir and len(self._pending) >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered vectors to a new disk shard and enforces the size cap.
+        """
+        with self._lock:
+            self._ensure_disk_index()
+            if not self.cache_dir or not self._pending:
+                return
+            shard_name = f"shard-{uuid.uuid4().hex}"
+            keys = list(self._pending.keys())
+            matrix = np.stack([self._pending[key] for key in keys])
+            try:
+                # Write to temporary names first so a crash never leaves a half-written shard
+                npy_path = os.path.join(self.cache_dir, shard_name + ".npy")
+                keys_path = os.path.join(self.cache_dir, shard_name + ".keys.json")
+                with open(npy_path + ".tmp", "wb") as f:
+                    np.save(f, matrix)
+                os.replace(npy_path + ".tmp", npy_path)
+                with open(keys_path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(keys, f)
+                os.replace(keys_path + ".tmp", keys_path)
+            except OSError as e:
+                logger.warning("Could not write embedding cache shard: %s", e)
+                return
+
+            self._shard_keys[shard_name] = keys
+            for row, key in enumerate(keys):
+                self._disk_index[key] = (shard_name, row)
+            self._pending.clear()
+            self._evict_disk()
+
+    def stats(self):
+        """
+        Returns hit/miss counters and tier sizes as a dictionary.
+        """
+        with self._lock:
+            self._ensure_disk_index()
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "disk_items": len(self._disk_index),
+                "pending_items": len(self._pending),
+            }
+
+    # --- Internal helpers ---
+    def _remember(self, key, vector):
+        # Insert into the LRU tier, dropping the least recently used entries when full
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _ensure_disk_index(self):
+        # Rebuild key -> (shard, row) from the key files left by previous runs
+        if self._disk_index_loaded or not self.cache_dir:
+            return
+        self._disk_index_loaded = True
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            logger.warning("Embedding cache directory unavailable, using memory only: %s", e)
+            self.cache_dir = None
+            return
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".keys.json"):
+                continue
+            shard_name = filename[:-len(".keys.json")]
+            if not os.path.isfile(os.path.join(self.cache_dir, shard_name + ".npy")):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, filename), encoding="utf-8") as f:
+                    keys = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable embedding cache shard '%s': %s", shard_name, e)
+                continue
+            self._shard_keys[shard_name] = keys
+            for row, key in enumerate(keys):
+                self._disk_index[key] = (shard_name, row)
+
+    def _read_from_disk(self, key):
+        location = self._disk_index.get(key)
+        if location is None:
+            return None
+        shard_name, row = location
+        shard = self._shards.get(shard_name)
+        try:
+            if shard is None:
+                shard = np.load(os.path.join(self.cache_dir, shard_name + ".npy"), mmap_mode="r")
+                self._shards[shard_name] = shard
+            # Copy the row out of the memory map so the shard file can be evicted later
+            vector = np.array(shard[row], dtype=np.float32)
+            # Touch the shard so LRU eviction sees it as recently used
+            os.utime(os.path.join(self.cache_dir, shard_name + ".npy"))
+        except (OSError, ValueError, IndexError) as e:
+            logger.warning("Dropping unreadable embedding cache shard '%s': %s", shard_name, e)
+            self._forget_shard(shard_name)
+            return None
+        return vector
+
+    def _evict_disk(self):
+        # Delete least recently used shards until the directory fits the size cap
+        shard_files = []
+        total_bytes = 0
+        for shard_name in self._shard_keys:
+            path = os.path.join(self.cache_dir, shard_name + ".npy")
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            shard_files.append((stat.st_mtime, stat.st_size, shard_name))
+            total_bytes += stat.st_size
+
+        shard_files.sort()
+        for _, size, shard_name in shard_files:
+            if total_bytes <= self.max_disk_bytes:
+                break
+            self._forget_shard(shard_name)
+            for suffix in (".npy", ".keys.json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, shard_name + suffix))
+                except OSError:
+                    pass
+            total_bytes -= size
+
+    def _forget_shard(self, shard_name):
+        for key in self._shard_keys.pop(shard_name, []):
+            if self._disk_index.get(key, (None,))[0] == shard_name:
+                del self._disk_index[key]
+        self._shards.pop(shard_name, None)
@@ -0,0 +1,121 @@
+# src/matching/inference_backends.py
+
+# CPU inference backends for the sentence embedding model.
+# The scoring nodes have no GPU, and eager fp32 PyTorch leaves a lot of CPU throughput
+# unused. Three backends are available:
+#   "torch"      - the reference SentenceTransformer in eager fp32 PyTorch
+#   "torch-int8" - the same model with its Linear layers dynamically quantized to int8
+#   "onnx"       - the model exported to ONNX and run by onnxruntime
+#                  (sentence-transformers >= 3.2 with optimum[onnxruntime] installed)
+# An optimized backend is only accepted if its embeddings agree with the reference
+# model to a cosine tolerance on a fixed set of texts; otherwise the caller falls back.
+
+import os
+
+import numpy as np
+
+INFERENCE_BACKENDS = ("torch", "torch-int8", "onnx")
+
+DEFAULT_AGREEMENT_TOLERANCE = 0.99
+
+# Short resume/JD-like texts used to check a backend against the reference model
+VALIDATION_TEXTS = (
+    "Senior data engineer with 6 years of Python, SQL, Spark and Airflow experience.",
+    "We are hiring a backend developer to build REST APIs in Java and Spring Boot.",
+    "Managed a team of five analysts; built Tableau dashboards for quarterly revenue reporting.",
+    "Responsibilities: design machine learning pipelines, deploy models with Docker and Kubernetes.",
+    "Registered nurse with ICU experience, BLS and ACLS certified.",
+    "Bachelor of Science in Computer Science. Skills: C++, C#, Linux, Git, AWS.",
+    "Excellent communication skills and the ability to work in a fast-paced environment.",
+    "Retail sales associate handling inventory, customer service and cash register operations.",
+)
+
+
+def configure_threads(num_threads):
+    """
+    Sets the number of intra-op threads used by PyTorch (and the OpenMP/MKL pools it
+    starts). Does nothing when `num_threads` is None.
+    """
+    if not num_threads:
+        return
+    # The environment variables only matter for pools that have not started yet
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(variable, str(num_threads))
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def load_embedding_backend(model_name, backend="torch", num_threads=None):
+    """
+    Builds a SentenceTransformer for CPU inference with the requested backend.
+
+    Args:
+        model_name (str): The sentence-transformers model name.
+        backend (str, optional): One of INFERENCE_BACKENDS. Defaults to "torch".
+        num_threads (int, optional): Intra-op threads. Defaults to the library default.
+
+    Returns:
+        SentenceTransformer: The model; it exposes the usual `encode` API.
+
+    Raises:
+        ValueError: If `backend` is not one of INFERENCE_BACKENDS.
+        ImportError: If the libraries the backend needs are not installed.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unsupported inference backend '{backend}'. Choose one of {INFERENCE_BACKENDS}.")
+    configure_threads(num_threads)
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        model_kwargs = {"provider": "CPUExecutionProvider"}
+        if num_threads:
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = num_threads
+            session_options.inter_op_num_threads = 1
+            model_kwargs["session_options"] = session_options
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if backend == "torch-int8":
+        import torch
+
+        # Weights of every Linear layer become int8; activations are quantized on the fly
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def cosine_agreement(candidate, reference, texts=VALIDATION_TEXTS):
+    """
+    Encodes `texts` with both models and returns the per-text cosine similarity
+    between their embeddings.
+
+    Returns:
+        np.ndarray: One cosine value per text (1.0 means identical direction).
+    """
+    texts = list(texts)
+    candidate_vectors = candidate.encode(texts, convert_to_numpy=True, normalize_embeddings=True,
+                                         show_progress_bar=False)
+    reference_vectors = reference.encode(texts, convert_to_numpy=True, normalize_embeddings=True,
+                                         show_progress_bar=False)
+    return np.sum(candidate_vectors * reference_vectors, axis=1)
+
+
+def validate_backend(candidate, reference, tolerance=DEFAULT_AGREEMENT_TOLERANCE, texts=VALIDATION_TEXTS):
+    """
+    Checks an optimized model against the reference model.
+
+    Args:
+        candidate: The optimized model.
+        reference: The reference (fp32 PyTorch) model.
+        tolerance (float, optional): Minimum cosine agreement required on every text.
+                                     Defaults to DEFAULT_AGREEMENT_TOLERANCE.
+        texts (iterable[str], optional): Texts to compare on. Defaults to VALIDATION_TEXTS.
+
+    Returns:
+        tuple[bool, float]: Whether the candidate passed, and its worst-case agreement.
+    """
+    worst = float(cosine_agreement(candidate, reference, texts).min())
+    return worst >= tolerance, worst
@@ -0,0 +1,200 @@
+# src/matching/lexical.py
+
+# Sparse lexical keyword matching (TF-IDF or BM25).
+# A fast first-pass scorer that needs no model inference: vocabulary and IDF statistics
+# are fitted once over a resume corpus, after which one JD is scored against every
+# resume with a single sparse matrix-vector product. It also explains a match in
+# terms recruiters understand - the JD keywords a resume has and the ones it lacks.
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+SCORING_METHODS = ("bm25", "tfidf")
+
+# Like scikit-learn's default token pattern, but keeps '+' and '#' inside tokens
+# so skills such as "c++" and "c#" survive tokenization
+TOKEN_PATTERN = r"(?u)\b\w[\w+#]*"
+
+
+def _make_vectorizer(ngram_range=(1, 1), min_df=1, max_df=1.0):
+    return CountVectorizer(lowercase=True, stop_words="english", token_pattern=TOKEN_PATTERN,
+                           ngram_range=ngram_range, min_df=min_df, max_df=max_df)
+
+
+class LexicalMatcher:
+    """
+    Keyword matcher over a fixed resume corpus.
+
+    Usage:
+        matcher = LexicalMatcher().fit(resume_texts, resume_ids)
+        scores = matcher.score(jd_text)            # one score per resume
+        best = matcher.top_k(jd_text, k=50)         # [(resume_id, score), ...]
+        terms = matcher.explain(jd_text, resume_id) # {"overlapping": [...], "missing": [...]}
+    """
+
+    def __init__(self, scoring="bm25", ngram_range=(1, 1), min_df=1, max_df=1.0, k1=1.5, b=0.75):
+        """
+        Args:
+            scoring (str, optional): "bm25" or "tfidf" (cosine over l2-normalized TF-IDF).
+                                     Defaults to "bm25".
+            ngram_range (tuple, optional): Word n-gram range. Defaults to (1, 1).
+            min_df (int | float, optional): Ignore terms in fewer documents. Defaults to 1.
+            max_df (int | float, optional): Ignore terms in more documents. Defaults to 1.0.
+            k1 (float, optional): BM25 term-frequency saturation. Defaults to 1.5.
+            b (float, optional): BM25 length normalization. Defaults to 0.75.
+
+        Raises:
+            ValueError: If `scoring` is not one of SCORING_METHODS.
+        """
+        if scoring not in SCORING_METHODS:
+            raise ValueError(f"Unsupported scoring '{scoring}'. Choose one of {SCORING_METHODS}.")
+        self.scoring = scoring
+        self.k1 = k1
+        self.b = b
+        self.vectorizer = _make_vectorizer(ngram_range, min_df, max_df)
+
+        self.resume_ids = []
+        self._row_of = {}
+        self._counts = None  # raw term counts, CSR (n_resumes, vocab)
+        self._doc_matrix = None  # weighted document-term matrix used for scoring, CSR
+        self._idf = None
+        self._tfidf = None
+
+    # --- Fitting ---
+    def fit(self, resume_texts, resume_ids=None):
+        """
+        Learns the vocabulary and IDF statistics and builds the weighted resume matrix.
+
+        Args:
+            resume_texts (list[str]): The resume corpus.
+            resume_ids (list, optional): One id per resume. Defaults to 0..n-1.
+
+        Returns:
+            LexicalMatcher: self, for chaining.
+        """
+        resume_texts = list(resume_texts)
+        self.resume_ids = list(resume_ids) if resume_ids is not None else list(range(len(resume_texts)))
+        self._row_of = {resume_id: row for row, resume_id in enumerate(self.resume_ids)}
+
+        self._counts = self.vectorizer.fit_transform(resume_texts).tocsr().astype(np.float32)
+        n_docs = self._counts.shape[0]
+        doc_freq = np.bincount(self._counts.indices, minlength=self._counts.shape[1])
+
+        if self.scoring == "tfidf":
+            self._tfidf = TfidfTransformer(norm="l2", sublinear_tf=True)
+            self._doc_matrix = self._tfidf.fit_transform(self._counts).tocsr().astype(np.float32)
+            self._idf = self._tfidf.idf_.astype(np.float32)
+        else:
+            # BM25 idf (the "+1" variant that stays positive for very common terms)
+            self._idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+            doc_len = np.asarray(self._counts.sum(axis=1)).ravel()
+            avg_len = doc_len.mean() if n_docs else 0.0
+            # Apply the BM25 term weighting to the stored non-zeros in one vectorized pass
+            weighted = self._counts.copy()
+            row_len = np.repeat(doc_len, np.diff(weighted.indptr))
+            norm = self.k1 * (1.0 - self.b + self.b * row_len / (avg_len or 1.0))
+            tf = weighted.data
+            weighted.data = (tf * (self.k1 + 1.0) / (tf + norm) * self._idf[weighted.indices]).astype(np.float32)
+            self._doc_matrix = weighted
+        return self
+
+    # --- Scoring ---
+    def score(self, jd_text):
+        """
+        Scores one job description against every resume in the corpus.
+
+        Returns:
+            np.ndarray: One score per resume, in corpus order (higher is better).
+
+        Raises:
+            RuntimeError: If called before `fit`.
+        """
+        # CSR matrix times a dense vector: one pass over the corpus' non-zeros
+        return self._doc_matrix @ self._query_vector(jd_text)
+
+    def top_k(self, jd_text, k=50):
+        """
+        Returns the `k` best-scoring resumes as (resume_id, score) pairs, best first.
+        """
+        scores = self.score(jd_text)
+        k = min(k, scores.shape[0])
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.resume_ids[i], float(scores[i])) for i in top]
+
+    def explain(self, jd_text, resume_id, top_n=15):
+        """
+        Lists which JD keywords a resume contains and which it lacks.
+
+        Terms are ordered by their IDF weight, so distinctive skills come before
+        generic words. JD terms never seen in the corpus count as maximally rare.
+
+        Args:
+            jd_text (str): The job description text.
+            resume_id: A resume id passed to `fit`.
+            top_n (int, optional): Maximum terms per list. Defaults to 15.
+
+        Returns:
+            dict: {"overlapping": [term, ...], "missing": [term, ...]}.
+        """
+        self._check_fitted()
+        row = self._counts.getrow(self._row_of[resume_id])
+        resume_terms = set(row.indices)
+        vocabulary = self.vectorizer.vocabulary_
+        max_idf = float(self._idf.max()) if self._idf.size else 1.0
+
+        overlapping, missing = [], []
+        for term in set(self.vectorizer.build_analyzer()(jd_text)):
+            column = vocabulary.get(term)
+            weight = float(self._idf[column]) if column is not None else max_idf
+            target = overlapping if column is not None and column in resume_terms else missing
+            target.append((weight, term))
+        return {
+            "overlapping": [term for _, term in sorted(overlapping, key=lambda x: (-x[0], x[1]))[:top_n]],
+            "missing": [term for _, term in sorted(missing, key=lambda x: (-x[0], x[1]))[:top_n]],
+        }
+
+    # --- Internal helpers ---
+    def _check_fitted(self):
+        if self._doc_matrix is None:
+            raise RuntimeError("LexicalMatcher must be fitted before scoring (call fit).")
+
+    def _query_vector(self, jd_text):
+        self._check_fitted()
+        counts = self.vectorizer.transform([jd_text]).astype(np.float32)
+        query = np.zeros(counts.shape[1], dtype=np.float32)
+        if self.scoring == "tfidf":
+            weighted = self._tfidf.transform(counts)
+            query[weighted.indices] = weighted.data
+        else:
+            # BM25 query: each distinct JD term counts once (weights live in the doc matrix)
+            query[counts.indices] = 1.0
+        return query
+
+
+def get_common_keywords(resume_text, jd_text, top_n=20):
+    """
+    Quick keyword overlap between one resume and one job description, without a
+    fitted corpus (terms are ordered by how often the JD mentions them).
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_text (str): The text content of the job description.
+        top_n (int, optional): Maximum terms per list. Defaults to 20.
+
+    Returns:
+        dict: {"common": [term, ...], "missing": [term, ...]} where "missing" are JD
+              keywords absent from the resume.
+    """
+    analyzer = _make_vectorizer().build_analyzer()
+    resume_terms = set(analyzer(resume_text))
+    jd_counts = {}
+    for term in analyzer(jd_text):
+        jd_counts[term] = jd_counts.get(term, 0) + 1
+    ordered = sorted(jd_counts, key=lambda term: (-jd_counts[term], term))
+    return {
+        "common": [term for term in ordered if term in resume_terms][:top_n],
+        "missing": [term for term in ordered if term not in resume_terms][:top_n],
+    }
@@ -1,72 +1,123 @@
-import sys
+# src/matching/matcher.py
+
+import logging
 import os
-import pprint
+import time
 
-print("-" * 30)
-print("DEBUG: INSIDE matcher.py - TOP LEVEL")
-try:
-    # Calculate paths relative to *this* file (matcher.py)
-    matcher_file_path = os.path.abspath(__file__)
-    matching_dir = os.path.dirname(matcher_file_path)
-    src_dir = os.path.abspath(os.path.join(matching_dir, '..')) # Go up one level to src
-    llm_dir = os.path.join(src_dir, 'LLM')
-    llm_init_file = os.path.join(llm_dir, '__init__.py')
-    llm_client_file = os.path.join(llm_dir, 'client.py')
-    src_init_file = os.path.join(src_dir, '__init__.py')
-
-    print(f"DEBUG (matcher.py): My path is: {matcher_file_path}")
-    print(f"DEBUG (matcher.py): Calculated src dir: {src_dir}")
-    print(f"DEBUG (matcher.py): Calculated LLM dir: {llm_dir}")
-    print(f"DEBUG (matcher.py): Does src dir exist? {os.path.isdir(src_dir)}")
-    print(f"DEBUG (matcher.py): Does src/__init__.py exist? {os.path.isfile(src_init_file)}")
-    print(f"DEBUG (matcher.py): Does LLM dir exist? {os.path.isdir(llm_dir)}")
-    print(f"DEBUG (matcher.py): Does LLM/__init__.py exist? {os.path.isfile(llm_init_file)}")
-    print(f"DEBUG (matcher.py): Does LLM/client.py exist? {os.path.isfile(llm_client_file)}")
-    print(f"DEBUG (matcher.py): Is src dir in sys.path? {src_dir in sys.path}")
-    print("DEBUG (matcher.py): Current sys.path:")
-    pprint.pprint(sys.path)
-
-except Exception as debug_e:
-    print(f"DEBUG (matcher.py): Error during path debugging: {debug_e}")
-print("-" * 30)
-# --- End Debug Block ---
-
-
-# --- Original Imports ---
-from sentence_transformers import SentenceTransformer, util
-# ... other imports needed by matcher.py ...
+import numpy as np
+
+import instrumentation
+import model_registry
+from matching.chunking import (DEFAULT_CHUNK_WORDS, DEFAULT_OVERLAP_WORDS, chunk_text, content_defined_chunks,
+                               pool_chunk_scores)
+from matching.embedding_cache import EmbeddingCache, make_cache_key
+from matching.inference_backends import DEFAULT_AGREEMENT_TOLERANCE, load_embedding_backend, validate_backend
+from llm.compaction import compact_match_inputs
+from llm.prompts import (IMPROVE_PROMPT_VERSION, MATCH_PROMPT_VERSION, build_improve_prompt, build_match_prompt,
+                         parse_match_score)
+from llm.response_cache import default_response_cache, make_response_key
 
+logger = logging.getLogger(__name__)
 
 # --- Import LLM model getter ---
 get_model = None # Initialize to None
+get_model_name = None
 try:
-    # Try absolute import from src directory (since src is in sys.path)
-    print("DEBUG (matcher.py): Attempting absolute import: from LLM.client import get_model") # Keep this print
-    from llm.client import get_model
-    print("✅ Successfully imported 'get_model' from LLM.client using absolute path in matcher.py.")
-
-except ImportError as e:
-    # Make the error message more specific here
-    print(f"ERROR (matcher.py): Failed absolute import 'from LLM.client import get_model'. Error: {e}. LLM features will be unavailable.")
-    # get_model remains None
+    from llm.client import get_model, get_model_name
 except Exception as e:
-    # Catch any other unexpected error during import
-    print(f"An unexpected error occurred during import of get_model in matcher.py: {e}")
-    # get_model remains None
+    # Embedding similarity still works without the LLM client
+    logger.error("Failed to import the LLM client: %s. LLM features will be unavailable.", e)
 
 # --- Sentence Transformer Model Loading ---
-# Load the Sentence Transformer model ONCE when the module is loaded.
-# This is much more efficient than loading it inside the function every time it's called.
+# The model is registered here but only loaded the first time it is needed (or when
+# warm_embedding_model() is called), so importing this module does not pull in torch.
 # 'all-MiniLM-L6-v2' is a good starting point - fast and reasonably accurate for semantic similarity.
-embedding_model = None # Initialize to None
-try:
-    print("Loading Sentence Transformer model (all-MiniLM-L6-v2)...")
-    # Wrap model loading in try-except in case download or loading fails
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-    print("✅ Sentence Transformer model loaded successfully.")
-except Exception as e:
-    print(f"Error loading Sentence Transformer model: {e}. Embedding similarity will not be available.")
-    # embedding_model remains None if loading fails
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# CPU inference backend (see matching.inference_backends): "torch", "torch-int8" or "onnx".
+# An optimized backend is used only if it agrees with the fp32 torch model to within
+# EMBEDDING_AGREEMENT_TOLERANCE cosine; otherwise the torch model is used instead.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0")) or None
+EMBEDDING_AGREEMENT_TOLERANCE = float(os.getenv("EMBEDDING_AGREEMENT_TOLERANCE", DEFAULT_AGREEMENT_TOLERANCE))
+_active_embedding_backend = "torch"  # the backend actually serving, set by the loader
+
+
+def _load_embedding_model():
+    global _active_embedding_backend
+    logger.info("Loading Sentence Transformer model (%s, backend=%s)...", EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+    # sentence_transformers (and torch) are only imported inside the backend loader,
+    # since they dominate startup time
+    reference = load_embedding_backend(EMBEDDING_MODEL_NAME, "torch", EMBEDDING_NUM_THREADS)
+    model = reference
+    _active_embedding_backend = "torch"
+    if EMBEDDING_BACKEND != "torch":
+        try:
+            candidate = load_embedding_backend(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_NUM_THREADS)
+            passed, agreement = validate_backend(candidate, reference, EMBEDDING_AGREEMENT_TOLERANCE)
+            if passed:
+                model = candidate
+                _active_embedding_backend = EMBEDDING_BACKEND
+                logger.info("Using '%s' embedding backend (min cosine agreement %.4f).", EMBEDDING_BACKEND, agreement)
+            else:
+                logger.warning("'%s' embedding backend agrees only to %.4f (< %s); falling back to 'torch'.",
+                               EMBEDDING_BACKEND, agreement, EMBEDDING_AGREEMENT_TOLERANCE)
+        except Exception as e:
+            logger.warning("Could not load '%s' embedding backend: %s. Falling back to 'torch'.", EMBEDDING_BACKEND, e)
+    logger.info("Sentence Transformer model loaded.")
+    return model
+
+
+_embedding_resource = model_registry.register("embedding", _load_embedding_model)
+
+
+def get_embedding_model():
+    """
+    Returns the SentenceTransformer model, loading it on first call.
+
+    Returns:
+        SentenceTransformer | None: The model, or None if loading failed.
+    """
+    try:
+        return _embedding_resource.get()
+    except Exception as e:
+        logger.error("Error loading Sentence Transformer model: %s. Embedding similarity will not be available.", e)
+        return None
+
+
+def get_embedding_model_id():
+    """
+    Identifies the model and backend producing embeddings, e.g. 'all-MiniLM-L6-v2' or
+    'all-MiniLM-L6-v2@onnx'. Used in embedding cache keys, so vectors from different
+    backends are never mixed. Only meaningful once the model has been loaded.
+    """
+    if _active_embedding_backend == "torch":
+        return EMBEDDING_MODEL_NAME
+    return f"{EMBEDDING_MODEL_NAME}@{_active_embedding_backend}"
+
+
+def warm_embedding_model():
+    """
+    Loads the embedding model ahead of first use (e.g., when a worker starts).
+
+    Returns:
+        float | None: Load time in seconds, or None if loading failed.
+    """
+    if get_embedding_model() is None:
+        return None
+    return _embedding_resource.load_seconds
+
+# --- Embedding Cache ---
+# Vectors are stored by a hash of (model name, normalized text), so re-scoring a text
+# that was already embedded (Streamlit reruns, restarted batch jobs) skips the model.
+# Set EMBEDDING_CACHE_DIR to an empty string to keep the cache in memory only.
+# How compute_embedding_similarity embeds a whole document: "full" encodes the text as
+# one input (truncated by the model), "incremental" recomposes it from content-defined
+# chunk vectors so an edited document only re-encodes the chunks that changed.
+EMBEDDING_DOCUMENT_MODE = os.getenv("EMBEDDING_DOCUMENT_MODE", "full")
+
+_default_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "resume_jd_matcher", "embeddings")
+embedding_cache = EmbeddingCache(cache_dir=os.getenv("EMBEDDING_CACHE_DIR", _default_cache_dir) or None)
 
 
 # --- Function 1: Numerical Embedding Similarity ---
@@ -83,26 +134,29 @@ def compute_embedding_similarity(resume_text, jd_text):
         float | None: The cosine similarity score (typically between 0.0 and 1.0 for text),
                       or None if the embedding model failed to load or an error occurs during computation.
     """
-    # Check if the embedding model was loaded successfully during module import
-    if embedding_model is None:
-        print("Error: Sentence Transformer model not available for similarity computation.")
+    # Check if the embedding model can be loaded (it is loaded on first use)
+    if get_embedding_model() is None:
+        logger.error("Sentence Transformer model not available for similarity computation.")
         return None # Return None if model isn't loaded
 
     # Ensure inputs are strings
     if not isinstance(resume_text, str) or not isinstance(jd_text, str):
-        print("Error: Both resume_text and jd_text must be strings.")
+        logger.error("Both resume_text and jd_text must be strings.")
         return None
 
+    if EMBEDDING_DOCUMENT_MODE == "incremental":
+        return compute_incremental_similarity(resume_text, jd_text)
+
     try:
-        print("Encoding resume and JD text for similarity calculation...")
-        # Encode both texts into vector embeddings. convert_to_tensor=True is efficient for util.cos_sim.
-        embeddings = embedding_model.encode([resume_text, jd_text], convert_to_tensor=True)
+        with instrumentation.span("similarity", mode="pairwise"):
+            # Encode both texts into normalized vector embeddings (cached vectors are reused)
+            embeddings = encode_texts([resume_text, jd_text])
 
-        # Calculate the cosine similarity between the two embeddings
-        # embeddings[0] is the resume embedding, embeddings[1] is the JD embedding
-        # .item() extracts the scalar value from the resulting tensor (e.g., tensor([[0.75]]))
-        similarity_score = util.cos_sim(embeddings[0], embeddings[1]).item()
-        print(f"Computed embedding similarity score: {similarity_score:.4f}")
+            # Calculate the cosine similarity between the two embeddings
+            # embeddings[0] is the resume embedding, embeddings[1] is the JD embedding.
+            # Both have unit length, so their dot product is the cosine similarity.
+            similarity_score = float(np.dot(embeddings[0], embeddings[1]))
+        logger.debug("Computed embedding similarity score: %.4f", similarity_score)
 
         # Ensure score is within expected range (cosine sim is -1 to 1, but for text often 0-1)
         # Clamping might be useful if you want to strictly enforce a 0-1 range for display
@@ -111,173 +165,603 @@ def compute_embedding_similarity(resume_text, jd_text):
         return similarity_score # Return the calculated float score
 
     except Exception as e:
-        print(f"Error computing embedding similarity: {e}")
+        logger.error("Error computing embedding similarity: %s", e)
+        instrumentation.incr("errors_total", stage="similarity")
         return None # Return None if an error occurs during encoding/similarity calculation
 
 
-# --- Function 2: LLM-based Matching Analysis ---
-def match_resume_with_jd_llm(resume_text, jd_text):
+# --- Function 1b: Batched Embedding Encoding ---
+def encode_texts(texts, batch_size=32, stats=None):
     """
-    Uses a Generative Language Model (Gemini) to analyze the match between
-    a resume and a job description, providing a score, explanation, and missing factors.
+    Encodes a list of texts into L2-normalized embedding vectors, encoding each
+    unique text exactly once.
+
+    Texts are de-duplicated and looked up in the embedding cache first. The remaining
+    texts are sorted by length before being handed to the model, so every batch
+    contains texts of similar length and little compute is wasted on padding.
+    The returned rows are in the same order as the input list.
+
+    Args:
+        texts (list[str]): The texts to encode.
+        batch_size (int, optional): Number of texts per model forward pass. Defaults to 32.
+        stats (dict, optional): If given, "unique", "cache_hits" and "encoded" counts for
+                                this call are added to it.
+
+    Returns:
+        np.ndarray: A float32 array of shape (len(texts), embedding_dim) whose rows
+                    have unit length, so a dot product between rows is their cosine similarity.
+
+    Raises:
+        RuntimeError: If the embedding model failed to load.
+    """
+    embedding_model = get_embedding_model()
+    if embedding_model is None:
+        raise RuntimeError("Sentence Transformer model not available for encoding.")
+
+    # Map every unique text to a single slot; duplicates share the same row
+    unique_texts = list(dict.fromkeys(texts))
+    slot_of = {text: i for i, text in enumerate(unique_texts)}
+
+    dim = embedding_model.get_sentence_embedding_dimension()
+    unique_vectors = np.empty((len(unique_texts), dim), dtype=np.float32)
+
+    # Serve whatever the cache already knows; only the misses go through the model
+    model_id = get_embedding_model_id()
+    keys = [make_cache_key(model_id, text) for text in unique_texts]
+    cached = embedding_cache.get_many(keys)
+    missing = []
+    for i, key in enumerate(keys):
+        if key in cached:
+            unique_vectors[i] = cached[key]
+        else:
+            missing.append(i)
+
+    instrumentation.incr("cache_hits_total", len(unique_texts) - len(missing), cache="embedding")
+    instrumentation.incr("cache_misses_total", len(missing), cache="embedding")
+    if stats is not None:
+        for name, count in (("unique", len(unique_texts)), ("cache_hits", len(unique_texts) - len(missing)),
+                            ("encoded", len(missing))):
+            stats[name] = stats.get(name, 0) + count
+
+    # Length-sorted order keeps similarly sized texts together in a batch
+    missing.sort(key=lambda i: len(unique_texts[i]))
+    if missing:
+        with instrumentation.span("encode"):
+            encoded = embedding_model.encode(
+                [unique_texts[i] for i in missing],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        instrumentation.incr("texts_encoded_total", len(missing))
+        unique_vectors[missing] = encoded
+        embedding_cache.put_many({keys[i]: unique_vectors[i] for i in missing})
+
+    return unique_vectors[[slot_of[text] for text in texts]]
+
+
+def compute_embedding_similarity_matrix(resume_texts, jd_texts, batch_size=32):
+    """
+    Computes the semantic similarity between every resume and every job description
+    in one pass.
+
+    Each unique text across both lists is encoded exactly once (see `encode_texts`),
+    and the full score matrix comes from a single matrix multiply of the normalized
+    embeddings. Scores match `compute_embedding_similarity` for the same pair.
+
+    Args:
+        resume_texts (list[str]): The resume texts (rows of the result).
+        jd_texts (list[str]): The job description texts (columns of the result).
+        batch_size (int, optional): Number of texts per model forward pass. Defaults to 32.
+
+    Returns:
+        np.ndarray | None: A float32 array of shape (len(resume_texts), len(jd_texts))
+                           with cosine similarity scores, or None if the embedding model
+                           is unavailable, the inputs are invalid, or encoding fails.
+    """
+    if get_embedding_model() is None:
+        logger.error("Sentence Transformer model not available for similarity computation.")
+        return None
+
+    resume_texts = list(resume_texts)
+    jd_texts = list(jd_texts)
+    if not all(isinstance(text, str) for text in resume_texts + jd_texts):
+        logger.error("All resume and JD texts must be strings.")
+        return None
+
+    try:
+        with instrumentation.span("similarity", mode="matrix"):
+            # Encode resumes and JDs together so a text shared by both lists is encoded once
+            vectors = encode_texts(resume_texts + jd_texts, batch_size=batch_size)
+            resume_vectors = vectors[:len(resume_texts)]
+            jd_vectors = vectors[len(resume_texts):]
+            # Rows are unit length, so the dot product is the cosine similarity
+            return resume_vectors @ jd_vectors.T
+    except Exception as e:
+        logger.error("Error computing embedding similarity matrix: %s", e)
+        instrumentation.incr("errors_total", stage="similarity")
+        return None
+
+
+# --- Function 1c: Chunked Long-Document Similarity ---
+def compute_chunked_similarity_matrix(resume_texts, jd_texts, pooling="mean", top_k=3,
+                                      chunk_words=DEFAULT_CHUNK_WORDS,
+                                      overlap_words=DEFAULT_OVERLAP_WORDS, batch_size=32):
+    """
+    Computes resume-vs-JD similarity over the full length of every document.
+
+    Each document is split into overlapping word windows (see `chunking.chunk_text`)
+    so nothing past the model's 256 word-piece limit is dropped. Every chunk of every
+    document is encoded in one batched `encode_texts` call (chunks are cached like any
+    other text, so they are reused across pairs and runs), all chunk-to-chunk
+    similarities come from a single matrix multiply, and they are pooled back to one
+    score per pair (see `chunking.pool_chunk_scores`).
+
+    Args:
+        resume_texts (list[str]): The resume texts (rows of the result).
+        jd_texts (list[str]): The job description texts (columns of the result).
+        pooling (str, optional): "max", "mean" or "topk". Defaults to "mean".
+        top_k (int, optional): JD chunks averaged in "topk" mode. Defaults to 3.
+        chunk_words (int, optional): Words per chunk. Defaults to DEFAULT_CHUNK_WORDS.
+        overlap_words (int, optional): Words shared by neighbouring chunks.
+                                       Defaults to DEFAULT_OVERLAP_WORDS.
+        batch_size (int, optional): Number of chunks per model forward pass. Defaults to 32.
+
+    Returns:
+        np.ndarray | None: A float32 array of shape (len(resume_texts), len(jd_texts)),
+                           or None if the embedding model is unavailable, the inputs
+                           are invalid, or encoding fails.
+    """
+    if get_embedding_model() is None:
+        logger.error("Sentence Transformer model not available for similarity computation.")
+        return None
+
+    resume_texts = list(resume_texts)
+    jd_texts = list(jd_texts)
+    if not all(isinstance(text, str) for text in resume_texts + jd_texts):
+        logger.error("All resume and JD texts must be strings.")
+        return None
+    if not resume_texts or not jd_texts:
+        return np.zeros((len(resume_texts), len(jd_texts)), dtype=np.float32)
+
+    try:
+        return _chunked_similarity(resume_texts, jd_texts, pooling, top_k, chunk_words, overlap_words, batch_size)
+    except Exception as e:
+        logger.error("Error computing chunked similarity matrix: %s", e)
+        instrumentation.incr("errors_total", stage="similarity")
+        return None
+
+
+def _chunked_similarity(resume_texts, jd_texts, pooling, top_k, chunk_words, overlap_words, batch_size):
+    with instrumentation.span("similarity", mode="chunked"):
+        # Flatten every document into its chunks, remembering where each document starts
+        resume_chunks, resume_offsets = [], []
+        for text in resume_texts:
+            resume_offsets.append(len(resume_chunks))
+            resume_chunks.extend(chunk_text(text, chunk_words, overlap_words))
+        jd_chunks, jd_offsets = [], []
+        for text in jd_texts:
+            jd_offsets.append(len(jd_chunks))
+            jd_chunks.extend(chunk_text(text, chunk_words, overlap_words))
+
+        # One batched encode for all chunks of all documents
+        vectors = encode_texts(resume_chunks + jd_chunks, batch_size=batch_size)
+        chunk_scores = vectors[:len(resume_chunks)] @ vectors[len(resume_chunks):].T
+
+        pooled = pool_chunk_scores(chunk_scores, np.array(resume_offsets), np.array(jd_offsets),
+                                   pooling=pooling, top_k=top_k)
+        return pooled.astype(np.float32)
+
+
+def compute_chunked_similarity(resume_text, jd_text, pooling="mean", top_k=3):
+    """
+    Pairwise convenience wrapper around `compute_chunked_similarity_matrix`.
 
     Args:
         resume_text (str): The text content of the resume.
         jd_text (str): The text content of the job description.
+        pooling (str, optional): "max", "mean" or "topk". Defaults to "mean".
+        top_k (int, optional): JD chunks averaged in "topk" mode. Defaults to 3.
 
     Returns:
-        str | None: The analysis text generated by the LLM, or None if the LLM
-                    model is not available or an error occurs during generation.
+        float | None: The pooled similarity score, or None on failure.
     """
-    # Check if the LLM model was successfully retrieved or instantiated earlier.
-    # Re-check here in case client.py runs after this module is imported.
-    current_llm_model = get_model() # Call get_model again to get the latest state
-
-    if not current_llm_model:
-        print("Error: LLM model not available. Cannot perform LLM-based matching.")
+    scores = compute_chunked_similarity_matrix([resume_text], [jd_text], pooling=pooling, top_k=top_k)
+    if scores is None:
         return None
+    return float(scores[0, 0])
 
-    # Ensure inputs are strings
+
+# --- Function 1d: Incremental Document Embeddings ---
+def encode_documents(texts, batch_size=32, stats=None):
+    """
+    Embeds whole documents from their content-defined chunks.
+
+    Each document is split with `chunking.content_defined_chunks`, every chunk goes
+    through `encode_texts` (so chunks seen before, in this or any other document, come
+    from the embedding cache), and the document vector is the word-count-weighted mean
+    of its chunk vectors, re-normalized. After a small edit only the chunk(s) around the
+    edit are new, so re-embedding costs time proportional to the size of the change.
+    Unlike a single `encode_texts` call, nothing past the model's input window is lost.
+
+    Args:
+        texts (list[str]): The documents.
+        batch_size (int, optional): Number of chunks per model forward pass. Defaults to 32.
+        stats (dict, optional): If given, "documents", "chunks", "cache_hits" and
+                                "encoded" (chunks sent to the model) are added to it.
+
+    Returns:
+        np.ndarray: A float32 array of shape (len(texts), embedding_dim) with unit rows.
+
+    Raises:
+        RuntimeError: If the embedding model failed to load.
+    """
+    chunks, owners, weights = [], [], []
+    for i, text in enumerate(texts):
+        for chunk in content_defined_chunks(text):
+            chunks.append(chunk)
+            owners.append(i)
+            weights.append(max(1, len(chunk.split())))
+
+    chunk_stats = {}
+    chunk_vectors = encode_texts(chunks, batch_size=batch_size, stats=chunk_stats)
+    vectors = np.zeros((len(texts), chunk_vectors.shape[1]), dtype=np.float32)
+    np.add.at(vectors, owners, chunk_vectors * np.array(weights, dtype=np.float32)[:, None])
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms > 0, norms, 1.0)
+
+    if stats is not None:
+        for name, count in (("documents", len(texts)), ("chunks", len(chunks)),
+                            ("cache_hits", chunk_stats["cache_hits"]), ("encoded", chunk_stats["encoded"])):
+            stats[name] = stats.get(name, 0) + count
+    return vectors
+
+
+def compute_incremental_similarity(resume_text, jd_text, stats=None):
+    """
+    Resume-JD similarity on document vectors recomposed from cached chunk vectors
+    (see `encode_documents`). Re-scoring after an edit only encodes the changed chunks.
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_text (str): The text content of the job description.
+        stats (dict, optional): Filled with the chunk counts of `encode_documents`.
+
+    Returns:
+        float | None: The cosine similarity score, or None if the embedding model is
+                      unavailable or an error occurs.
+    """
+    if get_embedding_model() is None:
+        logger.error("Sentence Transformer model not available for similarity computation.")
+        return None
     if not isinstance(resume_text, str) or not isinstance(jd_text, str):
-        print("Error: Both resume_text and jd_text must be strings for LLM analysis.")
+        logger.error("Both resume_text and jd_text must be strings.")
         return None
 
-    # Define the prompt for the LLM
-    # This prompt guides the LLM to act as a recruiter and provide specific outputs.
-    # Using clear formatting and instructions improves the reliability of the output.
-    prompt = f"""
-    Analyze the following resume and job description. Act as an expert talent acquisition specialist providing a concise evaluation for a hiring manager.
+    call_stats = {}
+    try:
+        with instrumentation.span("similarity", mode="incremental"):
+            vectors = encode_documents([resume_text, jd_text], stats=call_stats)
+            similarity_score = float(np.dot(vectors[0], vectors[1]))
+    except Exception as e:
+        logger.error("Error computing incremental embedding similarity: %s", e)
+        instrumentation.incr("errors_total", stage="similarity")
+        return None
+    logger.debug("Incremental similarity %.4f: %d of %d chunks encoded.", similarity_score,
+                 call_stats["encoded"], call_stats["chunks"])
+    if stats is not None:
+        stats.update(call_stats)
+    return similarity_score
 
-    **Resume Text:**
-    ---
-    {resume_text}
-    ---
 
-    **Job Description Text:**
-    ---
-    {jd_text}
-    ---
+# --- Shared LLM call path ---
+def _llm_model_name():
+    # Name of the active LLM for cache keys ("" if the client could not be imported)
+    return get_model_name() if get_model_name else ""
 
-    **Your Task:**
-    1.  Provide an overall **Match Score** (out of 100) representing the candidate's suitability based *only* on the provided texts. Base the score on how well the resume demonstrates the qualifications and experience listed in the job description.
-    2.  Write a brief **Explanation** (2-4 sentences) justifying the score, highlighting key alignments or significant gaps.
-    3.  List the most critical **Missing Factors** (specific keywords, skills, qualifications, or years of experience mentioned in the JD but seemingly absent or insufficient in the candidate's resume). If there are no significant missing factors, state "None apparent." Use bullet points for the list.
-    4.  Refer to the person who submitted the resume only as "the candidate" or "the applicant". Do not invent or use a name found in the resume text.
 
-    **Output Format:**
-    Strictly follow this format, including the labels:
+def _run_llm_analysis(prompt, cache_key, use_cache, label, kind):
+    """
+    Sends one prompt to the LLM, going through the response cache.
 
-    Match Score: [Score]/100
-    Explanation: [Your explanation here]
-    Missing Factors:
-    * [Missing factor 1]
-    * [Missing factor 2]
-    * [Or "None apparent."]
+    Only successful responses are cached; the "Error: ..." strings returned for
+    empty/blocked responses or API failures never are, so a retry can succeed.
+
+    Args:
+        prompt (str): The full prompt.
+        cache_key (str): Response cache key (see llm.response_cache.make_response_key).
+        use_cache (bool): False bypasses the cache for both reading and writing.
+        label (str): Short description used in log messages.
+        kind (str): "match" or "improve"; labels the instrumentation span.
+
+    Returns:
+        str | None: The response text, an "Error: ..." string, or None if the LLM is unavailable.
     """
+    cache, cached_text = _lookup_response(cache_key, use_cache, label)
+    if cached_text is not None:
+        return cached_text
+
+    # Check if the LLM model can be retrieved (it is instantiated on first use).
+    current_llm_model = get_model() if get_model else None
+
+    if not current_llm_model:
+        logger.error("LLM model not available. Cannot perform LLM-based %s.", label)
+        return None
 
     try:
-        print("Sending request to LLM for resume-JD analysis...")
+        logger.info("Sending request to LLM for %s...", label)
         # Send the prompt to the Gemini model instance retrieved earlier
-        response = current_llm_model.generate_content(prompt)
+        with instrumentation.span("llm", task=kind):
+            response = current_llm_model.generate_content(prompt)
+        _record_token_usage(response)
 
         # Basic check if response has text (some APIs might return empty responses on errors/filters)
         if hasattr(response, 'text') and response.text:
              analysis_text = response.text
-             print("✅ LLM analysis received.")
+             logger.info("LLM analysis received.")
+             _store_response(cache, cache_key, analysis_text)
              return analysis_text
         else:
              # Handle cases where the response might be blocked or empty
-             print("⚠️ LLM response received but contains no text. It might have been blocked or empty.")
-             # Check for safety ratings or prompt feedback if available
-             if hasattr(response, 'prompt_feedback'):
-                 print(f"Prompt Feedback: {response.prompt_feedback}")
+             logger.warning("LLM response received but contains no text. It might have been blocked or empty. "
+                            "Prompt feedback: %s", getattr(response, 'prompt_feedback', None))
+             instrumentation.incr("errors_total", stage="llm", reason="empty")
              return "Error: LLM response was empty or blocked. Please check content safety settings or modify input."
 
-
     except Exception as e:
         # Handle potential errors during the API call (e.g., network issues, API errors, quota limits)
-        print(f"Error generating LLM response for matching: {e}")
+        logger.error("Error generating LLM response for %s: %s", label, e)
+        instrumentation.incr("errors_total", stage="llm", reason=type(e).__name__)
         return f"Error during LLM analysis: {e}" # Return error message for debugging
 
 
+def _lookup_response(cache_key, use_cache, label):
+    # Returns (cache to store into or None, cached text or None)
+    cache = default_response_cache if use_cache else None
+    if cache is None:
+        return None, None
+    try:
+        cached_text = cache.get(cache_key)
+    except Exception as e:
+        logger.warning("LLM response cache unavailable: %s", e)
+        return None, None
+    if cached_text is not None:
+        logger.info("LLM %s served from cache.", label)
+        instrumentation.incr("cache_hits_total", cache="llm_response")
+    else:
+        instrumentation.incr("cache_misses_total", cache="llm_response")
+    return cache, cached_text
+
+
+def _store_response(cache, cache_key, text):
+    if cache is not None:
+        try:
+            cache.put(cache_key, text)
+        except Exception as e:
+            logger.warning("Could not store LLM response in cache: %s", e)
+
+
+def _record_token_usage(response):
+    # Gemini reports token counts in usage_metadata; count them when instrumentation is on
+    if not instrumentation.is_enabled():
+        return
+    usage = getattr(response, "usage_metadata", None)
+    for kind, field in (("prompt", "prompt_token_count"), ("output", "candidates_token_count"),
+                        ("total", "total_token_count")):
+        count = getattr(usage, field, None)
+        if isinstance(count, int):
+            instrumentation.incr("llm_tokens_total", count, kind=kind)
+
+
+def _match_request(resume_text, jd_text):
+    # Compacts both texts, then builds the prompt and its cache key from the compacted
+    # text, so inputs that differ only in whitespace or boilerplate share an answer
+    resume, jd = compact_match_inputs(resume_text, jd_text)
+    return (build_match_prompt(resume.text, jd.text),
+            make_response_key(_llm_model_name(), MATCH_PROMPT_VERSION, resume.text, jd.text))
+
+
+# --- Function 2: LLM-based Matching Analysis ---
+def match_resume_with_jd_llm(resume_text, jd_text, use_cache=True):
+    """
+    Uses a Generative Language Model (Gemini) to analyze the match between
+    a resume and a job description, providing a score, explanation, and missing factors.
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_text (str): The text content of the job description.
+        use_cache (bool, optional): Serve/store the answer in the LLM response cache.
+                                    Pass False to force a fresh request. Defaults to True.
+
+    Returns:
+        str | None: The analysis text generated by the LLM, or None if the LLM
+                    model is not available or an error occurs during generation.
+    """
+    # Ensure inputs are strings
+    if not isinstance(resume_text, str) or not isinstance(jd_text, str):
+        logger.error("Both resume_text and jd_text must be strings for LLM analysis.")
+        return None
 
+    prompt, cache_key = _match_request(resume_text, jd_text)
+    return _run_llm_analysis(prompt, cache_key, use_cache, "resume-JD analysis", "match")
 
 
 # --- Function 3: LLM-based Resume Improver  ---
-def improve_resume_text(resume_text):
+def improve_resume_text(resume_text, use_cache=True):
     """
     Uses a Generative Language Model (Gemini) to observe mistakes or scope for improvement in the user's resume.
     Aim to improve language, provide options to improve structure and make the resume more ATS friendly.
 
     Args:
         resume_text (str): The text content of the resume.
+        use_cache (bool, optional): Serve/store the answer in the LLM response cache.
+                                    Pass False to force a fresh request. Defaults to True.
 
     Returns:
         str | None: The analysis text generated by the LLM, or None if the LLM
                     model is not available or an error occurs during generation.
     """
-    # Check if the LLM model was successfully retrieved or instantiated earlier.
-    # Re-check here in case client.py runs after this module is imported.
-    current_llm_model = get_model() # Call get_model again to get the latest state
-
-    if not current_llm_model:
-        print("Error: LLM model not available. Cannot perform LLM-based matching.")
+    # Ensure input is a string
+    if not isinstance(resume_text, str):
+        logger.error("resume_text must be a string for LLM analysis.")
         return None
 
-    # Ensure inputs are strings
-    if not isinstance(resume_text, str) or not isinstance(jd_text, str):
-        print("Error: Both resume_text and jd_text must be strings for LLM analysis.")
-        return None
-
-    # Define the prompt for the LLM
-    # This prompt guides the LLM to act as a recruiter and provide specific outputs.
-    # Using clear formatting and instructions improves the reliability of the output.
-    prompt = f"""
-    Analyze the following resume and job description. Act as an expert resume maker and ATS expert providing an evaluation of the user's resume and possible improvements to the same..
-    
-
-    **Resume Text:**
-    ---
-    {resume_text}
-    ---
+    prompt = build_improve_prompt(resume_text)
+    cache_key = make_response_key(_llm_model_name(), IMPROVE_PROMPT_VERSION, resume_text)
+    return _run_llm_analysis(prompt, cache_key, use_cache, "resume analysis", "improve")
 
 
+# --- Streaming variants ---
+class StreamingAnalysis:
+    """
+    One LLM analysis streamed chunk by chunk, so the UI can show text as it is generated.
+
+    Iterate it (once) to receive the text chunks; afterwards the assembled result is on
+    the object. Cached responses arrive as a single chunk. Failures are yielded as an
+    "Error..." chunk too, mirroring the strings the blocking functions return.
+
+    Attributes (complete once iteration ends):
+        text (str | None): The full response, or None if the LLM is unavailable.
+        score (float | None): The parsed Match Score (match analyses only).
+        error (str | None): Why the analysis failed, else None.
+        cached (bool): True if served from the response cache.
+        time_to_first_token (float | None): Seconds until the first chunk arrived.
+        elapsed (float | None): Seconds until the response was complete.
+
+    Usage:
+        analysis = stream_match_resume_with_jd_llm(resume_text, jd_text)
+        for chunk in analysis:
+            print(chunk, end="")
+        print(analysis.score)
+    """
 
-    **Your Task:**
-    1.  Improve the following resume text to make it more appealing and relevant for job applications
-    2.  Focus on enhancing the language, structure, and overall presentation
-    3.  Also please provide keywords that the user has mentioned and how they could be improved; with the aim to make the application more ATS friendly
-    4.  Refer to the person who submitted the resume only as "the candidate" or "the applicant". Do not invent or use a name found in the resume text.
-    5.  Provide a summary of the changes made and why they are beneficial
+    def __init__(self, prompt, cache_key, use_cache, label, kind):
+        self.prompt = prompt
+        self.cache_key = cache_key
+        self.use_cache = use_cache
+        self.label = label
+        self.kind = kind
+        self.text = None
+        self.score = None
+        self.error = None
+        self.cached = False
+        self.time_to_first_token = None
+        self.elapsed = None
+        self._started = False
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError("A StreamingAnalysis can only be iterated once; use .text afterwards.")
+        self._started = True
+        return self._stream()
+
+    def result(self):
+        """Consumes the stream if nobody has, and returns the full text."""
+        if not self._started:
+            for _ in self:
+                pass
+        return self.text
+
+    def _stream(self):
+        start = time.perf_counter()
+        cache, cached_text = _lookup_response(self.cache_key, self.use_cache, self.label)
+        if cached_text is not None:
+            self.cached = True
+            self._finish(cached_text, start, start)
+            yield cached_text
+            return
+
+        current_llm_model = get_model() if get_model else None
+        if not current_llm_model:
+            logger.error("LLM model not available. Cannot perform LLM-based %s.", self.label)
+            self.error = "LLM model not available."
+            return
+
+        parts = []
+        first_at = None
+        try:
+            logger.info("Streaming LLM response for %s...", self.label)
+            with instrumentation.span("llm", task=self.kind):
+                response = current_llm_model.generate_content(self.prompt, stream=True)
+                for chunk in response:
+                    try:
+                        text = chunk.text
+                    except ValueError:  # Gemini raises when a chunk has no text parts (e.g. blocked)
+                        text = ""
+                    if not text:
+                        continue
+                    if first_at is None:
+                        first_at = time.perf_counter()
+                        instrumentation.observe("llm_time_to_first_token_seconds", first_at - start,
+                                                task=self.kind)
+                    parts.append(text)
+                    yield text
+            _record_token_usage(response)
+        except Exception as e:
+            logger.error("Error streaming LLM response for %s: %s", self.label, e)
+            instrumentation.incr("errors_total", stage="llm", reason=type(e).__name__)
+            self.error = f"Error during LLM analysis: {e}"
+            message = ("\n\n" if parts else "") + self.error
+            parts.append(message)
+            self._finish("".join(parts), start, first_at)
+            yield message
+            return
+
+        if not parts:
+            logger.warning("LLM response received but contains no text. It might have been blocked or empty. "
+                           "Prompt feedback: %s", getattr(response, 'prompt_feedback', None))
+            instrumentation.incr("errors_total", stage="llm", reason="empty")
+            self.error = "Error: LLM response was empty or blocked. Please check content safety settings or modify input."
+            self._finish(self.error, start, None)
+            yield self.error
+            return
+
+        self._finish("".join(parts), start, first_at)
+        logger.info("LLM analysis streamed (first token after %.2fs, complete after %.2fs).",
+                    self.time_to_first_token, self.elapsed)
+        # Only complete, successful responses are cached
+        _store_response(cache, self.cache_key, self.text)
+
+    def _finish(self, text, start, first_at):
+        self.text = text
+        self.elapsed = time.perf_counter() - start
+        self.time_to_first_token = first_at - start if first_at is not None else None
+        if self.kind == "match" and self.error is None:
+            self.score = parse_match_score(text)
+
+
+def stream_match_resume_with_jd_llm(resume_text, jd_text, use_cache=True):
+    """
+    Streaming variant of match_resume_with_jd_llm (same prompt, same response cache).
 
-    **Output Format:**
-    Strictly follow this format, including the labels:
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_text (str): The text content of the job description.
+        use_cache (bool, optional): Serve/store the answer in the LLM response cache. Defaults to True.
 
-    Improvements and mistakes: [In a bullet point format]
-    Keywords and ATS: [In bullet point format]
-    Summary of changes:
+    Returns:
+        StreamingAnalysis: Iterate it for the text chunks; .text and .score hold the result afterwards.
     """
+    if not isinstance(resume_text, str) or not isinstance(jd_text, str):
+        raise TypeError("Both resume_text and jd_text must be strings for LLM analysis.")
+    prompt, cache_key = _match_request(resume_text, jd_text)
+    return StreamingAnalysis(prompt, cache_key, use_cache, "resume-JD analysis", "match")
 
-    try:
-        print("Sending request to LLM for resume analysis...")
-        # Send the prompt to the Gemini model instance retrieved earlier
-        response = current_llm_model.generate_content(prompt)
 
-        # Basic check if response has text (some APIs might return empty responses on errors/filters)
-        if hasattr(response, 'text') and response.text:
-             analysis_text = response.text
-             print("✅ LLM analysis received.")
-             return analysis_text
-        else:
-             # Handle cases where the response might be blocked or empty
-             print("⚠️ LLM response received but contains no text. It might have been blocked or empty.")
-             # Check for safety ratings or prompt feedback if available
-             if hasattr(response, 'prompt_feedback'):
-                 print(f"Prompt Feedback: {response.prompt_feedback}")
-             return "Error: LLM response was empty or blocked. Please check content safety settings or modify input."
+def stream_improve_resume_text(resume_text, use_cache=True):
+    """
+    Streaming variant of improve_resume_text (same prompt, same response cache).
 
+    Args:
+        resume_text (str): The text content of the resume.
+        use_cache (bool, optional): Serve/store the answer in the LLM response cache. Defaults to True.
 
-    except Exception as e:
-        # Handle potential errors during the API call (e.g., network issues, API errors, quota limits)
-        print(f"Error generating LLM response for analysis: {e}")
-        return f"Error during LLM analysis: {e}" # Return error message for debugging
+    Returns:
+        StreamingAnalysis: Iterate it for the text chunks; .text holds the result afterwards.
+    """
+    if not isinstance(resume_text, str):
+        raise TypeError("resume_text must be a string for LLM analysis.")
+    prompt = build_improve_prompt(resume_text)
+    cache_key = make_response_key(_llm_model_name(), IMPROVE_PROMPT_VERSION, resume_text)
+    return StreamingAnalysis(prompt, cache_key, use_cache, "resume analysis", "improve")
@@ -0,0 +1,146 @@
+# src/matching/microbatch.py
+
+# Dynamic micro-batching of embedding requests.
+# In a long-lived service, each request wants one or two texts encoded, and running
+# the model once per request wastes most of a forward pass on overhead. The batcher
+# queues concurrent requests and a single worker thread encodes them together once
+# either `max_batch_size` texts are waiting or the oldest request has waited
+# `max_wait_ms`, then hands every caller its own rows back.
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets for the number of texts per model call
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent encode requests into batched model calls.
+
+    Usage:
+        batcher = MicroBatcher(max_batch_size=64, max_wait_ms=5).start()
+        vectors = batcher.encode([resume_text, jd_text])   # blocks; safe from any thread
+        batcher.stop()
+    """
+
+    def __init__(self, encode_fn=None, max_batch_size=64, max_wait_ms=5.0, batch_size=32):
+        """
+        Args:
+            encode_fn (callable, optional): texts -> np.ndarray of unit vectors, one row
+                per text. Defaults to matching.matcher.encode_texts (cache included).
+            max_batch_size (int, optional): Texts that trigger an immediate model call.
+                Defaults to 64.
+            max_wait_ms (float, optional): Longest a request waits for others to join
+                its batch. Defaults to 5.
+            batch_size (int, optional): Forward-pass size passed to encode_texts.
+                Defaults to 32.
+        """
+        if encode_fn is None:
+            from matching.matcher import encode_texts
+
+            def encode_fn(texts):
+                return encode_texts(texts, batch_size=batch_size)
+
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Starts the worker thread. Returns self."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stops the worker after the batch in progress; queued requests fail."""
+        self._stopping.set()
+        self._queue.put(None)  # wake the worker
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, texts):
+        """
+        Queues texts for encoding.
+
+        Returns:
+            concurrent.futures.Future: Resolves to an array with one row per text.
+        """
+        future = Future()
+        if self._stopping.is_set() or self._thread is None:
+            future.set_exception(RuntimeError("MicroBatcher is not running."))
+            return future
+        self._queue.put((list(texts), future, time.perf_counter()))
+        return future
+
+    def encode(self, texts, timeout=None):
+        """Encodes texts through the shared batch and blocks for the result."""
+        return self.submit(texts).result(timeout)
+
+    # --- Worker ---
+    def _run(self):
+        while not self._stopping.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            n_texts = len(first[0])
+            deadline = first[2] + self.max_wait
+            # Keep collecting until the batch is full or the oldest request's wait is up;
+            # requests already queued always join, even once the wait is over
+            while n_texts < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._stopping.set()
+                    break
+                batch.append(item)
+                n_texts += len(item[0])
+            self._encode_batch(batch, n_texts)
+
+        # Fail whatever is still queued so no caller blocks forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("MicroBatcher stopped."))
+
+    def _encode_batch(self, batch, n_texts):
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            instrumentation.observe("microbatch_queue_wait_seconds", started - enqueued)
+        instrumentation.observe("microbatch_size", n_texts, buckets=BATCH_SIZE_BUCKETS)
+        instrumentation.observe("microbatch_requests", len(batch), buckets=BATCH_SIZE_BUCKETS)
+
+        texts = [text for request_texts, _, _ in batch for text in request_texts]
+        try:
+            with instrumentation.span("microbatch_encode"):
+                vectors = self.encode_fn(texts)
+        except Exception as e:
+            logger.error("Batched encode of %d texts failed: %s", n_texts, e)
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future, _ in batch:
+            future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
@@ -0,0 +1,139 @@
+# src/matching/quantization.py
+
+# Compact storage formats for normalized embeddings.
+# 384-dim float32 MiniLM vectors cost 1.5 KB each, i.e. gigabytes per worker for
+# millions of documents. float16 halves that; int8 with one float32 scale per vector
+# cuts it to about a quarter. Similarities are computed directly on the stored codes,
+# converting one block of rows at a time, so a float32 copy of the corpus never exists.
+
+import time
+
+import numpy as np
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+# Rows converted to float32 per block when scoring; bounds the temporary memory
+DEFAULT_BLOCK_ROWS = 8192
+
+
+def quantize(vectors, storage_dtype):
+    """
+    Converts float vectors to a storage format.
+
+    Args:
+        vectors (np.ndarray): Array of shape (n, dim).
+        storage_dtype (str): "float32", "float16" or "int8".
+
+    Returns:
+        tuple[np.ndarray, np.ndarray | None]: The codes and, for "int8", the per-vector
+            float32 scales (None otherwise). A row is recovered as codes[i] * scales[i].
+
+    Raises:
+        ValueError: If `storage_dtype` is not one of STORAGE_DTYPES.
+    """
+    if storage_dtype not in STORAGE_DTYPES:
+        raise ValueError(f"Unsupported storage dtype '{storage_dtype}'. Choose one of {STORAGE_DTYPES}.")
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if storage_dtype == "float32":
+        return vectors.copy(), None
+    if storage_dtype == "float16":
+        return vectors.astype(np.float16), None
+
+    # Symmetric per-vector scaling: the largest component maps to +/-127
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes, scales=None):
+    """
+    Converts stored codes back to float32 vectors.
+    """
+    dense = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        dense *= np.asarray(scales, dtype=np.float32)[:, None]
+    return dense
+
+
+def quantized_scores(queries, codes, scales=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Dot products between float queries and quantized rows, block by block.
+
+    For int8 the per-vector scale is applied to the (queries x block) result rather
+    than to the block itself, which saves one pass over the block.
+
+    Args:
+        queries (np.ndarray): Float query vectors of shape (n_queries, dim).
+        codes (np.ndarray): Stored rows of shape (n, dim) (may be a memory map).
+        scales (np.ndarray, optional): Per-row scales for int8 codes.
+        block_rows (int, optional): Rows converted per step. Defaults to DEFAULT_BLOCK_ROWS.
+
+    Returns:
+        np.ndarray: float32 scores of shape (n_queries, n).
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    n = codes.shape[0]
+    scores = np.empty((queries.shape[0], n), dtype=np.float32)
+    for start in range(0, n, block_rows):
+        end = min(start + block_rows, n)
+        block_scores = queries @ np.asarray(codes[start:end], dtype=np.float32).T
+        if scales is not None:
+            block_scores *= scales[start:end]
+        scores[:, start:end] = block_scores
+    return scores
+
+
+def quantization_report(vectors, queries, k=50, storage_dtypes=STORAGE_DTYPES, repeat=3):
+    """
+    Compares storage formats against float32 on memory, scoring speed and accuracy.
+
+    Args:
+        vectors (np.ndarray): Normalized corpus vectors (n, dim).
+        queries (np.ndarray): Normalized query vectors (n_queries, dim).
+        k (int, optional): Cut-off for the rank-overlap (recall@k) measure. Defaults to 50.
+        storage_dtypes (tuple, optional): Formats to evaluate. Defaults to all.
+        repeat (int, optional): Timing repetitions; the best run is reported. Defaults to 3.
+
+    Returns:
+        list[dict]: One row per format with "storage_dtype", "bytes", "memory_saved_pct",
+            "score_ms", "speedup", "max_abs_score_error", "mean_abs_score_error" and
+            "recall_at_k" (overlap of the top-k with float32's top-k).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    k = min(k, vectors.shape[0])
+
+    reference = queries @ vectors.T
+    reference_top = np.argpartition(-reference, k - 1, axis=1)[:, :k]
+    baseline_bytes = vectors.nbytes
+
+    report = []
+    baseline_ms = None
+    for storage_dtype in storage_dtypes:
+        codes, scales = quantize(vectors, storage_dtype)
+        stored_bytes = codes.nbytes + (scales.nbytes if scales is not None else 0)
+
+        best_ms = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scores = quantized_scores(queries, codes, scales)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+        if storage_dtype == "float32":
+            baseline_ms = best_ms
+
+        errors = np.abs(scores - reference)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(top, reference_top)])
+        report.append({
+            "storage_dtype": storage_dtype,
+            "bytes": int(stored_bytes),
+            "memory_saved_pct": 100.0 * (1 - stored_bytes / baseline_bytes),
+            "score_ms": best_ms,
+            "speedup": (baseline_ms / best_ms) if baseline_ms and best_ms else None,
+            "max_abs_score_error": float(errors.max()),
+            "mean_abs_score_error": float(errors.mean()),
+            "recall_at_k": float(overlap),
+        })
+    return report
@@ -0,0 +1,488 @@
+# src/matching/vector_index.py
+
+# Top-k retrieval over a stored corpus of document embeddings.
+# Answering "given this JD, find the best 50 of 100k resumes" by calling
+# compute_embedding_similarity 100k times is far too slow. This index keeps the
+# normalized resume vectors in one contiguous matrix and scores a query against all
+# of them with blocked matrix multiplies (exact mode), or against only the most
+# promising clusters of an IVF (inverted file) partition (approximate mode).
+# The matrix can be stored as float32, float16 or per-vector-scaled int8
+# (see matching.quantization); scoring works on the stored codes directly.
+
+import json
+import os
+import time
+
+import numpy as np
+
+from matching.quantization import STORAGE_DTYPES, dequantize, quantize, quantized_scores
+
+SEARCH_MODES = ("exact", "ivf")
+
+
+def _normalize_rows(vectors):
+    # Unit-length rows turn the dot product into cosine similarity
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _merge_top_k(best_scores, best_rows, scores, rows, k):
+    # Merge a new block of candidate scores into the running per-query top-k
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    all_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+    if all_scores.shape[1] <= k:
+        return all_scores, all_rows
+    keep = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(all_scores, keep, axis=1), np.take_along_axis(all_rows, keep, axis=1)
+
+
+class VectorIndex:
+    """
+    In-memory (optionally memory-mapped) index of normalized document embeddings.
+
+    Rows live in a contiguous matrix of the chosen storage dtype; `ids` maps each row
+    back to the caller's document id. Deleting a document moves the last row into its
+    slot, so the matrix never has holes and exact search stays a plain blocked scan.
+    """
+
+    def __init__(self, dim, capacity=1024, storage_dtype="float32"):
+        """
+        Args:
+            dim (int): Embedding dimension (384 for all-MiniLM-L6-v2).
+            capacity (int, optional): Initial number of rows to allocate. Defaults to 1024.
+            storage_dtype (str, optional): "float32", "float16" (half the memory) or
+                "int8" (about a quarter, one float32 scale per row). Defaults to "float32".
+
+        Raises:
+            ValueError: If `storage_dtype` is not one of STORAGE_DTYPES.
+        """
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported storage dtype '{storage_dtype}'. Choose one of {STORAGE_DTYPES}.")
+        self.dim = dim
+        self.storage_dtype = storage_dtype
+        self._vectors = np.zeros((max(capacity, 1), dim), dtype=storage_dtype)
+        # Per-row dequantization scales (int8 only)
+        self._scales = np.ones(self._vectors.shape[0], dtype=np.float32) if storage_dtype == "int8" else None
+        self._size = 0
+        self._ids = []
+        self._row_of = {}  # document id -> row
+
+        # IVF state: centroids, the list each row belongs to, and the rows of each list
+        self._centroids = None
+        self._list_of_row = np.zeros(self._vectors.shape[0], dtype=np.int32)
+        self._list_rows = []
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, doc_id):
+        return doc_id in self._row_of
+
+    @property
+    def ids(self):
+        """The document ids in row order."""
+        return list(self._ids)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the stored rows (codes plus scales)."""
+        used = self._vectors[:self._size].nbytes
+        if self._scales is not None:
+            used += self._scales[:self._size].nbytes
+        return int(used)
+
+    @property
+    def is_trained(self):
+        """True once `train_ivf` has built the coarse clustering."""
+        return self._centroids is not None
+
+    # --- Mutation ---
+    def add(self, ids, vectors):
+        """
+        Adds (or replaces) documents in the index.
+
+        Args:
+            ids (list): Document ids (str or int, must be JSON-serializable for `save`).
+            vectors (array-like): Embeddings of shape (len(ids), dim); normalized on insert.
+
+        Raises:
+            ValueError: If the number of ids and vectors differ or the dimension is wrong.
+        """
+        ids = list(ids)
+        vectors = _normalize_rows(vectors)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("The number of ids and vectors must match.")
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}.")
+
+        self._ensure_writable()
+        for doc_id, vector in zip(ids, vectors):
+            row = self._row_of.get(doc_id)
+            if row is None:
+                self._reserve(self._size + 1)
+                row = self._size
+                self._size += 1
+                self._ids.append(doc_id)
+                self._row_of[doc_id] = row
+            elif self.is_trained:
+                self._list_rows[self._list_of_row[row]].discard(row)
+            self._store_row(row, vector)
+            if self.is_trained:
+                list_id = int(np.argmax(self._centroids @ vector))
+                self._list_of_row[row] = list_id
+                self._list_rows[list_id].add(row)
+
+    def remove(self, ids):
+        """
+        Deletes documents from the index. Unknown ids are ignored.
+
+        Args:
+            ids (list): Document ids to delete.
+
+        Returns:
+            int: The number of documents actually removed.
+        """
+        self._ensure_writable()
+        removed = 0
+        for doc_id in ids:
+            row = self._row_of.pop(doc_id, None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if self.is_trained:
+                self._list_rows[self._list_of_row[row]].discard(row)
+            if row != last:
+                # Move the last row into the hole so the matrix stays contiguous
+                moved_id = self._ids[last]
+                self._copy_row(last, row)
+                self._ids[row] = moved_id
+                self._row_of[moved_id] = row
+                if self.is_trained:
+                    list_id = self._list_of_row[last]
+                    self._list_rows[list_id].discard(last)
+                    self._list_rows[list_id].add(row)
+                    self._list_of_row[row] = list_id
+            self._ids.pop()
+            self._size -= 1
+            removed += 1
+        return removed
+
+    # --- Approximate index ---
+    def train_ivf(self, n_lists=None, n_iter=10, sample_size=50000, seed=0):
+        """
+        Builds the IVF coarse clustering with spherical k-means over the stored vectors.
+
+        Args:
+            n_lists (int, optional): Number of clusters. Defaults to about sqrt(len(index)).
+            n_iter (int, optional): k-means iterations. Defaults to 10.
+            sample_size (int, optional): Vectors sampled to fit the centroids. Defaults to 50000.
+            seed (int, optional): Random seed for reproducible clustering. Defaults to 0.
+
+        Raises:
+            ValueError: If the index is empty.
+        """
+        if self._size == 0:
+            raise ValueError("Cannot train an IVF partition on an empty index.")
+        n_lists = n_lists or max(1, int(np.sqrt(self._size)))
+        n_lists = min(n_lists, self._size)
+
+        rng = np.random.default_rng(seed)
+        sample_rows = rng.choice(self._size, size=min(sample_size, self._size), replace=False)
+        sample = self._dense_rows(np.sort(sample_rows))
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for list_id in range(n_lists):
+                members = sample[assignment == list_id]
+                if len(members):
+                    centroids[list_id] = members.sum(axis=0)
+            centroids = _normalize_rows(centroids)
+
+        self._centroids = centroids
+        self._assign_all_rows()
+
+    # --- Search ---
+    def search(self, queries, k=50, mode="exact", nprobe=8, block_size=65536):
+        """
+        Finds the `k` stored documents most similar to each query vector.
+
+        Args:
+            queries (array-like): One query vector (dim,) or a matrix (n_queries, dim).
+            k (int, optional): Number of results per query. Defaults to 50.
+            mode (str, optional): "exact" (blocked brute force) or "ivf" (approximate,
+                                  requires `train_ivf`). Defaults to "exact".
+            nprobe (int, optional): Clusters scanned per query in "ivf" mode. Defaults to 8.
+            block_size (int, optional): Rows scored per matrix multiply in "exact" mode.
+                                        Defaults to 65536.
+
+        Returns:
+            list[list[tuple]]: For each query, up to `k` (doc_id, score) pairs sorted by
+                               descending score.
+
+        Raises:
+            ValueError: If `mode` is unknown or "ivf" is requested before training.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode '{mode}'. Choose one of {SEARCH_MODES}.")
+        queries = _normalize_rows(queries)
+        k = min(k, self._size)
+        if k == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        if mode == "exact":
+            scores, rows = self._search_exact(queries, k, block_size)
+        else:
+            if not self.is_trained:
+                raise ValueError("IVF search requested but the index has not been trained (call train_ivf).")
+            scores, rows = self._search_ivf(queries, k, nprobe)
+
+        results = []
+        for query_scores, query_rows in zip(scores, rows):
+            order = np.argsort(-query_scores)
+            results.append([(self._ids[query_rows[i]], float(query_scores[i]))
+                            for i in order if query_rows[i] >= 0])
+        return results
+
+    def recall_report(self, queries, k=50, nprobe_values=(1, 2, 4, 8, 16, 32)):
+        """
+        Measures recall and latency of IVF search against the exact path.
+
+        Args:
+            queries (array-like): Query vectors of shape (n_queries, dim).
+            k (int, optional): Result size used for recall@k. Defaults to 50.
+            nprobe_values (tuple, optional): nprobe settings to evaluate.
+
+        Returns:
+            list[dict]: One row per configuration with "mode", "nprobe", "recall_at_k",
+                        "mean_latency_ms" and "p95_latency_ms". The first row is the
+                        exact baseline (recall 1.0).
+        """
+        queries = _normalize_rows(queries)
+
+        def timed(mode, nprobe=None):
+            latencies, results = [], []
+            for query in queries:
+                start = time.perf_counter()
+                results.append(self.search(query, k=k, mode=mode, nprobe=nprobe or 1)[0])
+                latencies.append((time.perf_counter() - start) * 1000)
+            return results, np.array(latencies)
+
+        exact_results, exact_latencies = timed("exact")
+        truth = [{doc_id for doc_id, _ in result} for result in exact_results]
+        report = [{
+            "mode": "exact",
+            "nprobe": None,
+            "recall_at_k": 1.0,
+            "mean_latency_ms": float(exact_latencies.mean()),
+            "p95_latency_ms": float(np.percentile(exact_latencies, 95)),
+        }]
+        if not self.is_trained:
+            return report
+
+        for nprobe in nprobe_values:
+            results, latencies = timed("ivf", nprobe)
+            hits = sum(len(truth[i] & {doc_id for doc_id, _ in result}) for i, result in enumerate(results))
+            total = sum(len(t) for t in truth) or 1
+            report.append({
+                "mode": "ivf",
+                "nprobe": nprobe,
+                "recall_at_k": hits / total,
+                "mean_latency_ms": float(latencies.mean()),
+                "p95_latency_ms": float(np.percentile(latencies, 95)),
+            })
+        return report
+
+    # --- Persistence ---
+    def save(self, path):
+        """
+        Writes the index to a directory (created if missing).
+
+        Layout: `vectors.npy` (the used rows only, in the storage dtype), `scales.npy`
+        for int8 storage, `ids.json`, and, once trained, `centroids.npy` plus
+        `assignments.npy`.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), np.ascontiguousarray(self._vectors[:self._size]))
+        if self._scales is not None:
+            np.save(os.path.join(path, "scales.npy"), np.ascontiguousarray(self._scales[:self._size]))
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "storage_dtype": self.storage_dtype, "ids": self._ids}, f)
+        if self.is_trained:
+            np.save(os.path.join(path, "centroids.npy"), self._centroids)
+            np.save(os.path.join(path, "assignments.npy"), self._list_of_row[:self._size])
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads an index written by `save`.
+
+        Args:
+            path (str): The index directory.
+            mmap (bool, optional): Memory-map the vector matrix (and scales) instead of
+                reading it into RAM. The map is read-only; the first add/remove copies
+                it into memory. Defaults to True.
+
+        Returns:
+            VectorIndex: The loaded index.
+        """
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        # Indexes saved before quantized storage existed are float32
+        index = cls(meta["dim"], capacity=1, storage_dtype=meta.get("storage_dtype", "float32"))
+        mmap_mode = "r" if mmap else None
+        index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        if index.storage_dtype == "int8":
+            index._scales = np.load(os.path.join(path, "scales.npy"), mmap_mode=mmap_mode)
+        index._size = index._vectors.shape[0]
+        index._ids = list(meta["ids"])
+        index._row_of = {doc_id: row for row, doc_id in enumerate(index._ids)}
+        index._list_of_row = np.zeros(index._size, dtype=np.int32)
+
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.isfile(centroids_path):
+            index._centroids = np.load(centroids_path)
+            index._list_of_row = np.load(os.path.join(path, "assignments.npy")).astype(np.int32)
+            index._list_rows = [set() for _ in range(index._centroids.shape[0])]
+            for row, list_id in enumerate(index._list_of_row):
+                index._list_rows[list_id].add(row)
+        return index
+
+    # --- Internal helpers ---
+    def _search_exact(self, queries, k, block_size):
+        best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((queries.shape[0], 0), dtype=np.int64)
+        for start in range(0, self._size, block_size):
+            end = min(start + block_size, self._size)
+            scores = self._score_block(queries, start, end)
+            rows = np.arange(start, end, dtype=np.int64)
+            best_scores, best_rows = _merge_top_k(best_scores, best_rows, scores, rows, k)
+        return best_scores, best_rows
+
+    def _search_ivf(self, queries, k, nprobe):
+        nprobe = min(nprobe, self._centroids.shape[0])
+        probe_lists = np.argpartition(-(queries @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        all_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        all_rows = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        for q, lists in enumerate(probe_lists):
+            rows = np.fromiter((row for list_id in lists for row in self._list_rows[list_id]), dtype=np.int64)
+            if rows.size == 0:
+                continue
+            rows.sort()
+            scores = self._score_rows(queries[q:q + 1], rows)[0]
+            keep = min(k, rows.size)
+            top = np.argpartition(-scores, keep - 1)[:keep]
+            all_scores[q, :keep] = scores[top]
+            all_rows[q, :keep] = rows[top]
+        return all_scores, all_rows
+
+    def _score_block(self, queries, start, end):
+        # Similarities between the queries and the contiguous rows [start, end);
+        # quantized rows are converted to float32 a sub-block at a time
+        if self.storage_dtype == "float32":
+            return queries @ self._vectors[start:end].T
+        scales = self._scales[start:end] if self._scales is not None else None
+        return quantized_scores(queries, self._vectors[start:end], scales)
+
+    def _score_rows(self, queries, rows):
+        # Similarities between the queries and an arbitrary sorted set of rows
+        if self.storage_dtype == "float32":
+            return queries @ self._vectors[rows].T
+        scales = self._scales[rows] if self._scales is not None else None
+        return quantized_scores(queries, self._vectors[rows], scales)
+
+    def _dense_rows(self, rows):
+        # float32 copies of the given rows (used for training)
+        return dequantize(self._vectors[rows], self._scales[rows] if self._scales is not None else None)
+
+    def _store_row(self, row, vector):
+        codes, scales = quantize(vector[None, :], self.storage_dtype)
+        self._vectors[row] = codes[0]
+        if scales is not None:
+            self._scales[row] = scales[0]
+
+    def _copy_row(self, source, target):
+        self._vectors[target] = self._vectors[source]
+        if self._scales is not None:
+            self._scales[target] = self._scales[source]
+
+    def _reserve(self, rows_needed):
+        # Grow the matrix geometrically so repeated adds stay amortized O(1)
+        capacity = self._vectors.shape[0]
+        if rows_needed <= capacity:
+            return
+        new_capacity = max(rows_needed, capacity * 2)
+        grown = np.zeros((new_capacity, self.dim), dtype=self._vectors.dtype)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+        if self._scales is not None:
+            scales = np.ones(new_capacity, dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+        assignments = np.zeros(new_capacity, dtype=np.int32)
+        assignments[:self._size] = self._list_of_row[:self._size]
+        self._list_of_row = assignments
+
+    def _ensure_writable(self):
+        # A memory-mapped index is read-only; copy it into RAM before the first mutation
+        if isinstance(self._vectors, np.memmap) or not self._vectors.flags.writeable:
+            self._vectors = np.array(self._vectors)
+            self._list_of_row = np.array(self._list_of_row)
+            if self._scales is not None:
+                self._scales = np.array(self._scales)
+
+    def _assign_all_rows(self):
+        n_lists = self._centroids.shape[0]
+        self._list_rows = [set() for _ in range(n_lists)]
+        self._list_of_row = np.zeros(self._vectors.shape[0], dtype=np.int32)
+        for start in range(0, self._size, 65536):
+            end = min(start + 65536, self._size)
+            assignment = np.argmax(self._dense_rows(np.arange(start, end)) @ self._centroids.T, axis=1)
+            self._list_of_row[start:end] = assignment
+            for offset, list_id in enumerate(assignment):
+                self._list_rows[list_id].add(start + offset)
+
+
+# --- Resume corpus helpers ---
+def build_resume_index(resume_ids, resume_texts, batch_size=64, storage_dtype="float32"):
+    """
+    Encodes a resume corpus and returns an exact-search VectorIndex over it.
+
+    Args:
+        resume_ids (list): Document ids, one per resume.
+        resume_texts (list[str]): The resume texts.
+        batch_size (int, optional): Number of texts per model forward pass. Defaults to 64.
+        storage_dtype (str, optional): "float32", "float16" or "int8". Defaults to "float32".
+
+    Returns:
+        VectorIndex: The populated index (call `train_ivf` for approximate search).
+    """
+    # Imported here so loading a saved index does not require the embedding model
+    from matching.matcher import encode_texts
+
+    vectors = encode_texts(list(resume_texts), batch_size=batch_size)
+    index = VectorIndex(vectors.shape[1], capacity=len(vectors), storage_dtype=storage_dtype)
+    index.add(resume_ids, vectors)
+    return index
+
+
+def top_resumes_for_jd(index, jd_text, k=50, mode="exact", nprobe=8):
+    """
+    Returns the `k` resumes in `index` most similar to a job description.
+
+    Args:
+        index (VectorIndex): An index built with `build_resume_index` (or loaded from disk).
+        jd_text (str): The job description text.
+        k (int, optional): Number of resumes to return. Defaults to 50.
+        mode (str, optional): "exact" or "ivf". Defaults to "exact".
+        nprobe (int, optional): Clusters scanned in "ivf" mode. Defaults to 8.
+
+    Returns:
+        list[tuple]: (resume_id, score) pairs sorted by descending similarity.
+    """
+    from matching.matcher import encode_texts
+
+    return index.search(encode_texts([jd_text]), k=k, mode=mode, nprobe=nprobe)[0]
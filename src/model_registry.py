@@ -0,0 +1,151 @@
+# src/model_registry.py
+
+# Lazy, thread-safe loading of heavyweight models.
+# Importing the matcher used to load torch + SentenceTransformer and configure Gemini
+# at import time, so every worker, test and CLI paid for both before doing anything
+# (and could not start at all without an API key). Models are now registered with a
+# loader function and only built the first time something asks for them.
+
+import threading
+import time
+
+
+class LazyResource:
+    """
+    Holds one lazily constructed object.
+
+    The loader runs at most once, under a lock, no matter how many threads ask for
+    the object at the same time. A failed load is remembered (so a missing model or
+    API key is not retried on every call) until `reset()` is called.
+    """
+
+    def __init__(self, name, loader):
+        """
+        Args:
+            name (str): Name used in messages and load-time reports.
+            loader (callable): Zero-argument function that builds and returns the object.
+        """
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self.error = None
+        self.load_seconds = None
+
+    @property
+    def is_loaded(self):
+        """True once the loader has succeeded."""
+        return self._loaded
+
+    def get(self):
+        """
+        Returns the object, loading it on first use.
+
+        Raises:
+            Exception: Whatever the loader raised (on this or an earlier attempt).
+        """
+        # Fast path without the lock once loaded
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded and self.error is None:
+                start = time.perf_counter()
+                try:
+                    self._value = self._loader()
+                    self._loaded = True
+                except Exception as e:
+                    self.error = e
+                finally:
+                    self.load_seconds = time.perf_counter() - start
+            if self.error is not None:
+                raise self.error
+            return self._value
+
+    def set(self, value):
+        """
+        Installs an already built object (e.g., a local fake model for tests or benchmarks)
+        in place of whatever the loader would produce.
+        """
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self.error = None
+            self.load_seconds = 0.0
+
+    def reset(self):
+        """Forgets the loaded object (or the remembered failure) so the next `get` reloads."""
+        with self._lock:
+            self._value = None
+            self._loaded = False
+            self.error = None
+            self.load_seconds = None
+
+
+# --- Module-level registry ---
+_resources = {}
+_registry_lock = threading.Lock()
+
+
+def register(name, loader):
+    """
+    Registers a loader under `name`. Re-registering replaces the previous entry.
+
+    Args:
+        name (str): Registry key (e.g., "embedding", "llm").
+        loader (callable): Zero-argument function that builds the object.
+
+    Returns:
+        LazyResource: The registry entry.
+    """
+    with _registry_lock:
+        resource = LazyResource(name, loader)
+        _resources[name] = resource
+        return resource
+
+
+def get(name):
+    """
+    Returns the object registered under `name`, loading it on first use.
+
+    Raises:
+        KeyError: If nothing is registered under `name`.
+        Exception: Whatever the loader raised.
+    """
+    return _resources[name].get()
+
+
+def warm(*names):
+    """
+    Loads the given resources (all registered ones if none are given) ahead of time,
+    e.g. when a worker starts, so the first request does not pay the load cost.
+
+    Returns:
+        dict: name -> load time in seconds, or the exception if loading failed.
+    """
+    results = {}
+    for name in names or list(_resources):
+        resource = _resources[name]
+        try:
+            resource.get()
+            results[name] = resource.load_seconds
+        except Exception as e:
+            results[name] = e
+    return results
+
+
+def load_times():
+    """
+    Reports the state of every registered resource.
+
+    Returns:
+        dict: name -> {"loaded": bool, "load_seconds": float | None, "error": str | None}.
+    """
+    return {
+        name: {
+            "loaded": resource.is_loaded,
+            "load_seconds": resource.load_seconds,
+            "error": str(resource.error) if resource.error is not None else None,
+        }
+        for name, resource in _resources.items()
+    }
@@ -0,0 +1,173 @@
+# src/parsing/bulk_ingest.py
+
+# Parallel bulk PDF ingestion built on extract_pdf_text (the engine behind parse_resume).
+# A drop folder of thousands of resumes is parsed in a process pool sized to the CPU
+# cores. Results are streamed back as a generator in completion order, the number
+# of documents in flight is bounded, and a per-file timeout makes sure one corrupt or
+# pathological PDF can't stall the whole batch.
+
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, namedtuple
+
+from parsing.parse_cache import read_pdf_bytes
+from parsing.resume_parser import extract_pdf_text
+
+# One result per document. `error` is None on success, otherwise "<ExceptionType>: <message>"
+IngestResult = namedtuple("IngestResult", ["doc_id", "text", "page_count", "error"])
+
+
+def iter_pdf_sources(source):
+    """
+    Normalizes the accepted inputs into a lazy stream of (doc_id, data) pairs.
+
+    Args:
+        source: One of
+            - a directory path: every `*.pdf` below it (recursively, sorted);
+            - a single PDF file path;
+            - an iterable whose items are file paths, raw `bytes` blobs, or
+              (doc_id, path_or_bytes) tuples. Blobs without an id get "blob-<n>".
+
+    Yields:
+        tuple: (doc_id, data) where data is a file path or PDF bytes.
+    """
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for filename in sorted(files):
+                    if filename.lower().endswith(".pdf"):
+                        path = os.path.join(root, filename)
+                        yield path, path
+        else:
+            yield source, source
+        return
+
+    for position, item in enumerate(source):
+        if isinstance(item, tuple):
+            yield item
+        elif isinstance(item, bytes):
+            yield f"blob-{position}", item
+        else:
+            yield item, item
+
+
+def _extract_one(doc_id, data):
+    # Runs in a worker process; never raises so one bad file can't break the pool
+    try:
+        text, page_count = extract_pdf_text(data, verbose=False)
+        return IngestResult(doc_id, text, page_count, None)
+    except Exception as e:
+        return IngestResult(doc_id, None, 0, f"{type(e).__name__}: {e}")
+
+
+def ingest_pdfs(source, workers=None, max_in_flight=None, timeout=60.0, poll_interval=0.02, cache=None):
+    """
+    Extracts text from many PDFs in parallel and streams the results back.
+
+    Without a cache, files are read inside the worker processes, so for path inputs the parent never
+    holds more than `max_in_flight` documents' worth of results at a time. A worker
+    that exceeds `timeout` on one file can't be interrupted individually, so the pool
+    is replaced: the slow file is reported as a TimeoutError and the other in-flight
+    files are resubmitted to the fresh pool.
+
+    With a `cache`, each file is read and hashed in the parent first; cache hits are
+    yielded straight away and never reach the pool, and fresh results are stored. The
+    pool is only started on the first file that needs parsing, so a batch of cache
+    hits costs no worker processes.
+
+    Args:
+        source: Directory, file path, or iterable of paths / bytes / (doc_id, data) tuples
+                (see `iter_pdf_sources`).
+        workers (int, optional): Worker processes. Defaults to the number of CPU cores.
+        max_in_flight (int, optional): Maximum documents submitted but not yet yielded.
+                                       Defaults to 2 * workers.
+        timeout (float, optional): Seconds a single file may take once it is running.
+                                   Defaults to 60.
+        poll_interval (float, optional): Sleep between completion checks. Defaults to 0.02.
+        cache (ParseCache, optional): Parse cache to consult and fill. Defaults to None.
+
+    Yields:
+        IngestResult: (doc_id, text, page_count, error) in completion order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or 2 * workers, workers)
+    sources = iter_pdf_sources(source)
+    exhausted = False
+
+    def new_pool():
+        # Recycle workers now and then; long-lived PyMuPDF processes tend to grow
+        return multiprocessing.Pool(processes=workers, maxtasksperchild=200)
+
+    pool = None
+    # Submission order matters: the pool runs tasks FIFO, so only the first `workers`
+    # entries are actually executing and have a running deadline.
+    in_flight = OrderedDict()  # handle -> [doc_id, data, deadline or None, cache key or None]
+
+    try:
+        while True:
+            # Top up the in-flight window from the (lazy) source stream
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    doc_id, data = next(sources)
+                except StopIteration:
+                    exhausted = True
+                    break
+                key = None
+                if cache is not None:
+                    try:
+                        data = read_pdf_bytes(data)
+                    except Exception as e:
+                        yield IngestResult(doc_id, None, 0, f"{type(e).__name__}: {e}")
+                        continue
+                    key = cache.key_for(data)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        yield IngestResult(doc_id, entry[0], entry[1], None)
+                        continue
+                if pool is None:
+                    pool = new_pool()
+                in_flight[pool.apply_async(_extract_one, (doc_id, data))] = [doc_id, data, None, key]
+
+            if not in_flight:
+                return
+
+            now = time.monotonic()
+            for position, entry in enumerate(in_flight.values()):
+                if position >= workers:
+                    break
+                if entry[2] is None:
+                    entry[2] = now + timeout
+
+            finished = [handle for handle in in_flight if handle.ready()]
+            for handle in finished:
+                doc_id, _, _, key = in_flight.pop(handle)
+                try:
+                    result = handle.get()
+                except Exception as e:
+                    result = IngestResult(doc_id, None, 0, f"{type(e).__name__}: {e}")
+                if key is not None and result.error is None:
+                    cache.put(key, result.text, result.page_count)
+                yield result
+
+            timed_out = [handle for handle, entry in in_flight.items()
+                         if entry[2] is not None and now > entry[2]]
+            if timed_out:
+                pool.terminate()
+                pool.join()
+                pool = new_pool()
+                for handle in timed_out:
+                    doc_id = in_flight.pop(handle)[0]
+                    yield IngestResult(doc_id, None, 0, f"TimeoutError: no result after {timeout:.0f}s")
+                # Everything else was lost with the old pool; run it again with fresh deadlines
+                remaining = list(in_flight.values())
+                in_flight.clear()
+                for doc_id, data, _, key in remaining:
+                    in_flight[pool.apply_async(_extract_one, (doc_id, data))] = [doc_id, data, None, key]
+            elif not finished:
+                time.sleep(poll_interval)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
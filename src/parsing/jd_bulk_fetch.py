@@ -0,0 +1,255 @@
+# src/parsing/jd_bulk_fetch.py
+
+# Concurrent bulk fetching of job description URLs.
+# jd_parser() downloads one page at a time through newspaper3k with no timeout control
+# and no connection reuse, so refreshing a few thousand postings takes hours. Here the
+# HTTP is done with pooled requests sessions (one per host), bounded concurrency in a
+# thread pool, per-host rate limits and retries with exponential backoff; newspaper3k
+# is only used to extract the text from the downloaded HTML.
+
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+from parsing.jd_parser import extract_jd_text_from_html
+
+# One result per URL.
+#   text:     the JD text, or None if neither the URL nor the manual fallback produced any
+#   source:   "url", "manual" or None
+#   error:    why the URL fetch failed (kept even when the manual fallback was used), else None
+#   attempts: HTTP attempts made for the URL
+#   elapsed:  seconds spent on this URL, including retries and rate-limit waits
+JDFetchResult = namedtuple("JDFetchResult", ["url", "text", "source", "error", "attempts", "elapsed"])
+
+_END = object()  # end of the URL iterator in fetch_many (None is a possible entry)
+
+# Status codes worth retrying: rate limiting and transient server-side failures
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; ResumeJDMatcher/1.0)"
+
+
+class _HostLimiter:
+    """
+    Per-host politeness: at most `max_concurrent` requests in flight and at least
+    1 / `requests_per_second` seconds between request starts.
+    """
+
+    def __init__(self, max_concurrent, requests_per_second):
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait_turn(self):
+        # Reserve the next start slot, then sleep until it arrives (outside the lock)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class JDFetcher:
+    """
+    Fetches many job description URLs concurrently.
+
+    Usage:
+        fetcher = JDFetcher(max_workers=32)
+        for result in fetcher.fetch_many(urls, manual_texts={url: pasted_text}):
+            ...
+        fetcher.close()
+    """
+
+    def __init__(self, max_workers=16, per_host_concurrency=4, per_host_rate=2.0,
+                 connect_timeout=5.0, read_timeout=20.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=30.0, user_agent=DEFAULT_USER_AGENT,
+                 extractor=extract_jd_text_from_html):
+        """
+        Args:
+            max_workers (int, optional): Concurrent downloads overall. Defaults to 16.
+            per_host_concurrency (int, optional): Concurrent downloads per host (also the
+                size of that host's connection pool). Defaults to 4.
+            per_host_rate (float, optional): Maximum request starts per second per host;
+                0 disables the limit. Defaults to 2.0.
+            connect_timeout (float, optional): Seconds to establish a connection. Defaults to 5.
+            read_timeout (float, optional): Seconds to wait for response data. Defaults to 20.
+            max_retries (int, optional): Retries after the first attempt. Defaults to 3.
+            backoff_base (float, optional): First retry delay in seconds; doubles per retry,
+                with full jitter. Defaults to 0.5.
+            backoff_max (float, optional): Upper bound for a single retry delay. Defaults to 30.
+            user_agent (str, optional): User-Agent header sent with every request.
+            extractor (callable, optional): (url, html) -> text. Defaults to
+                extract_jd_text_from_html (newspaper3k).
+        """
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.user_agent = user_agent
+        self.extractor = extractor
+
+        self._lock = threading.Lock()
+        self._sessions = {}  # host -> requests.Session with its own connection pool
+        self._limiters = {}  # host -> _HostLimiter
+
+    # --- Single URL ---
+    def fetch(self, url, manual_text=None):
+        """
+        Fetches one URL, falling back to `manual_text` like jd_parser() does.
+
+        Args:
+            url (str): The job description URL (may be empty when only manual text is given).
+            manual_text (str, optional): Text to use if the URL yields nothing.
+
+        Returns:
+            JDFetchResult: The outcome for this URL.
+        """
+        start = time.monotonic()
+        text, error = None, None
+        attempts = [0]  # filled in by _download, also when it raises
+        if url:
+            try:
+                html = self._download(url, attempts)
+                text = self.extractor(url, html)
+                if not text:
+                    raise ValueError("Extracted text from URL was empty.")
+            except Exception as e:
+                text, error = None, f"{type(e).__name__}: {e}"
+
+        source = "url" if text else None
+        if not text and manual_text and manual_text.strip():
+            text, source = manual_text.strip(), "manual"
+        if not url and not text:
+            error = "No URL or manual text provided."
+        return JDFetchResult(url, text, source, error, attempts[0], time.monotonic() - start)
+
+    # --- Many URLs ---
+    def fetch_many(self, urls, manual_texts=None):
+        """
+        Fetches many URLs concurrently and yields results as they complete.
+
+        At most 2 * max_workers URLs are pending at any time, so `urls` may be a
+        long lazy iterable.
+
+        Args:
+            urls (iterable[str]): The URLs to fetch.
+            manual_texts (dict, optional): url -> fallback text.
+
+        Yields:
+            JDFetchResult: One per URL, in completion order. Entries that are not
+                           strings (e.g. None) get a result with an error.
+        """
+        manual_texts = manual_texts or {}
+        url_iter = iter(urls)
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while len(pending) < 2 * self.max_workers:
+                    url = next(url_iter, _END)
+                    if url is _END:
+                        break
+                    if not isinstance(url, str):
+                        error = f"Invalid URL: expected a string, got {type(url).__name__}."
+                        yield JDFetchResult(url, None, None, error, 0, 0.0)
+                        continue
+                    pending.add(executor.submit(self.fetch, url, manual_texts.get(url)))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def close(self):
+        """Closes all pooled connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Internal helpers ---
+    def _host_state(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers["User-Agent"] = self.user_agent
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host_concurrency)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._limiters[host] = _HostLimiter(self.per_host_concurrency, self.per_host_rate)
+            return session, self._limiters[host]
+
+    def _download(self, url, attempts):
+        # Returns the HTML; raises the last error once retries are exhausted.
+        # attempts[0] counts the HTTP requests made.
+        session, limiter = self._host_state(urlsplit(url).netloc.lower())
+        attempt = 0
+        while True:
+            attempt += 1
+            attempts[0] = attempt
+            retry_after = None
+            try:
+                with limiter.semaphore:
+                    limiter.wait_turn()
+                    with instrumentation.span("fetch"):
+                        response = session.get(url, timeout=self.timeout)
+                if response.status_code in RETRYABLE_STATUS and attempt <= self.max_retries:
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    response.close()
+                else:
+                    response.raise_for_status()
+                    return response.text
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt > self.max_retries:
+                    raise
+            instrumentation.incr("retries_total", stage="fetch")
+
+            # Exponential backoff with full jitter; the server's Retry-After wins if larger
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            time.sleep(delay)
+
+
+def _parse_retry_after(value):
+    # Only the delta-seconds form is honoured; HTTP dates fall back to normal backoff
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_jds(urls, manual_texts=None, **fetcher_options):
+    """
+    Convenience wrapper: fetches all URLs and returns the results keyed by URL.
+
+    Args:
+        urls (iterable[str]): The URLs to fetch.
+        manual_texts (dict, optional): url -> fallback text.
+        **fetcher_options: Passed to JDFetcher (max_workers, per_host_rate, ...).
+
+    Returns:
+        dict: url -> JDFetchResult.
+    """
+    with JDFetcher(**fetcher_options) as fetcher:
+        return {result.url: result for result in fetcher.fetch_many(urls, manual_texts)}
@@ -1,3 +1,5 @@
+import logging
+
 # Import the Article class from the newspaper3k library
 # newspaper3k is designed to extract article text from web pages
 from newspaper import Article
@@ -5,6 +7,10 @@ from newspaper import Article
 # And potentially 'pip install nltk' and run 'python -m nltk.downloader punkt'
 # if newspaper3k requires the NLTK tokenizer data.
 
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
 def jd_parser(url=None, manual_text=None):
     """
     Extracts Job Description text either from a URL or from manually provided text.
@@ -24,21 +30,23 @@ def jd_parser(url=None, manual_text=None):
     # --- Attempt 1: Extract from URL ---
     if url:
         try:
-            print(f"\nAttempting to extract JD from URL: {url}")
+            logger.info("Attempting to extract JD from URL: %s", url)
             # Create an Article object with the given URL
             article = Article(url)
             # Download the HTML content of the page
             # This might raise network-related exceptions
-            article.download()
+            with instrumentation.span("fetch"):
+                article.download()
             # Parse the downloaded HTML to extract the main article content
             # This uses newspaper3k's algorithms to find the relevant text block
-            article.parse()
+            with instrumentation.span("jd_extract"):
+                article.parse()
             # Get the extracted text and remove leading/trailing whitespace
             jd_text = article.text.strip()
 
             # Check if any text was actually extracted
             if jd_text:
-                print("✅ JD text successfully extracted from URL.")
+                logger.info("JD text successfully extracted from URL.")
                 # If text was found, return it immediately
                 return jd_text
             else:
@@ -49,7 +57,8 @@ def jd_parser(url=None, manual_text=None):
         except Exception as e:
             # Catch any exception during the download/parse process (network error, parsing error, ValueError from above)
             # newspaper3k might not work on all websites (e.g., heavy JS, anti-scraping measures)
-            print(f"⚠️ Could not extract text from URL '{url}'. Reason: {e}")
+            logger.warning("Could not extract text from URL '%s'. Reason: %s", url, e)
+            instrumentation.incr("errors_total", stage="fetch")
             # Do not return here; proceed to check for manual_text as a fallback
 
     # --- Attempt 2: Use Manual Text ---
@@ -57,16 +66,36 @@ def jd_parser(url=None, manual_text=None):
     #   a) No URL was provided initially.
     #   b) URL was provided, but an exception occurred during processing.
     if manual_text:
-        print("ℹ️ Using manually provided text as JD.")
+        logger.info("Using manually provided text as JD.")
         # If manual_text exists, strip whitespace and return it
         return manual_text.strip()
 
     # --- Failure Case ---
     # This part is reached if no URL was given AND no manual_text was given,
     # OR if URL extraction failed AND no manual_text was given.
-    print("❌ No JD text could be obtained either from URL or manual input.")
+    logger.warning("No JD text could be obtained either from URL or manual input.")
     return None
 
+def extract_jd_text_from_html(url, html):
+    """
+    Extracts the main job description text from an already downloaded page.
+    Used by the bulk fetcher, which does its own HTTP (pooling, timeouts, retries)
+    and only needs newspaper3k for the content extraction.
+
+    Args:
+        url (str): The page URL (newspaper3k uses it to resolve relative links).
+        html (str): The downloaded HTML.
+
+    Returns:
+        str: The extracted text, stripped of leading/trailing whitespace (may be empty).
+    """
+    with instrumentation.span("jd_extract"):
+        article = Article(url)
+        # input_html skips newspaper3k's own download step
+        article.download(input_html=html)
+        article.parse()
+        return article.text.strip()
+
 # Example Usage (optional, for testing this script directly)
 # if __name__ == '__main__':
 #     # Example 1: Valid URL (replace with a real job posting URL)
@@ -0,0 +1,238 @@
+# src/parsing/parse_cache.py
+
+# Content-hash cache for parsed PDFs.
+# Results are keyed by the SHA-256 of the PDF bytes plus the extractor version, so a
+# re-submitted resume skips PyMuPDF entirely no matter what it is called, and a
+# changed file with an old name is still reparsed. The same cache is shared by the
+# Streamlit upload path and the bulk ingestion path.
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import instrumentation
+from parsing.resume_parser import EXTRACTOR_VERSION, extract_pdf_text
+
+logger = logging.getLogger(__name__)
+
+
+def read_pdf_bytes(file_input):
+    """
+    Returns the raw bytes of a PDF given as a file path, BytesIO stream or bytes.
+
+    Raises:
+        TypeError: If the input type is not supported.
+    """
+    if isinstance(file_input, bytes):
+        return file_input
+    if isinstance(file_input, io.BytesIO):
+        return file_input.getvalue()
+    if isinstance(file_input, str):
+        with open(file_input, "rb") as f:
+            return f.read()
+    raise TypeError(f"Unsupported input type for parse cache: {type(file_input)}")
+
+
+class ParseCache:
+    """
+    Two-tier cache of extracted PDF text: an in-process LRU dictionary in front of a
+    directory of small JSON files (one per document, fanned out by key prefix).
+    The disk tier is capped at `max_disk_bytes`; the least recently used files are
+    deleted when it grows past the cap.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_items=512, max_disk_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str, optional): Directory for the disk tier. None keeps the
+                cache in memory only. Defaults to None.
+            max_memory_items (int, optional): Capacity of the LRU tier. Defaults to 512.
+            max_disk_bytes (int, optional): Size cap for the disk tier. Defaults to 256 MiB.
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (text, page_count), most recently used last
+        self._disk_bytes = None  # total size of the disk tier, computed on first write
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(pdf_bytes):
+        """
+        Builds the cache key for a PDF: SHA-256 of the bytes and the extractor version.
+        """
+        digest = hashlib.sha256(pdf_bytes)
+        digest.update(f"\x00{EXTRACTOR_VERSION}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns (text, page_count) for `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            entry = self._read_from_disk(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key, text, page_count):
+        """
+        Stores the parse result for `key` in both tiers.
+        """
+        entry = (text, page_count)
+        with self._lock:
+            self._remember(key, entry)
+            self._write_to_disk(key, entry)
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the memory tier size as a dictionary.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_items": len(self._memory)}
+
+    # --- Internal helpers ---
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _read_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path_for(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            # Touch the file so LRU eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable parse cache entry '%s': %s", path, e)
+            return None
+        return data["text"], data["page_count"]
+
+    def _write_to_disk(self, key, entry):
+        if not self.cache_dir:
+            return
+        path = self._path_for(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = json.dumps({"text": entry[0], "page_count": entry[1]})
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning("Could not write parse cache entry: %s", e)
+            return
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        else:
+            self._disk_bytes += len(payload.encode("utf-8"))
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        # (mtime, size, path) for every entry in the disk tier
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self):
+        # Delete least recently used entries until the tier is back under 90% of the cap,
+        # so a full cache doesn't rescan the directory on every single write
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+
+# --- Shared default cache ---
+# Set PARSE_CACHE_DIR to an empty string to keep parsed text in memory only.
+_default_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "resume_jd_matcher", "parsed")
+default_parse_cache = ParseCache(cache_dir=os.getenv("PARSE_CACHE_DIR", _default_cache_dir) or None)
+
+
+def extract_pdf_text_cached(file_input, cache=None, verbose=True):
+    """
+    Cached version of extract_pdf_text: identical PDF bytes are parsed only once.
+
+    Args:
+        file_input (str | io.BytesIO | bytes): The source of the PDF data.
+        cache (ParseCache, optional): Cache to use. Defaults to `default_parse_cache`.
+        verbose (bool, optional): Log progress messages on a miss. Defaults to True.
+
+    Returns:
+        tuple[str, int]: The extracted text and the number of pages.
+
+    Raises:
+        TypeError: If the input type is not supported.
+        Exception: Re-raises exceptions encountered during PDF processing.
+    """
+    cache = cache if cache is not None else default_parse_cache
+    pdf_bytes = read_pdf_bytes(file_input)
+    key = cache.key_for(pdf_bytes)
+    entry = cache.get(key)
+    if entry is not None:
+        instrumentation.incr("cache_hits_total", cache="parse")
+        return entry
+    instrumentation.incr("cache_misses_total", cache="parse")
+
+    text, page_count = extract_pdf_text(pdf_bytes, verbose=verbose)
+    cache.put(key, text, page_count)
+    return text, page_count
+
+
+def parse_resume_cached(file_input, cache=None):
+    """
+    Drop-in replacement for parse_resume that skips PyMuPDF for already-seen PDFs.
+
+    Args:
+        file_input (str | io.BytesIO | bytes): The source of the PDF data.
+        cache (ParseCache, optional): Cache to use. Defaults to `default_parse_cache`.
+
+    Returns:
+        str: The extracted text content from all pages of the PDF.
+    """
+    text, _ = extract_pdf_text_cached(file_input, cache=cache)
+    return text
@@ -2,6 +2,18 @@
 import fitz
 # Import the io library, needed for handling in-memory byte streams like uploaded files
 import io
+import logging
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Identifies the text extraction logic. Parse caches key on it, so bump the trailing
+# number whenever extract_pdf_text changes in a way that alters its output.
+EXTRACTOR_VERSION = f"pymupdf-{fitz.VersionBind}-2"
+# Separates the pages of the extracted text, so running headers/footers can be told
+# apart from content (see llm.compaction)
+PAGE_BREAK = "\f"
 
 # Define the function to parse the resume, accepting various input types
 def parse_resume(file_input):
@@ -23,8 +35,38 @@ def parse_resume(file_input):
         TypeError: If the input type is not supported.
         Exception: Re-raises exceptions encountered during PDF processing (e.g., corrupted file).
     """
-    # Initialize an empty string to accumulate text from all pages
-    resume_text = ""
+    resume_text, _ = extract_pdf_text(file_input)
+    return resume_text
+
+
+def extract_pdf_text(file_input, verbose=True):
+    """
+    Extracts the text and page count from a PDF file.
+    This is the workhorse behind parse_resume; bulk ingestion calls it directly
+    with verbose=False so thousands of documents don't flood the log.
+
+    Args:
+        file_input (str | io.BytesIO | bytes): The source of the PDF data (see parse_resume).
+        verbose (bool, optional): Log progress messages (at DEBUG level). Defaults to True.
+
+    Returns:
+        tuple[str, int]: The extracted text of all pages and the number of pages.
+
+    Raises:
+        TypeError: If the input type is not supported.
+        Exception: Re-raises exceptions encountered during PDF processing (e.g., corrupted file).
+    """
+    with instrumentation.span("parse"):
+        text, page_count = _extract_pdf_text(file_input, verbose)
+    instrumentation.incr("pdf_pages_total", page_count)
+    return text, page_count
+
+
+def _extract_pdf_text(file_input, verbose):
+    log = logger.debug if verbose else (lambda *args, **kwargs: None)
+
+    # Collect page texts in a list and join once at the end (repeated += copies the string)
+    page_texts = []
     # Initialize the document object to None. This ensures we can safely check
     # if it needs closing in the 'finally' block, even if opening fails.
     doc = None
@@ -33,11 +75,11 @@ def parse_resume(file_input):
         # --- Input Type Handling ---
         if isinstance(file_input, str):
             # If input is a string, assume it's a file path
-            print("Processing PDF from file path...") # Added print for clarity during execution
+            log("Processing PDF from file path...")
             doc = fitz.open(file_input)
         elif isinstance(file_input, io.BytesIO):
             # If input is a BytesIO object (typical for Streamlit uploads)
-            print("Processing PDF from BytesIO stream...") # Added print for clarity
+            log("Processing PDF from BytesIO stream...")
             # IMPORTANT: Ensure the stream's read pointer is at the beginning.
             # Uploaded file objects might have been read previously.
             file_input.seek(0)
@@ -47,7 +89,7 @@ def parse_resume(file_input):
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
         elif isinstance(file_input, bytes):
              # If input is already raw bytes
-             print("Processing PDF from raw bytes...") # Added print for clarity
+             log("Processing PDF from raw bytes...")
              # Open the PDF document directly from the byte stream
              doc = fitz.open(stream=file_input, filetype="pdf")
         else:
@@ -56,18 +98,16 @@ def parse_resume(file_input):
 
         # --- Text Extraction ---
         # Iterate through each page in the opened PDF document
-        print(f"Extracting text from {len(doc)} pages...") # Added print for progress
-        for page_num, page in enumerate(doc): # Using enumerate for potential page-specific logging
+        page_count = len(doc)
+        log("Extracting text from %d pages...", page_count)
+        for page in doc:
             # Extract text from the current page.
             # page.get_text() extracts plain text. Other options exist like "html", "dict", etc.
-            page_text = page.get_text()
-            resume_text += page_text
-            # Optional: Add a separator between pages if needed, e.g., resume_text += "\n--- Page Break ---\n"
-            # print(f"  Extracted text from page {page_num + 1}") # Uncomment for detailed logging
+            page_texts.append(page.get_text())
 
     except Exception as e:
         # If any error occurs during the try block (opening, reading, processing)
-        print(f"Error processing PDF: {e}")
+        logger.error("Error processing PDF: %s", e)
         # Re-raise the exception. This allows the calling code (e.g., Streamlit app)
         # to know that processing failed and handle it appropriately (e.g., show user error).
         raise
@@ -75,14 +115,14 @@ def parse_resume(file_input):
         # --- Resource Cleanup ---
         # This block executes regardless of whether an exception occurred or not.
         # It's crucial for releasing resources like file handles.
-        if doc:
-            print("Closing PDF document.") # Added print for clarity
+        if doc is not None:
+            log("Closing PDF document.")
             # If the document object was successfully created, close it.
             doc.close()
 
-    # Return the accumulated text from all pages
-    print("PDF parsing complete.") # Added print for clarity
-    return resume_text
+    # Return the text from all pages
+    log("PDF parsing complete.")
+    return PAGE_BREAK.join(page_texts), page_count
 
 # Example Usage (optional, for testing this script directly)
 # if __name__ == '__main__':
@@ -0,0 +1,307 @@
+# src/parsing/skill_extraction.py
+
+# Structured skill and entity extraction with spaCy.
+# Skill and requirement extraction used to be left entirely to the Gemini prompt, so
+# every skill-gap question cost an LLM round-trip. Here parse_resume / jd_parser output
+# runs through spaCy's nlp.pipe in batches (optionally across processes) with only the
+# components we need enabled; skills are matched against a vocabulary with a
+# PhraseMatcher and named entities come from the NER component. Results are cached per
+# document hash, and skill sets can be compared without any model call.
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+import instrumentation
+import model_registry
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# NER has its own tok2vec in en_core_web_sm; the tagger, parser and lemmatizer are unused
+DISABLED_COMPONENTS = ("tagger", "parser", "attribute_ruler", "lemmatizer", "senter")
+# Entity labels kept in the features (organisations, places, products, languages)
+ENTITY_LABELS = ("ORG", "GPE", "PRODUCT", "LANGUAGE", "NORP")
+
+# Canonical skill names; matched case-insensitively as whole token sequences, except
+# those also listed in CASE_SENSITIVE_SKILLS
+SKILL_VOCABULARY = (
+    "python", "java", "javascript", "typescript", "c++", "c#", "go", "rust", "scala", "kotlin", "swift",
+    "ruby", "php", "r", "sql", "bash", "html", "css", "react", "angular", "vue", "node.js", "django",
+    "flask", "fastapi", "spring", "rails", ".net", "graphql", "rest", "restful apis", "grpc",
+    "postgresql", "mysql", "sqlite", "mongodb", "redis", "cassandra", "elasticsearch", "kafka", "rabbitmq",
+    "celery", "spark", "hadoop", "airflow", "dbt", "snowflake", "bigquery", "redshift", "databricks",
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ansible", "jenkins", "github actions",
+    "ci/cd", "git", "linux", "microservices", "distributed systems", "system design",
+    "machine learning", "deep learning", "nlp", "computer vision", "pytorch", "tensorflow", "keras",
+    "scikit-learn", "pandas", "numpy", "statistics", "data analysis", "data visualization", "tableau",
+    "power bi", "excel", "etl", "data modeling", "data warehousing", "llm", "generative ai",
+    "pytest", "unit testing", "integration testing", "test automation", "selenium",
+    "agile", "scrum", "kanban", "jira", "project management", "product management", "stakeholder management",
+    "leadership", "mentoring", "teamwork", "problem solving", "written communication", "verbal communication",
+    "security", "oauth", "networking", "observability", "prometheus", "grafana",
+)
+
+# Alternative spellings mapped to the canonical name, matched case-insensitively too
+SKILL_ALIASES = {
+    "js": "javascript", "ts": "typescript", "golang": "go", "nodejs": "node.js",
+    "postgres": "postgresql", "k8s": "kubernetes", "sklearn": "scikit-learn", "machine-learning": "machine learning",
+    "rest api": "rest", "rest apis": "restful apis", "google cloud": "gcp", "microsoft excel": "excel",
+    "amazon web services": "aws", "ci cd": "ci/cd", "large language models": "llm", "powerbi": "power bi",
+    "r programming": "r", "ruby on rails": "rails", "spring boot": "spring",
+}
+
+# Skills whose names are also ordinary English words ("go the extra mile", "the rest of
+# the team", "excel at"). These only match with exactly this capitalization, mapped to
+# the canonical name.
+CASE_SENSITIVE_SKILLS = {
+    "Go": "go", "R": "r", "REST": "rest", "Excel": "excel", "Swift": "swift", "Node": "node.js",
+    "Spring": "spring", "Rails": "rails", "ML": "machine learning", "DL": "deep learning",
+}
+
+# "5+ years of experience", "3-5 years' professional experience", "Experience: 7 years";
+# the largest figure that is about experience counts ("founded 25 years ago" doesn't)
+_YEARS_RE = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:(?:-|to)\s*\d{1,2}\s*\+?\s*)?(?:years?|yrs?)\b(?!\s+(?:ago|old)\b)",
+                       re.IGNORECASE)
+_EXPERIENCE_RE = re.compile(r"\b(experience[ds]?|exp|professional(ly)?|industry|hands-on|working)\b", re.IGNORECASE)
+# Characters around the figure searched for an experience word
+_EXPERIENCE_WINDOW = (40, 60)
+
+# Extracted features of one document.
+#   skills:           frozenset of canonical skill names
+#   entities:         dict label -> frozenset of entity texts (labels in ENTITY_LABELS)
+#   years_experience: the largest "N years" of experience stated, or None
+DocumentFeatures = namedtuple("DocumentFeatures", ["skills", "entities", "years_experience"])
+
+
+def _load_nlp():
+    import spacy
+
+    try:
+        nlp = spacy.load(SPACY_MODEL, disable=list(DISABLED_COMPONENTS))
+        logger.info("Loaded spaCy model %s (enabled: %s).", SPACY_MODEL, ", ".join(nlp.pipe_names))
+    except OSError as e:
+        # Skills only need the tokenizer; entities need the trained model
+        logger.warning("spaCy model %s not available (%s); extracting skills without entities.", SPACY_MODEL, e)
+        nlp = spacy.blank("en")
+    return nlp
+
+
+_nlp_resource = model_registry.register("spacy", _load_nlp)
+
+
+class SkillExtractor:
+    """
+    Batched, cached skill/entity extraction.
+
+    Usage:
+        extractor = SkillExtractor(batch_size=64, n_process=4)
+        features = extractor.extract_many(resume_texts)   # one DocumentFeatures per text
+        gap = skill_overlap(extractor.extract(resume_text), extractor.extract(jd_text))
+    """
+
+    def __init__(self, nlp=None, skills=SKILL_VOCABULARY, aliases=None, case_sensitive=None, batch_size=64,
+                 n_process=1, cache_size=4096):
+        """
+        Args:
+            nlp (optional): A loaded spaCy pipeline. Defaults to SPACY_MODEL (loaded on
+                first use, shared through the model registry).
+            skills (iterable[str], optional): Canonical skill names. Defaults to SKILL_VOCABULARY.
+            aliases (dict, optional): Alternative spelling -> canonical name. Defaults to SKILL_ALIASES.
+            case_sensitive (dict, optional): Exact spelling -> canonical name, for names that
+                are also common words. Defaults to CASE_SENSITIVE_SKILLS.
+            batch_size (int, optional): Documents per nlp.pipe batch. Defaults to 64.
+            n_process (int, optional): Processes for nlp.pipe; worth it only for large
+                batches, since each process loads the model. Defaults to 1.
+            cache_size (int, optional): Documents whose features are kept (LRU). Defaults to 4096.
+        """
+        self._nlp = nlp
+        self.aliases = {k.lower(): v for k, v in (SKILL_ALIASES if aliases is None else aliases).items()}
+        self.case_sensitive = dict(CASE_SENSITIVE_SKILLS if case_sensitive is None else case_sensitive)
+        self.skills = tuple(dict.fromkeys(s.lower() for s in skills))
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.cache_size = cache_size
+        self._matchers = None
+        self._cache = OrderedDict()  # document hash -> DocumentFeatures
+        self._lock = threading.Lock()
+        # Changing the vocabulary must not serve features extracted with another one
+        self._vocabulary_id = hashlib.sha256("\n".join(
+            list(self.skills) + sorted(f"{k}={v}" for k, v in self.aliases.items())
+            + sorted(f"{k}=={v}" for k, v in self.case_sensitive.items())).encode("utf-8")).hexdigest()
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self._nlp = _nlp_resource.get()
+        return self._nlp
+
+    def extract(self, text):
+        """Returns the DocumentFeatures of one document."""
+        return self.extract_many([text])[0]
+
+    def extract_many(self, texts):
+        """
+        Extracts features for many documents; only documents not in the cache go
+        through spaCy, in nlp.pipe batches.
+
+        Returns:
+            list[DocumentFeatures]: One per text, in input order.
+        """
+        keys = [self._key(text) for text in texts]
+        features = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    features[key] = self._cache[key]
+        missing = list(dict.fromkeys((key, text) for key, text in zip(keys, texts) if key not in features))
+        instrumentation.incr("cache_hits_total", len(keys) - len(missing), cache="skills")
+        instrumentation.incr("cache_misses_total", len(missing), cache="skills")
+
+        if missing:
+            matchers = self._phrase_matchers()
+            with instrumentation.span("skill_extract"):
+                docs = self.nlp.pipe((text for _, text in missing), batch_size=self.batch_size,
+                                     n_process=self.n_process)
+                for (key, text), doc in zip(missing, docs):
+                    features[key] = self._features(doc, matchers, text)
+            with self._lock:
+                for key, _ in missing:
+                    self._cache[key] = features[key]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [features[key] for key in keys]
+
+    # --- Internal helpers ---
+    def _key(self, text):
+        return hashlib.sha256(f"{self._vocabulary_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _phrase_matchers(self):
+        # (case-insensitive matcher, exact-spelling matcher)
+        if self._matchers is None:
+            from spacy.matcher import PhraseMatcher
+
+            # Names also listed case-sensitively are left out of the case-insensitive matcher;
+            # make_doc only tokenizes, so building the patterns is cheap
+            ambiguous = {surface.lower() for surface in self.case_sensitive}
+            names = [name for name in list(self.skills) + list(self.aliases) if name not in ambiguous]
+            lower = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+            lower.add("SKILL", [self.nlp.make_doc(name) for name in names])
+            exact = PhraseMatcher(self.nlp.vocab, attr="ORTH")
+            exact.add("SKILL", [self.nlp.make_doc(name) for name in self.case_sensitive])
+            self._matchers = (lower, exact)
+        return self._matchers
+
+    def _features(self, doc, matchers, text):
+        lower, exact = matchers
+        skills = set()
+        for _, start, end in lower(doc):
+            name = doc[start:end].text.lower()
+            skills.add(self.aliases.get(name, name))
+        for _, start, end in exact(doc):
+            skills.add(self.case_sensitive[doc[start:end].text])
+        entities = {}
+        for ent in doc.ents:
+            if ent.label_ in ENTITY_LABELS:
+                entities.setdefault(ent.label_, set()).add(ent.text.strip())
+        return DocumentFeatures(frozenset(skills), {label: frozenset(values) for label, values in entities.items()},
+                                years_of_experience(text))
+
+
+def years_of_experience(text):
+    """
+    Returns the largest "N years" figure stated as experience, or None. A figure counts
+    when an experience word ("experience", "professional", "industry", ...) is close
+    by; ages and "N years ago" never do.
+    """
+    before, after = _EXPERIENCE_WINDOW
+    years = [int(match.group(1)) for match in _YEARS_RE.finditer(text)
+             if _EXPERIENCE_RE.search(text, max(0, match.start() - before), match.end() + after)]
+    return max(years) if years else None
+
+
+def skill_overlap(resume_features, jd_features):
+    """
+    Compares the skill sets of a resume and a JD.
+
+    Returns:
+        dict: {"coverage": share of the JD's skills the resume has (None if the JD lists
+               none), "jaccard": overlap of the two sets, "matched", "missing" (JD skills
+               absent from the resume) and "extra" (resume skills the JD doesn't ask for),
+               as sorted lists, plus "years_gap": JD years minus resume years, if both known}.
+    """
+    resume_skills, jd_skills = resume_features.skills, jd_features.skills
+    union = resume_skills | jd_skills
+    years_gap = None
+    if resume_features.years_experience is not None and jd_features.years_experience is not None:
+        years_gap = jd_features.years_experience - resume_features.years_experience
+    return {
+        "coverage": len(resume_skills & jd_skills) / len(jd_skills) if jd_skills else None,
+        "jaccard": len(resume_skills & jd_skills) / len(union) if union else 0.0,
+        "matched": sorted(resume_skills & jd_skills),
+        "missing": sorted(jd_skills - resume_skills),
+        "extra": sorted(resume_skills - jd_skills),
+        "years_gap": years_gap,
+    }
+
+
+def skill_coverage_matrix(resume_features, jd_features):
+    """
+    Skill coverage for every resume/JD pair at once: the share of each JD's skills
+    found in each resume, from one binary matrix product.
+
+    Args:
+        resume_features (list[DocumentFeatures]): Rows of the result.
+        jd_features (list[DocumentFeatures]): Columns of the result.
+
+    Returns:
+        np.ndarray: float32 array of shape (len(resume_features), len(jd_features));
+                    columns of JDs without skills are 0.
+    """
+    vocabulary = {skill: i for i, skill in enumerate(sorted(set().union(
+        *(f.skills for f in resume_features), *(f.skills for f in jd_features))))}
+
+    def incidence(features_list):
+        matrix = np.zeros((len(features_list), len(vocabulary)), dtype=np.float32)
+        for row, features in enumerate(features_list):
+            matrix[row, [vocabulary[skill] for skill in features.skills]] = 1.0
+        return matrix
+
+    jd_matrix = incidence(jd_features)
+    jd_sizes = jd_matrix.sum(axis=1)
+    common = incidence(resume_features) @ jd_matrix.T
+    return np.divide(common, jd_sizes, out=np.zeros_like(common), where=jd_sizes > 0)
+
+
+_default_extractor = None
+_default_extractor_lock = threading.Lock()
+
+
+def get_skill_extractor():
+    """Returns the shared SkillExtractor (default model and vocabulary)."""
+    global _default_extractor
+    with _default_extractor_lock:
+        if _default_extractor is None:
+            _default_extractor = SkillExtractor()
+        return _default_extractor
+
+
+def skill_gap(resume_text, jd_text):
+    """
+    Skill gap between one resume and one JD without an LLM call (see skill_overlap).
+
+    Args:
+        resume_text (str): The text content of the resume.
+        jd_text (str): The text content of the job description.
+
+    Returns:
+        dict: The skill_overlap result.
+    """
+    resume_features, jd_features = get_skill_extractor().extract_many([resume_text, jd_text])
+    return skill_overlap(resume_features, jd_features)
@@ -1,10 +1,15 @@
-# streamlit_app.py - MINIMAL TEST WITH IMPORTS
+# streamlit_app.py
 
 import streamlit as st # <--- MOVE THIS TO THE TOP
 import os
 import io
+import hashlib
+import logging
+import queue
 import sys
-import inspect
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger("streamlit_app")
 
 # --- Keep Path Setup ---
 try:
@@ -14,22 +19,23 @@ try:
     if os.path.isdir(src_path):
         if src_path not in sys.path:
             sys.path.insert(0, src_path)
-        # print(f"INFO: Successfully added '{src_path}' to sys.path.") # Optional print
     else:
-        print(f"ERROR: Calculated src directory does not exist: {src_path}")
+        logger.error("Calculated src directory does not exist: %s", src_path)
 except NameError:
-    print("Warning: __file__ not defined. Path setup might be incomplete.")
+    logger.warning("__file__ not defined. Path setup might be incomplete.")
 # --- End Path Setup ---
 
 
 # --- Imports ---
 try:
-    from parsing.resume_parser import parse_resume
+    from parsing.parse_cache import parse_resume_cached
     from parsing.jd_parser import jd_parser
-    from matching.matcher import compute_embedding_similarity
-    from matching.matcher import match_resume_with_jd_llm
-    from matching.matcher import improve_resume_text
-    print("✅ Successfully imported backend functions (in minimal test).")
+    from matching.matcher import compute_embedding_similarity, warm_embedding_model
+    from matching.matcher import stream_match_resume_with_jd_llm
+    from matching.matcher import stream_improve_resume_text
+    from matching.lexical import get_common_keywords
+    from llm.client import warm_model
+    logger.info("Successfully imported backend functions.")
 except ImportError as e:
     # This st.error() can now run because 'st' is defined above
     st.error(f"Import Error: {e}")
@@ -38,8 +44,124 @@ except Exception as e:
     st.error(f"Other Error during import: {e}")
     st.stop() # Stop if imports fail
 
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # older Streamlit; worker threads then run without the script context
+    add_script_run_ctx = get_script_run_ctx = None
+
+
+# --- Cached Backend Calls ---
+# st.cache_resource keeps one copy of the models per server process, shared by every
+# session; st.cache_data memoizes results by their arguments, so a rerun (any widget
+# change re-executes this script) or another session analysing the same resume/JD gets
+# them back instantly. Failures raise instead of returning, so they are never cached.
+# LLM answers are streamed instead; repeats are served by the matcher's response cache.
+
+class AnalysisError(Exception):
+    """Raised by the cached analyses when the backend returns no usable result."""
+
+
+@st.cache_resource(show_spinner="Loading models...")
+def load_models():
+    # Returns the load time of each model (None if it failed to load)
+    return {"embedding": warm_embedding_model(), "llm": warm_model()}
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def parse_resume_bytes(resume_file_bytes):
+    return parse_resume_cached(io.BytesIO(resume_file_bytes))
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=256)
+def fetch_jd(url):
+    jd_text = jd_parser(url=url)
+    if not jd_text or not jd_text.strip():
+        raise AnalysisError("Could not extract meaningful text from URL.")
+    return jd_text.strip()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_similarity(resume_text, jd_text):
+    score = compute_embedding_similarity(resume_text, jd_text)
+    if score is None:
+        raise AnalysisError("Could not calculate embedding similarity score.")
+    return score
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_keywords(resume_text, jd_text):
+    return get_common_keywords(resume_text, jd_text)
+
+
+def start_concurrently(executor, tasks):
+    """
+    Submits independent analyses to a thread pool.
+
+    Args:
+        executor (ThreadPoolExecutor): The pool to run them in.
+        tasks (dict): name -> (function, args).
+
+    Returns:
+        dict: future -> name, for collect_finished().
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def call(fn, args):
+        # Attach this session's script context so st.cache_data works from the worker
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        return fn(*args)
+
+    return {executor.submit(call, fn, args): name for name, (fn, args) in tasks.items()}
 
 
+def collect_finished(futures, wait=False):
+    """
+    Yields (name, result, error) for each finished analysis and forgets it; exactly one
+    of result/error is set. With wait=True, blocks until all of them have finished.
+    """
+    done = as_completed(list(futures)) if wait else [future for future in list(futures) if future.done()]
+    for future in done:
+        name = futures.pop(future)
+        try:
+            yield name, future.result(), None
+        except Exception as e:
+            logger.error("Analysis %s failed: %s", name, e)
+            yield name, None, e
+
+
+def stream_alongside(executor, analysis, futures, render):
+    """
+    Yields the chunks of a streaming LLM analysis (consumed in a worker thread) for
+    st.write_stream, rendering the other analyses whenever they finish meanwhile, also
+    while the LLM has not produced its first token yet.
+    """
+    chunks = queue.Queue()
+    done = object()
+
+    def produce():
+        try:
+            for chunk in analysis:
+                chunks.put(chunk)
+        finally:
+            chunks.put(done)
+
+    executor.submit(produce)
+    while True:
+        try:
+            chunk = chunks.get(timeout=0.05)
+        except queue.Empty:
+            chunk = None
+        for finished in collect_finished(futures):
+            render(*finished)
+        if chunk is done:
+            return
+        if chunk is not None:
+            yield chunk
+
+
+load_models()
+
 
 # --- Streamlit App UI ---
 
@@ -55,18 +177,22 @@ resume_file = st.file_uploader("Choose a resume PDF file", type="pdf", key="resu
 if 'resume_text' not in st.session_state:
     st.session_state.resume_text = None
     st.session_state.resume_filename = None # Also store filename
+    st.session_state.resume_digest = None # SHA-256 of the parsed PDF bytes
 
 # Process the uploaded file
 if resume_file is not None:
-    # Check if it's a new file or the same one
-    if st.session_state.resume_filename != resume_file.name:
+    # Check if it's new content: compare the bytes' hash, not the file name, so a changed
+    # file with the same name is reparsed and a renamed copy is not
+    resume_file_bytes = resume_file.getvalue()
+    resume_digest = hashlib.sha256(resume_file_bytes).hexdigest()
+    if st.session_state.resume_digest != resume_digest:
         st.info(f"Processing uploaded resume: {resume_file.name}")
         try:
-            # Use BytesIO to handle the uploaded file object in memory
-            resume_bytes = io.BytesIO(resume_file.getvalue())
-            # Call the parsing function from your backend
-            st.session_state.resume_text = parse_resume(resume_bytes)
-            st.session_state.resume_filename = resume_file.name # Store filename to prevent reprocessing
+            # Parse from the in-memory bytes (cached by content, across sessions; the parse
+            # cache behind it skips PyMuPDF for PDFs seen before a restart too)
+            st.session_state.resume_text = parse_resume_bytes(resume_file_bytes)
+            st.session_state.resume_filename = resume_file.name
+            st.session_state.resume_digest = resume_digest # Store hash to prevent reprocessing
             st.success("✅ Resume parsed successfully!")
             # Optionally display a snippet of the parsed text for verification
             # with st.expander("Parsed Resume Text (Snippet)"):
@@ -76,11 +202,13 @@ if resume_file is not None:
             # Reset state on error
             st.session_state.resume_text = None
             st.session_state.resume_filename = None
+            st.session_state.resume_digest = None
 # Handle file removal by user
 elif st.session_state.resume_filename is not None:
      st.info("Resume file removed.")
      st.session_state.resume_text = None
      st.session_state.resume_filename = None
+     st.session_state.resume_digest = None
 
 
 # --- Section 2: Job Description Input ---
@@ -123,20 +251,14 @@ if st.button("🔍 Analyze Resume-JD Match", key="match_button"):
         st.info(f"ℹ️ Attempting to fetch Job Description from URL: {jd_url_input}")
         try:
             # Call your extraction function (ensure it handles potential errors)
+            # Cached per URL for an hour, so reruns don't download the page again
             with st.spinner("Fetching and parsing JD from URL..."):
-                final_jd_text = jd_parser(url=jd_url_input) # Assumes extract_jd_text handles URL fetching
-
-            # Check if extraction was successful
-            if not final_jd_text or not final_jd_text.strip():
-                 st.warning(f"⚠️ Could not extract meaningful text from URL. Please check the URL or paste the text manually.")
-                 # Don't stop here, allow user to paste manually if desired.
-                 # Consider clearing the URL input or giving specific feedback.
-            else:
-                st.success("✅ Successfully fetched and parsed JD from URL.")
-                # Optionally display snippet
-                # with st.expander("Parsed JD Text (Snippet from URL)"):
-                #    st.text(final_jd_text[:500] + "...")
+                final_jd_text = fetch_jd(jd_url_input)
+            st.success("✅ Successfully fetched and parsed JD from URL.")
 
+        except AnalysisError:
+            st.warning("⚠️ Could not extract meaningful text from URL. Please check the URL or paste the text manually.")
+            # Don't stop here, allow user to paste manually if desired.
         except Exception as e:
             # Catch errors during URL fetching/parsing
             st.error(f"❌ Error fetching or parsing JD from URL: {e}")
@@ -152,46 +274,58 @@ if st.button("🔍 Analyze Resume-JD Match", key="match_button"):
         st.markdown("---") # Separator
         st.subheader("📊 Matching Analysis Results")
 
-        # --- Analysis 1: Embedding Similarity ---
-        try:
-            with st.spinner('Calculating semantic similarity score...'):
-                similarity_score = compute_embedding_similarity(resume_text, final_jd_text)
-
-            if similarity_score is not None:
-                # Display score as percentage using st.metric
-                st.metric(label="Semantic Similarity Score (Embeddings)", value=f"{similarity_score*100:.2f}%",
-                          help="Measures how similar the overall meaning of the resume and JD are, based on sentence embeddings (0-100%). Higher is generally better.")
-            else:
-                st.warning("⚠️ Could not calculate embedding similarity score.")
-
-        except Exception as e:
-            st.error(f"An error occurred during similarity calculation: {e}")
-
-        # --- Analysis 2: Common Keywords (Placeholder) ---
-        # st.subheader("🔑 Common Keywords (Simple Overlap)") # Optional section
-        # try:
-        #     common_keywords = get_common_keywords(resume_text, final_jd_text)
-        #     st.write(common_keywords)
-        # except Exception as e:
-        #     st.error(f"Error calculating common keywords: {e}")
-
-        # --- Analysis 3: LLM (Gemini) Detailed Match ---
-        try:
-            with st.spinner('Asking AI Assistant (Gemini) for detailed analysis...'):
-                 # *** Use the correct function name from your backend ***
-                 # Using 'match_resume_with_jd' as per your import list,
-                 # but 'match_resume_with_jd_llm' might be more accurate.
-                llm_result = match_resume_with_jd_llm(resume_text, final_jd_text)
-
-            st.subheader("🤖 AI Assistant Analysis (Gemini)")
-            if llm_result:
-                # Use markdown to render potential formatting from the LLM
-                st.markdown(llm_result, unsafe_allow_html=True) # Allow basic HTML if needed for formatting like lists
-            else:
-                st.warning("⚠️ AI analysis returned no result. The LLM might be unavailable or encountered an issue.")
-
-        except Exception as e:
-            st.error(f"❌ Error during AI analysis: {e}")
+        # The analyses are independent, so they run concurrently and each one is shown as
+        # soon as it finishes; the LLM answer is streamed in as it is generated, so the
+        # wait is roughly the slowest one, not their sum
+        similarity_slot = st.empty()
+        st.subheader("🔑 Keyword Overlap")
+        keywords_slot = st.empty()
+        st.subheader("🤖 AI Assistant Analysis (Gemini)")
+        llm_slot = st.empty()
+        similarity_slot.info("⏳ Calculating semantic similarity score...")
+        keywords_slot.info("⏳ Comparing keywords...")
+        llm_slot.info("⏳ Asking AI Assistant (Gemini) for detailed analysis...")
+
+        def render(name, result, error):
+            if name == "similarity":
+                if error is not None:
+                    similarity_slot.warning(f"⚠️ {error}")
+                else:
+                    # Display score as percentage using st.metric
+                    similarity_slot.metric(label="Semantic Similarity Score (Embeddings)", value=f"{result*100:.2f}%",
+                                           help="Measures how similar the overall meaning of the resume and JD are, based on sentence embeddings (0-100%). Higher is generally better.")
+            elif name == "keywords":
+                if error is not None:
+                    keywords_slot.error(f"Error calculating common keywords: {error}")
+                else:
+                    with keywords_slot.container():
+                        kw_col1, kw_col2 = st.columns(2)
+                        with kw_col1:
+                            st.markdown("**Found in your resume**")
+                            st.write(", ".join(result["common"]) or "None")
+                        with kw_col2:
+                            st.markdown("**JD keywords missing from your resume**")
+                            st.write(", ".join(result["missing"]) or "None")
+
+        tasks = {
+            "similarity": (cached_similarity, (resume_text, final_jd_text)),
+            "keywords": (cached_keywords, (resume_text, final_jd_text)),
+        }
+        with ThreadPoolExecutor(max_workers=len(tasks) + 1) as executor:
+            futures = start_concurrently(executor, tasks)
+            analysis = stream_match_resume_with_jd_llm(resume_text, final_jd_text)
+            try:
+                with llm_slot.container():
+                    # Render the LLM text progressively as chunks arrive
+                    st.write_stream(stream_alongside(executor, analysis, futures, render))
+                    if analysis.text is None:
+                        st.warning("⚠️ AI analysis returned no result. The LLM might be unavailable or encountered an issue.")
+                    elif analysis.score is not None:
+                        st.metric(label="AI Match Score", value=f"{analysis.score:.0f}/100")
+            except Exception as e:
+                llm_slot.error(f"❌ Error during AI analysis: {e}")
+            for finished in collect_finished(futures, wait=True):
+                render(*finished)
 
     elif resume_text and (not final_jd_text or not final_jd_text.strip()):
         # If resume is ready but JD failed or is empty after trying
@@ -210,19 +344,12 @@ if current_resume_text:
     # Improve button
     if st.button("💡 Suggest Resume Improvements", key="improve_button"):
         try:
-            with st.spinner("AI Assistant is thinking about improvements..."):
-                # Call the backend function for resume improvement
-                # *** Ensure 'improve_resume_text' exists and works ***
-                improved_text = improve_resume_text(current_resume_text)
-
             st.subheader("📝 AI-Suggested Improvements")
-            if improved_text:
-                # Display suggestions in a text area or markdown
-                st.markdown(improved_text, unsafe_allow_html=True)
-            else:
+            # Stream the suggestions as they are generated (repeats come from the response cache)
+            analysis = stream_improve_resume_text(current_resume_text)
+            st.write_stream(iter(analysis))
+            if analysis.text is None:
                 st.warning("⚠️ AI Assistant returned no improvement suggestions.")
-        except NameError:
-             st.error("❌ The 'improve_resume_text' function is not defined or imported correctly.")
         except Exception as e:
             st.error(f"❌ Error during resume improvement: {e}")
 else: